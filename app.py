@@ -1,47 +1,45 @@
 import sys
+from main_logic import startup_profiler
+
+if __name__ == "__main__":
+    # 尽早开始启动分析，以便记录PyQt等模块的导入耗时
+    startup_profiler.start_from_environment(sys.argv)
+
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QStackedWidget
-from PyQt5.QtCore import Qt, QEvent
+from PyQt5.QtCore import Qt, QEvent, QTimer
 from PyQt5.QtGui import QIcon
 
-from view_models.user_view_model import UserViewModel
-from view_models.prize_view_model import PrizeViewModel
-from view_models.probability_view_model import ProbabilityViewModel
-from view_models.lottery_view_model import LotteryViewModel
-from views.user_view import UserView
-from views.prize_view import PrizeView
-from views.probability_view import ProbabilityView
-from views.lottery_view import LotteryView
-
 
 class LotteryApp(QMainWindow):
     """抽奖应用程序主类
     """
     
-    def __init__(self):
+    def __init__(self, sync_mode="normal"):
+        """初始化主窗口
+        
+        Args:
+            sync_mode: 抽奖结果写入数据库的同步策略
+        """
         super().__init__()
         self.setWindowTitle("抽奖助手")
         self.setGeometry(100, 100, 1000, 800)
         
         # 加载样式
-        self.load_styles()
+        with startup_profiler.phase("styles"):
+            self.load_styles()
         
         # 数据库路径
         self.db_path = "lottery.db"
+        self.sync_mode = sync_mode
         
-        # 初始化视图模型
-        self.user_view_model = UserViewModel(self.db_path)
-        self.prize_view_model = PrizeViewModel(self.db_path)
-        self.probability_view_model = ProbabilityViewModel(self.db_path)
-        self.lottery_view_model = LotteryViewModel(self.db_path)
-        
-        # 初始化视图
-        self.user_view = UserView(self.user_view_model)
-        self.prize_view = PrizeView(self.prize_view_model, self.probability_view_model)
-        self.probability_view = ProbabilityView(self.probability_view_model)
-        self.lottery_view = LotteryView(self.lottery_view_model)
+        # 视图模型和视图在第一次切换到对应页面时才创建，启动时间与数据量无关
+        self.view_models = {}  # 名称到视图模型的映射
+        self.views = {}  # 视图索引到视图的映射
+        self.startup_pending = True  # 窗口第一次绘制后才创建默认页面
         
         # 初始化主界面
-        self.init_ui()
+        with startup_profiler.phase("init_ui"):
+            self.init_ui()
     
     def load_styles(self):
         """加载样式文件
@@ -88,24 +86,123 @@ class LotteryApp(QMainWindow):
         nav_layout.addWidget(self.lottery_btn)
         nav_layout.addStretch()
         
-        # 创建右侧内容区域
+        # 创建右侧内容区域，各页面先用空白占位，显示时再替换为真正的视图
         self.stacked_widget = QStackedWidget()
-        self.stacked_widget.addWidget(self.user_view)
-        self.stacked_widget.addWidget(self.prize_view)
-        self.stacked_widget.addWidget(self.probability_view)
-        self.stacked_widget.addWidget(self.lottery_view)
+        for _ in range(4):
+            self.stacked_widget.addWidget(QWidget())
         
         # 添加导航栏和内容区域到主布局
         main_layout.addLayout(nav_layout)
         main_layout.addWidget(self.stacked_widget, 1)
     
+    def get_view_model(self, name):
+        """获取视图模型，第一次使用时才创建
+        
+        Args:
+            name: 视图模型名称（user、prize、probability、lottery）
+            
+        Returns:
+            视图模型
+        """
+        if name not in self.view_models:
+            with startup_profiler.phase(f"view_model:{name}"):
+                self.view_models[name] = self._create_view_model(name)
+        return self.view_models[name]
+    
+    def _create_view_model(self, name):
+        """创建视图模型
+        
+        Args:
+            name: 视图模型名称
+            
+        Returns:
+            视图模型
+        """
+        if name == "user":
+            from view_models.user_view_model import UserViewModel
+            return UserViewModel(self.db_path)
+        if name == "prize":
+            from view_models.prize_view_model import PrizeViewModel
+            return PrizeViewModel(self.db_path)
+        if name == "probability":
+            from view_models.probability_view_model import ProbabilityViewModel
+            return ProbabilityViewModel(self.db_path)
+        if name == "lottery":
+            from view_models.lottery_view_model import LotteryViewModel
+            return LotteryViewModel(self.db_path, sync_mode=self.sync_mode)
+        raise ValueError(f"未知的视图模型: {name}")
+    
+    def get_view(self, index):
+        """获取视图，第一次使用时才创建并替换占位页面
+        
+        Args:
+            index: 视图索引
+            
+        Returns:
+            视图
+        """
+        if index not in self.views:
+            with startup_profiler.phase(f"view:{index}"):
+                if index == 0:
+                    from views.user_view import UserView
+                    view = UserView(self.get_view_model("user"))
+                elif index == 1:
+                    from views.prize_view import PrizeView
+                    view = PrizeView(self.get_view_model("prize"), self.get_view_model("probability"))
+                elif index == 2:
+                    from views.probability_view import ProbabilityView
+                    view = ProbabilityView(self.get_view_model("probability"))
+                elif index == 3:
+                    from views.lottery_view import LotteryView
+                    view = LotteryView(self.get_view_model("lottery"))
+                else:
+                    raise ValueError(f"未知的视图索引: {index}")
+            
+            placeholder = self.stacked_widget.widget(index)
+            self.stacked_widget.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.stacked_widget.insertWidget(index, view)
+            self.views[index] = view
+        return self.views[index]
+    
     def show_view(self, index):
         """显示指定的视图
         
         Args:
             index: 视图索引
         """
-        self.stacked_widget.setCurrentIndex(index)
+        self.stacked_widget.setCurrentWidget(self.get_view(index))
+    
+    def offer_session_resume(self):
+        """检查上次是否有未完成的抽奖场次，有时切换到抽奖界面并询问是否恢复
+        
+        只做一次轻量查询，没有未完成的场次时不会创建抽奖界面
+        """
+        from manager.result_manager import ResultManager
+        
+        result_manager = ResultManager(self.db_path)
+        try:
+            session = result_manager.get_interrupted_session()
+        finally:
+            result_manager.close()
+        
+        if session:
+            self.show_view(3)
+            self.get_view(3).offer_session_resume()
+    
+    def finish_startup(self):
+        """窗口第一次绘制后创建默认页面，加载完成后再检查是否有需要恢复的抽奖场次
+        """
+        if not self.views:
+            # 默认显示人员管理界面，表格数据在视图创建后排队加载
+            self.show_view(0)
+        QTimer.singleShot(0, self.after_startup)
+    
+    def after_startup(self):
+        """默认页面加载完成后结束启动分析，并询问是否恢复未完成的抽奖场次
+        """
+        startup_profiler.finish()
+        self.offer_session_resume()
     
     def event(self, event):
         """事件处理
@@ -116,6 +213,9 @@ class LotteryApp(QMainWindow):
         Returns:
             是否处理了事件
         """
+        if event.type() == QEvent.Paint and self.startup_pending:
+            self.startup_pending = False
+            QTimer.singleShot(0, self.finish_startup)
         if event.type() == QEvent.User and hasattr(event, 'view_index'):
             self.show_view(event.view_index)
             return True
@@ -127,17 +227,23 @@ class LotteryApp(QMainWindow):
         Args:
             event: 关闭事件
         """
-        # 关闭数据库连接
-        self.user_view_model.close()
-        self.prize_view_model.close()
-        self.probability_view_model.close()
-        self.lottery_view_model.close()
+        # 关闭已创建的视图模型的数据库连接
+        for view_model in self.view_models.values():
+            view_model.close()
         event.accept()
 
 
 if __name__ == "__main__":
+    from manager.result_manager import ResultManager
+    
+    # 在创建窗口前检查同步策略，设置错误时直接报错，而不是在抽奖时才发现
+    sync_mode = ResultManager.sync_mode_from_environment(sys.argv)
     app = QApplication(sys.argv)
-    window = LotteryApp()
-    window.setWindowIcon(QIcon('./cat.ico'))
+    with startup_profiler.phase("main_window"):
+        window = LotteryApp(sync_mode)
+        window.setWindowIcon(QIcon('./cat.ico'))
+    profiler = startup_profiler.get_profiler()
+    if profiler is not None:
+        profiler.watch_first_paint(window)
     window.show()
     sys.exit(app.exec())
@@ -0,0 +1,10 @@
+"""抽奖助手基准测试
+
+覆盖数据管理层的增删改查和查询、批量导入、中奖概率页面的加载和完整的抽奖场次，
+在1千到100万用户的临时数据库上运行，结果与保存的基准比较以发现性能回退
+
+用法示例:
+    python -m benchmarks --sizes 1k,10k --output bench.json
+    python -m benchmarks --cases importer,lottery --sizes 100k
+    python -m benchmarks --save-baseline
+"""
@@ -0,0 +1,220 @@
+"""基准测试用例
+
+每个用例是一个函数，参数为BenchmarkContext，只有在ctx.timed()中的代码计入耗时，
+准备数据和关闭连接不计入；会修改数据库的用例每次运行都使用基础数据库的新副本
+"""
+from typing import Callable, Dict, Any, List
+
+
+# 用例名称到(用例函数, 是否修改数据库)
+CASES: Dict[str, tuple] = {}
+
+# 每个用例中重复操作的次数，与数据规模无关，便于比较不同规模下的单次耗时
+OPERATIONS = 200
+SEARCH_KEYWORDS = ["用户1", "用户23", "用户456", "用户7890", "不存在"]
+DRAW_ROUNDS = 50
+
+
+def benchmark(name: str, mutates: bool = False) -> Callable:
+    """注册基准测试用例
+    
+    Args:
+        name: 用例名称，按"模块.操作"命名
+        mutates: 用例是否修改数据库
+        
+    Returns:
+        装饰器
+    """
+    def decorator(func):
+        CASES[name] = (func, mutates)
+        return func
+    return decorator
+
+
+@benchmark("user_manager.crud", mutates=True)
+def user_manager_crud(ctx) -> Dict[str, Any]:
+    """逐条增加、修改、删除用户"""
+    from manager.user_manager import UserManager
+    
+    manager = UserManager(ctx.db_path)
+    try:
+        with ctx.timed():
+            ids = [manager.add_user(f"新用户{i}", f"N{i:07d}") for i in range(OPERATIONS)]
+            for user_id in ids:
+                manager.update_user(user_id, username="改名")
+            for user_id in ids:
+                manager.delete_user(user_id)
+    finally:
+        manager.close()
+    return {"operations": OPERATIONS * 3}
+
+
+@benchmark("user_manager.search")
+def user_manager_search(ctx) -> Dict[str, Any]:
+    """按用户名关键字统计并读取第一页，以及不带条件翻到最后一页"""
+    from manager.user_manager import UserManager
+    
+    manager = UserManager(ctx.db_path)
+    try:
+        with ctx.timed():
+            for keyword in SEARCH_KEYWORDS:
+                manager.count_users(keyword)
+                manager.get_users_page(0, 100, keyword)
+            manager.get_users_page(max(ctx.size - 100, 0), 100)
+    finally:
+        manager.close()
+    return {"operations": len(SEARCH_KEYWORDS) * 2 + 1}
+
+
+@benchmark("prize_manager.crud", mutates=True)
+def prize_manager_crud(ctx) -> Dict[str, Any]:
+    """逐条增加、修改、删除奖品"""
+    from manager.prize_manager import PrizeManager
+    
+    manager = PrizeManager(ctx.db_path)
+    try:
+        with ctx.timed():
+            ids = [manager.add_prize(f"新奖品{i}", "特等奖", 1) for i in range(OPERATIONS)]
+            for prize_id in ids:
+                manager.update_prize(prize_id, quantity=2)
+            for prize_id in ids:
+                manager.delete_prize(prize_id)
+    finally:
+        manager.close()
+    return {"operations": OPERATIONS * 3}
+
+
+@benchmark("prize_manager.query")
+def prize_manager_query(ctx) -> Dict[str, Any]:
+    """按每个排序列正序、倒序查询奖品，以及按名称关键字查询"""
+    from manager.prize_manager import PrizeManager
+    
+    manager = PrizeManager(ctx.db_path)
+    try:
+        with ctx.timed():
+            for column in manager.SORT_COLUMNS:
+                manager.query_prizes(sort_column=column)
+                manager.query_prizes(sort_column=column, descending=True)
+            manager.query_prizes(keyword="奖品1")
+    finally:
+        manager.close()
+    return {"operations": len(manager.SORT_COLUMNS) * 2 + 1, "prizes": ctx.prize_count}
+
+
+@benchmark("winner_manager.update", mutates=True)
+def winner_manager_update(ctx) -> Dict[str, Any]:
+    """逐条设置和修改用户的中奖设置"""
+    from manager.winner_manager import WinnerManager
+    
+    manager = WinnerManager(ctx.db_path)
+    step = max(ctx.size // OPERATIONS, 1)
+    user_ids = list(range(1, ctx.size + 1, step))[:OPERATIONS]
+    try:
+        with ctx.timed():
+            for user_id in user_ids:
+                if not manager.update_winner_by_user_id(user_id, 1, 1):
+                    manager.add_winner(user_id, 1, 1)
+            for user_id in user_ids:
+                manager.update_winner_by_user_id(user_id, 2)
+    finally:
+        manager.close()
+    return {"operations": len(user_ids) * 2}
+
+
+@benchmark("winner_manager.users_with_rules")
+def winner_manager_users_with_rules(ctx) -> Dict[str, Any]:
+    """查询全部用户及其中奖设置"""
+    from manager.winner_manager import WinnerManager
+    
+    manager = WinnerManager(ctx.db_path)
+    try:
+        with ctx.timed():
+            users = manager.get_users_with_rules()
+    finally:
+        manager.close()
+    return {"rows": len(users)}
+
+
+@benchmark("batch_importer.import_users", mutates=True)
+def batch_importer_import_users(ctx) -> Dict[str, Any]:
+    """把与数据规模相同行数的CSV文件导入空数据库"""
+    from main_logic.batch_importer import BatchImporter
+    
+    importer = BatchImporter(ctx.empty_db_path)
+    try:
+        with ctx.timed():
+            result = importer.import_users_from_csv(ctx.csv_path, workers=1)
+    finally:
+        importer.close()
+    return {"rows": result["success"]}
+
+
+@benchmark("batch_importer.dry_run_users")
+def batch_importer_dry_run_users(ctx) -> Dict[str, Any]:
+    """对已有全部用户的数据库预检同一个CSV文件，每行工号都已存在"""
+    from main_logic.batch_importer import BatchImporter
+    
+    importer = BatchImporter(ctx.db_path)
+    try:
+        with ctx.timed():
+            result = importer.import_users_from_csv(ctx.csv_path, dry_run=True)
+    finally:
+        importer.close()
+    return {"rows": result["parsed"]}
+
+
+@benchmark("batch_importer.sync_users", mutates=True)
+def batch_importer_sync_users(ctx) -> Dict[str, Any]:
+    """用与数据库相同的名单同步导入，没有任何变化"""
+    from main_logic.batch_importer import BatchImporter
+    
+    importer = BatchImporter(ctx.db_path)
+    try:
+        with ctx.timed():
+            result = importer.sync_users_from_csv(ctx.csv_path, workers=1)
+    finally:
+        importer.close()
+    return {"rows": result["unchanged"]}
+
+
+@benchmark("probability_view_model.get_all_users_with_probability")
+def probability_users(ctx) -> Dict[str, Any]:
+    """中奖概率页面加载全部用户"""
+    from view_models.probability_view_model import ProbabilityViewModel
+    
+    view_model = ProbabilityViewModel(ctx.db_path)
+    try:
+        with ctx.timed():
+            users = view_model.get_all_users_with_probability()
+    finally:
+        view_model.close()
+    return {"rows": len(users)}
+
+
+@benchmark("lottery_view_model.session", mutates=True)
+def lottery_session(ctx) -> Dict[str, Any]:
+    """完整的一场抽奖：加载数据、抽DRAW_ROUNDS轮并等待结果全部写入数据库"""
+    from view_models.lottery_view_model import LotteryViewModel
+    
+    with ctx.timed():
+        view_model = LotteryViewModel(ctx.db_path)
+        try:
+            view_model.set_total_rounds(DRAW_ROUNDS)
+            results = [view_model.draw_lottery() for _ in range(DRAW_ROUNDS)]
+        finally:
+            view_model.close()
+    return {"rounds": DRAW_ROUNDS, "winners": sum(1 for result in results if result)}
+
+
+def select_cases(patterns: List[str]) -> List[str]:
+    """按名称片段筛选用例
+    
+    Args:
+        patterns: 名称片段列表，为空时选中全部用例
+        
+    Returns:
+        选中的用例名称
+    """
+    if not patterns:
+        return list(CASES)
+    return [name for name in CASES if any(pattern in name for pattern in patterns)]
@@ -0,0 +1,335 @@
+"""基准测试运行器
+
+在临时目录中按每种数据规模生成数据库和导入文件，依次运行选中的用例，
+结果输出为JSON，并与保存的基准结果比较，耗时明显变长的用例视为性能回退
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import platform
+import statistics
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+from benchmarks.cases import CASES, select_cases
+
+
+DEFAULT_SIZES = "1k,10k,100k,1m"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# 耗时超过基准的这个比例才算回退
+DEFAULT_THRESHOLD = 0.25
+# 耗时变化小于这个毫秒数时不算回退，避免很快的用例被计时误差误判
+MIN_DELTA_MS = 5.0
+# 奖品数量随用户数增长，每多少个用户一种奖品
+USERS_PER_PRIZE = 100
+# 有中奖设置的用户比例
+RULE_RATIO = 0.01
+
+
+class BenchmarkContext:
+    """一次用例运行的环境
+    """
+    
+    def __init__(self, size: int, db_path: str, empty_db_path: str, csv_path: str, prize_count: int):
+        """初始化运行环境
+        
+        Args:
+            size: 用户数量
+            db_path: 本次运行使用的数据库路径
+            empty_db_path: 本次运行使用的空数据库路径（导入用例写入这里）
+            csv_path: 与数据库中用户相同的导入文件路径
+            prize_count: 奖品数量
+        """
+        self.size = size
+        self.db_path = db_path
+        self.empty_db_path = empty_db_path
+        self.csv_path = csv_path
+        self.prize_count = prize_count
+        self.elapsed: Optional[float] = None
+    
+    @contextmanager
+    def timed(self):
+        """计时，with块中的代码计入用例耗时
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.elapsed = time.perf_counter() - started
+
+
+def parse_size(text: str) -> int:
+    """解析数据规模，支持k、m后缀
+    
+    Args:
+        text: 如1k、100k、1m
+        
+    Returns:
+        用户数量
+    """
+    text = text.strip().lower()
+    multiplier = {"k": 1000, "m": 1000 * 1000}.get(text[-1:], 1)
+    return int(text[:-1] if multiplier > 1 else text) * multiplier
+
+
+def size_label(size: int) -> str:
+    """数据规模的显示名称，与parse_size相反
+    """
+    if size >= 1000 * 1000 and size % (1000 * 1000) == 0:
+        return f"{size // (1000 * 1000)}m"
+    if size >= 1000 and size % 1000 == 0:
+        return f"{size // 1000}k"
+    return str(size)
+
+
+def build_fixture(work_dir: str, size: int) -> Dict[str, Any]:
+    """生成一种数据规模的基础数据库、空数据库和导入文件
+    
+    数据是确定的，每次生成的内容相同：用户名为"用户N"，工号为"E"加七位序号，
+    每USERS_PER_PRIZE个用户一种奖品，每隔1/RULE_RATIO个用户有一条中奖设置
+    
+    Args:
+        work_dir: 临时目录
+        size: 用户数量
+        
+    Returns:
+        基础数据库路径、空数据库路径、导入文件路径和奖品数量
+    """
+    import csv
+    from manager.user_manager import UserManager
+    from manager.prize_manager import PrizeManager
+    from manager.result_manager import ResultManager
+    
+    label = size_label(size)
+    db_path = os.path.join(work_dir, f"base_{label}.db")
+    empty_db_path = os.path.join(work_dir, f"empty_{label}.db")
+    csv_path = os.path.join(work_dir, f"users_{label}.csv")
+    prize_count = max(size // USERS_PER_PRIZE, 10)
+    levels = ["一等奖", "二等奖", "三等奖", "参与奖"]
+    
+    # 由各管理类建表，基准测试的表结构与程序一致
+    for path in (db_path, empty_db_path):
+        for manager_class in (UserManager, PrizeManager, ResultManager):
+            manager_class(path).close()
+    
+    user_manager = UserManager(db_path)
+    prize_manager = PrizeManager(db_path)
+    try:
+        chunk = 50000
+        with user_manager.db.transaction():
+            for start in range(0, size, chunk):
+                user_manager.add_users([(f"用户{i}", f"E{i:07d}") for i in range(start, min(start + chunk, size))])
+            step = int(1 / RULE_RATIO)
+            user_manager.db.executemany(
+                "INSERT INTO winners (user_id, winning_probability, prize_id) VALUES (?, ?, ?)",
+                [(user_id, 1 + user_id % 2, None) for user_id in range(1, size + 1, step)]
+            )
+        # 奖品管理类使用自己的连接，在用户的事务提交后写入
+        prize_manager.add_prizes([
+            (f"奖品{i}", levels[i % len(levels)], 1 + i % 5) for i in range(prize_count)
+        ])
+    finally:
+        user_manager.close()
+        prize_manager.close()
+    
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "employee_id"])
+        writer.writerows((f"用户{i}", f"E{i:07d}") for i in range(size))
+    
+    return {"db_path": db_path, "empty_db_path": empty_db_path, "csv_path": csv_path, "prize_count": prize_count}
+
+
+def run_case(name: str, size: int, fixture: Dict[str, Any], work_dir: str, repeat: int) -> Dict[str, Any]:
+    """运行一个用例repeat次
+    
+    Args:
+        name: 用例名称
+        size: 用户数量
+        fixture: build_fixture生成的数据
+        work_dir: 临时目录
+        repeat: 运行次数
+        
+    Returns:
+        最短、中位耗时（毫秒），每次耗时和用例返回的指标
+    """
+    func, mutates = CASES[name]
+    timings = []
+    metrics = {}
+    for index in range(repeat):
+        db_path, empty_db_path = fixture["db_path"], fixture["empty_db_path"]
+        if mutates:
+            # 每次运行都从相同的数据开始
+            db_path = os.path.join(work_dir, f"run_{index}.db")
+            empty_db_path = os.path.join(work_dir, f"run_{index}_empty.db")
+            shutil.copyfile(fixture["db_path"], db_path)
+            shutil.copyfile(fixture["empty_db_path"], empty_db_path)
+        ctx = BenchmarkContext(size, db_path, empty_db_path, fixture["csv_path"], fixture["prize_count"])
+        try:
+            metrics = func(ctx) or {}
+        finally:
+            if mutates:
+                os.remove(db_path)
+                os.remove(empty_db_path)
+        timings.append(ctx.elapsed * 1000)
+    
+    return {
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "runs_ms": [round(value, 3) for value in timings],
+        "metrics": metrics
+    }
+
+
+def run_benchmarks(sizes: List[int], case_names: List[str], repeat: int, log=sys.stderr) -> Dict[str, Any]:
+    """在临时目录中运行基准测试
+    
+    Args:
+        sizes: 用户数量列表
+        case_names: 要运行的用例名称
+        repeat: 每个用例的运行次数
+        log: 输出运行进度的文本流
+        
+    Returns:
+        基准测试报告，results按"用例名称 -> 数据规模 -> 结果"组织
+    """
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": [size_label(size) for size in sizes],
+            "repeat": repeat
+        },
+        "results": {name: {} for name in case_names}
+    }
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="lottery_bench_") as work_dir:
+        # 批量导入类会在当前目录下创建模板目录，运行期间切换到临时目录
+        os.chdir(work_dir)
+        try:
+            for size in sizes:
+                label = size_label(size)
+                started = time.perf_counter()
+                fixture = build_fixture(work_dir, size)
+                log.write(f"[{label}] 生成数据 {time.perf_counter() - started:.1f}s\n")
+                for name in case_names:
+                    result = run_case(name, size, fixture, work_dir, repeat)
+                    report["results"][name][label] = result
+                    log.write(f"[{label}] {name}: {result['min_ms']:.1f} ms\n")
+                for key in ("db_path", "empty_db_path", "csv_path"):
+                    os.remove(fixture[key])
+        finally:
+            os.chdir(cwd)
+    return report
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+    """与基准结果比较
+    
+    以每个用例的最短耗时比较，耗时超过基准(1 + threshold)倍且多出MIN_DELTA_MS以上时算回退
+    
+    Args:
+        baseline: 基准报告
+        current: 本次报告
+        threshold: 允许变慢的比例
+        
+    Returns:
+        比较结果，包含每个用例每种规模的新旧耗时、变化和是否回退，以及回退的用例列表
+    """
+    changes = {}
+    regressions = []
+    for name, by_size in current["results"].items():
+        for label, result in by_size.items():
+            old = baseline.get("results", {}).get(name, {}).get(label)
+            if old is None:
+                continue
+            old_ms, new_ms = old["min_ms"], result["min_ms"]
+            regressed = new_ms > old_ms * (1 + threshold) and new_ms - old_ms > MIN_DELTA_MS
+            changes.setdefault(name, {})[label] = {
+                "old": old_ms,
+                "new": new_ms,
+                "delta": round(new_ms - old_ms, 3),
+                "ratio": round(new_ms / old_ms, 3) if old_ms > 0 else None,
+                "regressed": regressed
+            }
+            if regressed:
+                regressions.append(f"{name}@{label}")
+    return {"threshold": threshold, "changes": changes, "regressions": regressions}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器
+    
+    Returns:
+        参数解析器
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="抽奖助手基准测试")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"用户数量，用逗号分隔，默认{DEFAULT_SIZES}")
+    parser.add_argument("--cases", default="", help="只运行名称包含这些片段的用例，用逗号分隔")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例的运行次数，取最短耗时比较，默认3")
+    parser.add_argument("--output", help="结果输出文件路径，默认输出到标准输出")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="比较用的基准结果，默认benchmarks/baseline.json")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"耗时超过基准多少比例算回退，默认{DEFAULT_THRESHOLD}")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基准，不做比较")
+    parser.add_argument("--list", action="store_true", help="列出全部用例")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """基准测试入口
+    
+    Args:
+        argv: 命令行参数，默认使用sys.argv
+        
+    Returns:
+        退出码，有性能回退时为1
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.list:
+        for name, (func, mutates) in CASES.items():
+            print(f"{name}\t{func.__doc__}")
+        return 0
+    
+    case_names = select_cases([pattern.strip() for pattern in args.cases.split(",") if pattern.strip()])
+    if not case_names:
+        parser.error("没有匹配的用例")
+    if args.repeat <= 0:
+        parser.error("--repeat必须大于0")
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    
+    report = run_benchmarks(sizes, case_names, args.repeat)
+    exit_code = 0
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        sys.stderr.write(f"已保存基准结果: {args.baseline}\n")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            comparison = compare_results(json.load(f), report, args.threshold)
+        report["comparison"] = comparison
+        for name in comparison["regressions"]:
+            sys.stderr.write(f"性能回退: {name}\n")
+        exit_code = 1 if comparison["regressions"] else 0
+    
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        json.dump(report, output, ensure_ascii=False, indent=2)
+        output.write("\n")
+    finally:
+        if args.output:
+            output.close()
+    return exit_code
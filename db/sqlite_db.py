@@ -1,5 +1,6 @@
 import sqlite3
-from typing import Optional, List, Dict, Any
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterable, Iterator
 
 
 class SQLiteDB:
@@ -17,6 +18,7 @@ class SQLiteDB:
         """
         self.db_path = db_path
         self.connection: Optional[sqlite3.Connection] = None
+        self.in_transaction = False  # 在transaction()中时，execute不单独提交
     
     def connect(self) -> None:
         """连接数据库
@@ -52,9 +54,56 @@ class SQLiteDB:
         else:
             cursor.execute(sql)
         
-        self.connection.commit()
+        if not self.in_transaction:
+            self.connection.commit()
         return cursor
     
+    def executemany(self, sql: str, params_list: Iterable[tuple]) -> sqlite3.Cursor:
+        """用多组参数执行同一条SQL语句
+        
+        Args:
+            sql: SQL语句
+            params_list: 多组SQL参数
+            
+        Returns:
+            游标对象
+        """
+        if not self.connection:
+            self.connect()
+        
+        cursor = self.connection.cursor()
+        cursor.executemany(sql, params_list)
+        
+        if not self.in_transaction:
+            self.connection.commit()
+        return cursor
+    
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteDB"]:
+        """在一个事务中执行多条SQL语句
+        
+        with块中的execute不再逐条提交，正常结束时统一提交，出现异常时全部回滚
+        
+        Yields:
+            数据库对象本身
+        """
+        if not self.connection:
+            self.connect()
+        if self.in_transaction:
+            # 已经在事务中，由外层事务统一提交或回滚
+            yield self
+            return
+        
+        self.in_transaction = True
+        try:
+            yield self
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        finally:
+            self.in_transaction = False
+    
     def fetch_all(self, sql: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
         """获取所有查询结果
         
@@ -0,0 +1,335 @@
+"""抽奖助手命令行入口
+
+不依赖PyQt，直接使用数据管理层和抽奖引擎，用于彩排、服务器端抽奖和批量生成结果
+
+用法示例:
+    python -m lotteryassist draw --rounds 10 --format csv
+    python -m lotteryassist draw --batch 100 --seed 42 --output results.json
+    python -m lotteryassist export users users.csv.zst
+    python -m lotteryassist archive event.lotteryarchive
+"""
+import argparse
+import sys
+from typing import Optional, List, Dict, Any
+
+
+def _load_draw_data(db_path: str) -> Dict[str, Any]:
+    """从数据库加载抽奖所需的数据
+    
+    Args:
+        db_path: 数据库文件路径
+    
+    Returns:
+        包含users、prizes、winners、must_win_prizes的字典
+    """
+    from manager.user_manager import UserManager
+    from manager.prize_manager import PrizeManager
+    from manager.winner_manager import WinnerManager
+    
+    user_manager = UserManager(db_path)
+    prize_manager = PrizeManager(db_path)
+    winner_manager = WinnerManager(db_path)
+    try:
+        winners = {}
+        must_win_prizes = {}
+        for winner in winner_manager.get_all_winners():
+            winners[winner['user_id']] = winner['winning_probability']
+            if winner['prize_id']:
+                must_win_prizes[winner['user_id']] = winner['prize_id']
+        return {
+            'users': user_manager.get_all_users(),
+            'prizes': prize_manager.get_all_prizes(),
+            'winners': winners,
+            'must_win_prizes': must_win_prizes
+        }
+    finally:
+        user_manager.close()
+        prize_manager.close()
+        winner_manager.close()
+
+
+def _parse_levels(args: argparse.Namespace, prizes: List[Dict[str, Any]]) -> Optional[List[str]]:
+    """解析奖品等级抽取顺序参数
+    """
+    from main_logic.prize_pool import default_level_order
+    
+    if args.levels:
+        return [level.strip() for level in args.levels.replace("，", ",").split(",") if level.strip()]
+    if args.by_level:
+        return default_level_order(prizes)
+    return None
+
+
+def _run_draw(args: argparse.Namespace) -> int:
+    """执行draw子命令
+    """
+    from main_logic.draw_engine import DrawEngine
+    from main_logic.draw_random import DrawRandom, new_seed, spawn_seeds
+    from main_logic.session_replay import session_snapshot
+    
+    root_seed = args.seed if args.seed is not None else new_seed()
+    # 单场抽奖直接使用指定的种子，与界面中显示的场次种子含义一致；多场抽奖从根种子派生
+    seeds = [root_seed] if args.batch == 1 else spawn_seeds(root_seed, args.batch)
+    
+    result_manager = None
+    if args.commit:
+        from manager.result_manager import ResultManager
+        result_manager = ResultManager(args.db, sync_mode=args.sync)
+    
+    sessions = []
+    data = None
+    try:
+        for index, seed in enumerate(seeds):
+            # 写入数据库时每场都重新读取库存，彩排时各场使用相同的初始数据
+            if data is None or result_manager is not None:
+                if result_manager is not None:
+                    result_manager.ensure_flushed()
+                data = _load_draw_data(args.db)
+            
+            engine = DrawEngine(
+                data['users'], data['prizes'], data['winners'], data['must_win_prizes'],
+                total_rounds=args.rounds,
+                allow_duplicate_winners=not args.no_duplicates,
+                rng=DrawRandom(seed),
+                level_order=_parse_levels(args, data['prizes']),
+                prize_selection="weighted" if args.weighted else "uniform"
+            )
+            session_id = None
+            if result_manager is not None:
+                session_id = result_manager.create_session(seed, args.rounds, not args.no_duplicates,
+                                                           snapshot=session_snapshot(engine))
+            
+            results = []
+            while engine.current_round < engine.total_rounds:
+                result = engine.draw()
+                if result is None:
+                    continue
+                result = dict(result, round=engine.current_round)
+                results.append(result)
+                if result_manager is not None:
+                    result_manager.record_result(session_id, engine.current_round, result, engine.get_checkpoint())
+            if result_manager is not None:
+                result_manager.set_session_status(session_id, "finished")
+            
+            sessions.append({'session': index + 1, 'seed': seed, 'results': results})
+        if result_manager is not None:
+            result_manager.ensure_flushed()
+    finally:
+        if result_manager is not None:
+            result_manager.close()
+    
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            _write_csv(output, sessions)
+        else:
+            _write_json(output, root_seed, sessions)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+def _write_json(output, root_seed: int, sessions: List[Dict[str, Any]]) -> None:
+    """以JSON格式输出抽奖结果
+    """
+    import json
+    
+    json.dump({'seed': root_seed, 'sessions': sessions}, output, ensure_ascii=False, indent=2)
+    output.write("\n")
+
+
+def _write_csv(output, sessions: List[Dict[str, Any]]) -> None:
+    """以CSV格式输出抽奖结果，每个中奖结果一行
+    """
+    import csv
+    
+    writer = csv.writer(output)
+    writer.writerow(['session', 'seed', 'round', 'user_id', 'username', 'employee_id',
+                     'prize_id', 'prize_name', 'prize_level'])
+    for session in sessions:
+        for result in session['results']:
+            writer.writerow([
+                session['session'], session['seed'], result['round'], result['user_id'],
+                result['username'], result['employee_id'], result['prize_id'],
+                result['prize_name'], result['prize_level']
+            ])
+
+
+def _run_export(args: argparse.Namespace) -> int:
+    """执行export子命令
+    """
+    from main_logic.data_exporter import DataExporter
+    
+    def report(progress):
+        sys.stderr.write(f"\r已导出 {progress['rows']}/{progress['total']} 行")
+    
+    exporter = DataExporter(args.db)
+    try:
+        result = exporter.export(
+            args.dataset, args.output, fmt=args.format, compress=True if args.zstd else None,
+            progress_callback=None if args.quiet else report, session_id=args.session
+        )
+    finally:
+        exporter.close()
+    if not args.quiet:
+        sys.stderr.write(f"\n已导出 {result['rows']} 行到 {result['path']}\n")
+    return 0
+
+
+def _run_archive(args: argparse.Namespace) -> int:
+    """执行archive子命令
+    """
+    from main_logic.event_archive import EventArchive
+    
+    result = EventArchive(args.db).create(args.output)
+    for table, info in result['tables'].items():
+        sys.stderr.write(f"{table}: {info['rows']} 行\n")
+    sys.stderr.write(f"已归档到 {result['path']}\n")
+    return 0
+
+
+def _run_restore(args: argparse.Namespace) -> int:
+    """执行restore子命令
+    """
+    import os
+    from main_logic.event_archive import EventArchive
+    
+    if os.path.exists(args.db) and not args.replace:
+        sys.stderr.write(f"恢复会替换 {args.db} 中的全部活动数据，确认后请加上--replace参数\n")
+        return 1
+    try:
+        result = EventArchive(args.db).restore(args.archive)
+    except ValueError as e:
+        sys.stderr.write(f"恢复失败，数据库未修改: {e}\n")
+        return 1
+    for table, info in result['tables'].items():
+        sys.stderr.write(f"{table}: {info['rows']} 行\n")
+    sys.stderr.write(f"已从 {result['path']} 恢复到 {args.db}\n")
+    return 0
+
+
+def _run_verify(args: argparse.Namespace) -> int:
+    """执行verify子命令
+    """
+    import json
+    from manager.user_manager import UserManager
+    from manager.result_manager import ResultManager
+    from main_logic.session_replay import verify_session
+    
+    result_manager = ResultManager(args.db)
+    user_manager = UserManager(args.db)
+    try:
+        if args.session is not None:
+            session = result_manager.get_session_by_id(args.session)
+        else:
+            session = result_manager.get_latest_session()
+        if session is None:
+            sys.stderr.write("没有找到抽奖场次\n")
+            return 1
+        report = verify_session(
+            session,
+            result_manager.get_session_snapshots(session['id']),
+            user_manager.get_all_users(),
+            result_manager.get_results_by_session(session['id']),
+            result_manager.get_session_round(session['id'])
+        )
+    finally:
+        user_manager.close()
+        result_manager.close()
+    
+    json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    if report['verified']:
+        sys.stderr.write(f"场次 {report['session_id']} 验证一致，共 {report['recorded']} 条结果\n")
+        return 0
+    sys.stderr.write(f"场次 {report['session_id']} 验证不一致: {report['reason'] or '抽奖结果与重放结果不同'}\n")
+    return 1
+
+
+def _run_profile_compare(args: argparse.Namespace) -> int:
+    """执行profile-compare子命令
+    """
+    import json
+    from main_logic.startup_profiler import compare_reports
+    
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    json.dump(compare_reports(old, new, args.limit), sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器
+    
+    Returns:
+        参数解析器
+    """
+    parser = argparse.ArgumentParser(prog="lotteryassist", description="抽奖助手命令行工具（无界面）")
+    parser.add_argument("--db", default="lottery.db", help="数据库文件路径，默认lottery.db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    draw_parser = subparsers.add_parser("draw", help="执行抽奖")
+    draw_parser.add_argument("--rounds", type=int, default=10, help="每场抽奖的总轮次，默认10")
+    draw_parser.add_argument("--batch", type=int, default=1, help="连续抽奖的场次，默认1")
+    draw_parser.add_argument("--seed", type=int, help="随机种子，用于复现抽奖结果")
+    draw_parser.add_argument("--no-duplicates", action="store_true", help="不允许重复抽中相同人员")
+    draw_parser.add_argument("--by-level", action="store_true", help="按默认等级顺序依次抽奖")
+    draw_parser.add_argument("--levels", help="按指定等级顺序依次抽奖，用逗号分隔")
+    draw_parser.add_argument("--weighted", action="store_true", help="按剩余数量加权抽取奖品")
+    draw_parser.add_argument("--format", choices=("json", "csv"), default="json", help="输出格式，默认json")
+    draw_parser.add_argument("--output", help="输出文件路径，默认输出到标准输出")
+    draw_parser.add_argument("--commit", action="store_true",
+                             help="将结果写入数据库并扣减奖品库存，默认只做彩排不修改数据库")
+    draw_parser.add_argument("--sync", choices=("off", "normal", "full"), default="normal",
+                             help="写入数据库时的同步策略，默认normal")
+    draw_parser.set_defaults(handler=_run_draw)
+    
+    export_parser = subparsers.add_parser("export", help="导出用户、奖品、中奖设置或抽奖结果")
+    export_parser.add_argument("dataset", choices=("users", "prizes", "rules", "results"), help="导出的数据")
+    export_parser.add_argument("output", help="导出文件路径，扩展名为.jsonl时导出JSON Lines，以.zst结尾时压缩")
+    export_parser.add_argument("--format", choices=("csv", "jsonl"), help="导出格式，默认按扩展名判断")
+    export_parser.add_argument("--zstd", action="store_true", help="用zstandard压缩，默认按扩展名判断")
+    export_parser.add_argument("--session", type=int, help="只导出指定场次的抽奖结果")
+    export_parser.add_argument("--quiet", action="store_true", help="不输出进度")
+    export_parser.set_defaults(handler=_run_export)
+    
+    archive_parser = subparsers.add_parser("archive", help="把全部活动数据打包成压缩归档，程序运行中也可以执行")
+    archive_parser.add_argument("output", help="归档文件路径")
+    archive_parser.set_defaults(handler=_run_archive)
+    
+    restore_parser = subparsers.add_parser("restore", help="从归档恢复全部活动数据")
+    restore_parser.add_argument("archive", help="归档文件路径")
+    restore_parser.add_argument("--replace", action="store_true", help="数据库已存在时，确认替换其中的全部活动数据")
+    restore_parser.set_defaults(handler=_run_restore)
+    
+    verify_parser = subparsers.add_parser("verify", help="按场次记录的种子和快照重新抽奖，验证数据库中的抽奖结果")
+    verify_parser.add_argument("session", type=int, nargs="?", help="场次ID，默认为最近的场次")
+    verify_parser.set_defaults(handler=_run_verify)
+    
+    compare_parser = subparsers.add_parser("profile-compare", help="比较两份启动分析报告")
+    compare_parser.add_argument("old", help="旧版本的启动分析报告")
+    compare_parser.add_argument("new", help="新版本的启动分析报告")
+    compare_parser.add_argument("--limit", type=int, default=20, help="最多列出的导入耗时变化的模块数，默认20")
+    compare_parser.set_defaults(handler=_run_profile_compare)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口
+    
+    Args:
+        argv: 命令行参数，默认使用sys.argv
+    
+    Returns:
+        退出码
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "rounds", 1) <= 0 or getattr(args, "batch", 1) <= 0:
+        parser.error("--rounds和--batch必须大于0")
+    return args.handler(args)
@@ -0,0 +1,99 @@
+import threading
+from typing import Optional, List, Dict, Any
+
+
+class AnimationFeed:
+    """抽奖动画的预渲染显示队列
+    
+    后台线程从人员和奖品快照中随机组合出显示文字，写入固定容量的环形缓冲区，
+    界面定时器每次只取出一条现成的文字，每帧的开销与人员和奖品数量无关
+    """
+    
+    def __init__(self, rng, capacity: int = 256):
+        """初始化动画显示队列
+        
+        Args:
+            rng: 动画专用的随机数生成器，与真实抽奖互不干扰
+            capacity: 环形缓冲区容量（帧数）
+        """
+        self.rng = rng
+        self.capacity = capacity
+        self._buffer: List[Optional[str]] = [None] * capacity
+        self._read = 0  # 下一个读取位置
+        self._count = 0  # 缓冲区中未读取的帧数
+        self._last_text: Optional[str] = None
+        self._condition = threading.Condition()
+        self._generation = 0  # 每次开始动画加1，旧的后台线程发现不一致后退出
+        self._producer: Optional[threading.Thread] = None
+    
+    def start(self, users: List[Dict[str, Any]], prizes: List[Dict[str, Any]]) -> bool:
+        """开始生成动画帧
+        
+        Args:
+            users: 参与动画显示的人员
+            prizes: 参与动画显示的奖品
+        
+        Returns:
+            是否有可显示的内容
+        """
+        self.stop()
+        if not users or not prizes:
+            return False
+        
+        with self._condition:
+            self._generation += 1
+            self._read = 0
+            self._count = 0
+            generation = self._generation
+        # 第一帧直接生成，开始动画时立即有内容显示
+        self._last_text = self._render(users, prizes)
+        self._producer = threading.Thread(
+            target=self._produce, args=(users, prizes, generation), name="AnimationFeed", daemon=True
+        )
+        self._producer.start()
+        return True
+    
+    def stop(self) -> None:
+        """停止生成动画帧，不等待后台线程退出
+        """
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+        self._producer = None
+    
+    def next_text(self) -> Optional[str]:
+        """取出下一帧显示文字，复杂度O(1)，不会阻塞
+        
+        后台线程来不及生成时返回上一帧的文字
+        
+        Returns:
+            显示文字，尚未开始动画时返回None
+        """
+        with self._condition:
+            if self._count:
+                self._last_text = self._buffer[self._read]
+                self._buffer[self._read] = None
+                self._read = (self._read + 1) % self.capacity
+                self._count -= 1
+                self._condition.notify()
+            return self._last_text
+    
+    def _render(self, users: List[Dict[str, Any]], prizes: List[Dict[str, Any]]) -> str:
+        """随机组合出一帧显示文字
+        """
+        user = self.rng.choice(users)
+        prize = self.rng.choice(prizes)
+        return f"中奖人: {user['username']}\n奖品: {prize['name']}"
+    
+    def _produce(self, users: List[Dict[str, Any]], prizes: List[Dict[str, Any]], generation: int) -> None:
+        """后台线程，缓冲区有空位时生成新的帧
+        """
+        while True:
+            text = self._render(users, prizes)
+            with self._condition:
+                while self._count == self.capacity and self._generation == generation:
+                    self._condition.wait()
+                if self._generation != generation:
+                    return
+                self._buffer[(self._read + self._count) % self.capacity] = text
+                self._count += 1
@@ -1,10 +1,312 @@
 import os
-import csv
-from typing import List, Dict, Any
+import time
+import codecs
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Callable, Iterator, List, Dict, Any, Tuple
 from db.sqlite_db import SQLiteDB
 from manager.user_manager import UserManager
 from manager.prize_manager import PrizeManager
-from charset_normalizer import from_bytes
+
+
+class _ImportCancelled(Exception):
+    """导入被取消，用于回滚当前这一批
+    """
+
+
+def _validate_user(row: Dict[str, str]) -> Tuple[str, str]:
+    """校验一行用户数据
+    
+    Args:
+        row: 列名到内容的映射
+        
+    Returns:
+        (用户名, 工号)
+    """
+    username = (row.get("username") or "").strip()
+    employee_id = (row.get("employee_id") or "").strip()
+    
+    if not username:
+        raise ValueError("用户名不能为空")
+    
+    return username, employee_id
+
+
+def _validate_prize(row: Dict[str, str]) -> Tuple[str, str, int]:
+    """校验一行奖品数据，数量不是整数时按0导入
+    
+    Args:
+        row: 列名到内容的映射
+        
+    Returns:
+        (奖品名称, 奖品等级, 奖品数量)
+    """
+    name = (row.get("name") or "").strip()
+    level = (row.get("level") or "").strip()
+    quantity_str = (row.get("quantity") or "0").strip()
+    
+    if not name:
+        raise ValueError("奖品名称不能为空")
+    
+    if not level:
+        raise ValueError("奖品等级不能为空")
+    
+    try:
+        quantity = int(quantity_str)
+    except ValueError:
+        quantity = 0
+    
+    return name, level, quantity
+
+
+def _validate_sync_user(row: Dict[str, str]) -> Tuple[str, str]:
+    """校验一行同步导入的用户数据，同步按工号对比，工号不能为空
+    
+    Args:
+        row: 列名到内容的映射
+        
+    Returns:
+        (用户名, 工号)
+    """
+    username, employee_id = _validate_user(row)
+    if not employee_id:
+        raise ValueError("同步导入时工号不能为空")
+    return username, employee_id
+
+
+_VALIDATORS = {"users": _validate_user, "prizes": _validate_prize, "sync_users": _validate_sync_user}
+# 这些类型的合法数据前面带上行号
+_LINE_NUMBERED_KINDS = {"sync_users"}
+
+
+def _check_duplicates(kind: str, row: Dict[str, str], value: tuple, seen: set, existing: set) -> List[str]:
+    """检查一行合法数据中会导入但有问题的地方，并把它的键加入seen
+    
+    Args:
+        kind: 数据类型（users、prizes）
+        row: 列名到内容的映射
+        value: 校验后的数据
+        seen: 文件中已出现的键（工号，或奖品的(名称, 等级)）
+        existing: 数据库中已有的键
+        
+    Returns:
+        问题列表，没有问题时为空
+    """
+    errors = []
+    if kind == "users":
+        key = value[1]
+        if not key:
+            return errors
+        duplicate_in_file, duplicate_in_db = "文件中工号重复", "工号已存在"
+    else:
+        key = value[:2]
+        duplicate_in_file, duplicate_in_db = "文件中奖品重复", "奖品已存在"
+        quantity = (row.get("quantity") or "0").strip()
+        if not quantity.isdigit():
+            errors.append("奖品数量不是有效的非负整数")
+    
+    if key in seen:
+        errors.append(duplicate_in_file)
+    elif key in existing:
+        errors.append(duplicate_in_db)
+    seen.add(key)
+    return errors
+
+
+def _read_records(reader, limit: Optional[int] = None) -> List[Tuple[int, List[str]]]:
+    """从csv.reader中读取至多limit行，跳过空行
+    
+    Args:
+        reader: csv.reader对象
+        limit: 最多读取的行数，为空时读取全部
+        
+    Returns:
+        (行号, 字段列表)列表，行号从1开始，包含表头行
+    """
+    records = []
+    for fields in reader:
+        if fields:
+            records.append((reader.line_num, fields))
+            if limit is not None and len(records) >= limit:
+                break
+    return records
+
+
+def _validate_records(kind: str, header: List[str], records: List[Tuple[int, List[str]]]) -> Tuple[list, List[Dict[str, Any]]]:
+    """校验一批数据
+    
+    Args:
+        kind: 数据类型（users、prizes）
+        header: 表头列名
+        records: (行号, 字段列表)列表
+        
+    Returns:
+        (合法数据列表, 失败记录列表)，失败记录包含line、row和error
+    """
+    validate = _VALIDATORS[kind]
+    with_line = kind in _LINE_NUMBERED_KINDS
+    values = []
+    rejected = []
+    for line, fields in records:
+        row = dict(zip(header, fields))
+        try:
+            value = validate(row)
+            values.append((line,) + value if with_line else value)
+        except Exception as e:
+            rejected.append({"line": line, "row": row, "error": str(e)})
+    return values, rejected
+
+
+def _read_blocks(source: "_CsvLineSource", block_size: int) -> Iterator[Tuple[bytes, int]]:
+    """按记录边界把文件切成块
+    
+    每块读取约block_size字节并补齐到行尾，块中引号个数为奇数时说明最后一条记录还没结束，
+    继续读取直到引号成对
+    
+    Args:
+        source: 按字节定位的CSV文件
+        block_size: 每块的大致字节数
+        
+    Yields:
+        (块内容, 块中的物理行数)
+    """
+    file = source.file
+    while True:
+        block = file.read(block_size)
+        if not block:
+            return
+        block += file.readline()
+        while block.count(b'"') % 2:
+            line = file.readline()
+            if not line:
+                break
+            block += line
+        source.offset += len(block)
+        yield block, block.count(b"\n")
+
+
+def _parse_block(kind: str, header: List[str], encoding: str, block: bytes,
+                 first_line: int) -> Tuple[int, list, List[Dict[str, Any]]]:
+    """解析校验一块数据，在子进程中执行
+    
+    Args:
+        kind: 数据类型（users、prizes）
+        header: 表头列名
+        encoding: 文件编码
+        block: 块内容
+        first_line: 块第一行在文件中的行号
+        
+    Returns:
+        (这一块的行数, 合法数据列表, 失败记录列表)，失败记录中的行号是文件中的行号
+    """
+    import io
+    import csv
+    
+    reader = csv.reader(io.StringIO(block.decode(encoding), newline=""))
+    records = [(first_line + line - 1, fields) for line, fields in _read_records(reader)]
+    values, rejected = _validate_records(kind, header, records)
+    return len(records), values, rejected
+
+
+class _CsvLineSource:
+    """按行读取CSV文件，并记录已读取的字节数
+    
+    csv.reader每解析完一条记录就停止读取，因此每条记录之后offset就是下一条记录的起始位置；
+    UTF-16等换行符不是单字节的编码无法按字节定位，这时offset为None
+    """
+    
+    def __init__(self, path: str, encoding: str, offset: int = 0):
+        """打开CSV文件
+        
+        Args:
+            path: 文件路径
+            encoding: 文件编码
+            offset: 从这个字节位置开始读取
+        """
+        encoder = codecs.getincrementalencoder(encoding)()
+        encoder.encode("a")
+        self.seekable = encoder.encode("\n") == b"\n"
+        if self.seekable:
+            self.file = open(path, "rb")
+            self.file.seek(offset)
+            self.offset = offset
+            self.encoding = encoding
+        else:
+            self.file = open(path, "r", encoding=encoding, newline="")
+            self.offset = None
+    
+    def seek(self, offset: int) -> None:
+        """从指定的字节位置继续读取，之前创建的csv.reader不能再使用
+        
+        Args:
+            offset: 字节位置，须是某条记录的起始位置
+        """
+        self.file.seek(offset)
+        self.offset = offset
+    
+    def __iter__(self):
+        """逐行返回解码后的内容，保留行尾的换行符
+        """
+        if not self.seekable:
+            yield from self.file
+            return
+        # 换行符是单字节的编码中，多字节字符不会包含换行符，每行可以单独解码
+        for line in iter(self.file.readline, b""):
+            self.offset += len(line)
+            yield line.decode(self.encoding)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+
+
+class _RejectsWriter:
+    """把导入失败的行写入拒绝文件，第一次有失败的行时才创建文件
+    """
+    
+    def __init__(self, path: str, append: bool = False):
+        """初始化拒绝文件
+        
+        Args:
+            path: 拒绝文件路径
+            append: 为True且文件已存在时追加写入（继续上次中断的导入）
+        """
+        self.path = path
+        self.append = append
+        self.path_written = None
+        self._file = None
+        self._writer = None
+    
+    def write(self, header: List[str], rejected: List[Dict[str, Any]]) -> None:
+        """写入失败的行
+        
+        Args:
+            header: 导入文件的表头
+            rejected: 失败记录列表
+        """
+        if not rejected:
+            return
+        if self._writer is None:
+            import csv
+            append = self.append and os.path.exists(self.path)
+            # 带BOM，用Excel打开时中文不会乱码；追加写入时不会重复写BOM
+            self._file = open(self.path, "a" if append else "w", newline="", encoding="utf-8-sig")
+            self._writer = csv.writer(self._file)
+            if not append:
+                self._writer.writerow(["line"] + header + ["error"])
+            self.path_written = self.path
+        for record in rejected:
+            row = record["row"]
+            self._writer.writerow([record["line"]] + [row.get(name, "") for name in header] + [record["error"]])
+    
+    def close(self) -> None:
+        """关闭拒绝文件
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
 
 
 class BatchImporter:
@@ -13,6 +315,35 @@ class BatchImporter:
     用于生成批量导入模板和批量导入数据
     """
     
+    # 每批导入的行数，每批在一个事务中提交
+    CHUNK_SIZE = 5000
+    # 导入结果中最多保留的失败记录数，全部失败的行写入拒绝文件
+    MAX_FAILED_RECORDS = 100
+    # 文件不小于此大小时自动使用多进程解析校验
+    PARALLEL_MIN_SIZE = 32 * 1024 * 1024
+    # 多进程解析时每块的大致字节数，每块在一个事务中写入
+    PARALLEL_BLOCK_SIZE = 1024 * 1024
+    
+    # 编码检测只读取文件开头的这部分内容
+    ENCODING_SAMPLE_SIZE = 64 * 1024
+    # 检测结果的混乱度高于此值时认为不可信
+    ENCODING_MAX_CHAOS = 0.2
+    # 检测不可信时尝试的编码，覆盖GBK，常见于Excel导出的中文CSV
+    FALLBACK_ENCODING = "gb18030"
+    
+    # 带BOM的编码，UTF-32的BOM以UTF-16的BOM开头，需要先判断
+    _BOM_ENCODINGS = [
+        (codecs.BOM_UTF32_LE, "utf-32"),
+        (codecs.BOM_UTF32_BE, "utf-32"),
+        (codecs.BOM_UTF8, "utf-8-sig"),
+        (codecs.BOM_UTF16_LE, "utf-16"),
+        (codecs.BOM_UTF16_BE, "utf-16"),
+    ]
+    
+    # 文件指纹（路径、大小、修改时间）到编码的缓存，所有导入对象共用
+    _encoding_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+    _ENCODING_CACHE_SIZE = 64
+    
     def __init__(self, db_path: str):
         """初始化批量导入导出类
         
@@ -24,6 +355,28 @@ class BatchImporter:
         self.prize_manager = PrizeManager(db_path)
         self.template_dir = "template"
         self._ensure_template_dir()
+        self._init_checkpoint_table()
+    
+    def _init_checkpoint_table(self) -> None:
+        """初始化导入检查点表
+        
+        每个文件每种数据类型一条检查点，记录文件指纹和已提交到的位置，与每批数据在同一事务中更新
+        """
+        columns = {
+            "kind": "TEXT NOT NULL",
+            "path": "TEXT NOT NULL",
+            "size": "INTEGER NOT NULL",
+            "mtime_ns": "INTEGER NOT NULL",
+            "offset": "INTEGER NOT NULL",
+            "line_num": "INTEGER NOT NULL",
+            "parsed": "INTEGER NOT NULL",
+            "success": "INTEGER NOT NULL",
+            "failed": "INTEGER NOT NULL",
+            "updated_at": "TEXT"
+        }
+        db = self.user_manager.db
+        db.create_table("import_checkpoints", columns)
+        db.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_import_checkpoints_file ON import_checkpoints (kind, path)")
     
     def _ensure_template_dir(self) -> None:
         """确保模板目录存在
@@ -34,19 +387,74 @@ class BatchImporter:
     def _detect_encoding(self, file_path: str) -> str:
         """检测文件编码
         
+        只读取文件开头的一部分：有BOM时直接按BOM确定编码，能按UTF-8解码时使用UTF-8，
+        否则用charset_normalizer检测，检测结果不可信时尝试GB18030；
+        同一个文件（路径、大小、修改时间都相同）只检测一次
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            检测到的编码
+        """
+        fingerprint = self._file_fingerprint(file_path)
+        encoding = self._encoding_cache.get(fingerprint)
+        if encoding is None:
+            with open(file_path, 'rb') as f:
+                sample = f.read(self.ENCODING_SAMPLE_SIZE)
+            # 样本截断在多字节字符中间时会误判，只保留完整的行
+            if fingerprint[1] > len(sample) and b"\n" in sample:
+                sample = sample[:sample.rindex(b"\n") + 1]
+            encoding = self._detect_sample_encoding(sample)
+            self._encoding_cache[fingerprint] = encoding
+            if len(self._encoding_cache) > self._ENCODING_CACHE_SIZE:
+                self._encoding_cache.popitem(last=False)
+        return encoding
+    
+    @staticmethod
+    def _file_fingerprint(file_path: str) -> Tuple[str, int, int]:
+        """文件指纹，路径、大小、修改时间都相同时认为是同一个文件
+        
         Args:
             file_path: 文件路径
             
+        Returns:
+            (绝对路径, 文件大小, 修改时间（纳秒）)
+        """
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
+    
+    def _detect_sample_encoding(self, sample: bytes) -> str:
+        """根据文件开头的内容检测编码
+        
+        Args:
+            sample: 文件开头的内容
+            
         Returns:
             检测到的编码
         """
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            result = from_bytes(content).best()
-            if result:
-                return result.encoding
+        for bom, encoding in self._BOM_ENCODINGS:
+            if sample.startswith(bom):
+                return encoding
+        
+        try:
+            sample.decode("utf-8")
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+        
+        # 编码检测库导入较慢，只在真正需要时才加载
+        from charset_normalizer import from_bytes
         
-        return 'utf-8'
+        result = from_bytes(sample).best()
+        if result and result.chaos <= self.ENCODING_MAX_CHAOS:
+            return result.encoding
+        
+        try:
+            sample.decode(self.FALLBACK_ENCODING)
+            return self.FALLBACK_ENCODING
+        except UnicodeDecodeError:
+            return result.encoding if result else "utf-8"
     
     def generate_user_template(self) -> str:
         """生成用户批量导入模板
@@ -54,6 +462,8 @@ class BatchImporter:
         Returns:
             模板文件路径
         """
+        import csv
+        
         template_path = os.path.join(self.template_dir, "user_template.csv")
         
         # 模板列名
@@ -79,6 +489,8 @@ class BatchImporter:
         Returns:
             模板文件路径
         """
+        import csv
+        
         template_path = os.path.join(self.template_dir, "prize_template.csv")
         
         # 模板列名
@@ -98,107 +510,529 @@ class BatchImporter:
         
         return template_path
     
-    def import_users_from_csv(self, csv_path: str) -> Dict[str, Any]:
+    def import_users_from_csv(self, csv_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                              should_cancel: Optional[Callable[[], bool]] = None,
+                              workers: Optional[int] = None, dry_run: bool = False,
+                              resume: bool = True) -> Dict[str, Any]:
         """从CSV文件批量导入用户
         
         Args:
             csv_path: CSV文件路径
+            progress_callback: 每导入一批后调用，参数为导入进度
+            should_cancel: 返回True时停止导入，当前未提交的一批会回滚
+            workers: 解析校验用的进程数，1为不使用多进程，为空时按文件大小自动决定
+            dry_run: 为True时只检查文件，不写入数据库，见_dry_run_csv
+            resume: 同一文件上次导入中断时，是否从中断处继续，为False时丢弃检查点从头导入
             
         Returns:
             导入结果，包含成功和失败的数量
         """
-        success_count = 0
-        failed_count = 0
+        if dry_run:
+            return self._dry_run_csv(csv_path, "users", progress_callback, should_cancel)
+        return self._import_csv(csv_path, "users", progress_callback, should_cancel, workers, resume)
+    
+    def import_prizes_from_csv(self, csv_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                               should_cancel: Optional[Callable[[], bool]] = None,
+                               workers: Optional[int] = None, dry_run: bool = False,
+                               resume: bool = True) -> Dict[str, Any]:
+        """从CSV文件批量导入奖品
+        
+        Args:
+            csv_path: CSV文件路径
+            progress_callback: 每导入一批后调用，参数为导入进度
+            should_cancel: 返回True时停止导入，当前未提交的一批会回滚
+            workers: 解析校验用的进程数，1为不使用多进程，为空时按文件大小自动决定
+            dry_run: 为True时只检查文件，不写入数据库，见_dry_run_csv
+            resume: 同一文件上次导入中断时，是否从中断处继续，为False时丢弃检查点从头导入
+            
+        Returns:
+            导入结果，包含成功和失败的数量
+        """
+        if dry_run:
+            return self._dry_run_csv(csv_path, "prizes", progress_callback, should_cancel)
+        return self._import_csv(csv_path, "prizes", progress_callback, should_cancel, workers, resume)
+    
+    def _import_csv(self, csv_path: str, kind: str,
+                    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                    should_cancel: Optional[Callable[[], bool]] = None,
+                    workers: Optional[int] = None, resume: bool = True) -> Dict[str, Any]:
+        """流式导入CSV文件
+        
+        逐批读取并校验，每批合法的行用executemany在一个事务中写入；
+        不合法的行写入拒绝文件，内存中只保留前MAX_FAILED_RECORDS条，内存占用与文件大小无关
+        
+        每批提交时在同一事务中更新检查点（文件指纹、下一条记录的字节位置和已导入的数量），
+        导入被取消、出错或程序崩溃后再导入同一文件，直接定位到最后提交的一批之后继续，
+        之前的行不再解析也不会重复写入；全部导入完成后删除检查点。
+        UTF-16等无法按字节定位的编码不记录检查点
+        
+        Args:
+            csv_path: CSV文件路径
+            kind: 导入的数据类型（users、prizes）
+            progress_callback: 每提交一批后调用，参数为导入进度
+                （parsed、success、failed、rows_per_second），继续导入时包含之前已导入的数量
+            should_cancel: 返回True时停止导入，当前未提交的一批会回滚
+            workers: 解析校验用的进程数，1为不使用多进程，为空时按文件大小自动决定
+            resume: 有检查点时是否从检查点继续，为False时删除检查点从头导入
+            
+        Returns:
+            导入结果，包含成功和失败的数量（含之前已导入的）、是否被取消、是否从检查点继续，
+            有失败的行时还包含拒绝文件路径
+        """
+        import csv
+        
+        if kind == "users":
+            db, insert_rows = self.user_manager.db, self.user_manager.add_users
+        else:
+            db, insert_rows = self.prize_manager.db, self.prize_manager.add_prizes
+        
+        checkpoint = self.get_import_checkpoint(csv_path, kind) if resume else None
+        if checkpoint is None:
+            self.clear_import_checkpoint(csv_path, kind)
+            checkpoint = {"offset": 0, "line_num": 0, "parsed": 0, "success": 0, "failed": 0}
+        resumed = checkpoint["offset"] > 0
+        
+        success_count = checkpoint["success"]
+        failed_count = checkpoint["failed"]
+        parsed_count = checkpoint["parsed"]
         failed_records = []
+        cancelled = False
+        rejects = _RejectsWriter(self.rejects_path(csv_path), append=resumed)
+        started = time.perf_counter()
+        started_parsed = parsed_count
         
         try:
+            fingerprint = self._file_fingerprint(csv_path)
             # 检测文件编码
             encoding = self._detect_encoding(csv_path)
-            #print(f"检测到文件编码: {encoding}")
-            with open(csv_path, "r", encoding=encoding) as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    try:
-                        username = row.get("username", "").strip()
-                        employee_id = row.get("employee_id", "").strip()
-                        
-                        if not username:
-                            failed_records.append({"row": row, "error": "用户名不能为空"})
-                            failed_count += 1
-                            continue
-                        
-                        self.user_manager.add_user(username, employee_id)
-                        success_count += 1
+            with _CsvLineSource(csv_path, encoding) as source:
+                reader = csv.reader(source)
+                header = [name.strip() for name in next(reader, [])]
+                line_num = reader.line_num
+                if resumed and source.seekable:
+                    source.seek(checkpoint["offset"])
+                    reader = csv.reader(source)
+                    line_num = checkpoint["line_num"]
+                workers = self._resolve_workers(csv_path, workers)
+                if workers > 1 and source.seekable:
+                    batches = self._parallel_batches(kind, source, header, line_num, workers)
+                else:
+                    batches = self._sequential_batches(kind, source, reader, header, line_num - reader.line_num)
+                
+                try:
+                    for parsed, values, rejected, position in batches:
+                        if should_cancel and should_cancel():
+                            cancelled = True
+                            break
+                        try:
+                            with db.transaction():
+                                if values:
+                                    insert_rows(values)
+                                if position is not None:
+                                    self._save_import_checkpoint(db, kind, fingerprint, position, (
+                                        parsed_count + parsed, success_count + len(values), failed_count + len(rejected)
+                                    ))
+                                # 写入后再检查一次，取消时回滚这一批
+                                if should_cancel and should_cancel():
+                                    raise _ImportCancelled()
+                        except _ImportCancelled:
+                            # 这一批已回滚，不计入结果
+                            cancelled = True
+                            break
                         
-                    except Exception as e:
-                        failed_records.append({"row": row, "error": str(e)})
-                        failed_count += 1
-                        continue
+                        parsed_count += parsed
+                        success_count += len(values)
+                        failed_count += len(rejected)
+                        rejects.write(header, rejected)
+                        failed_records.extend(rejected[:self.MAX_FAILED_RECORDS - len(failed_records)])
+                        if progress_callback:
+                            elapsed = time.perf_counter() - started
+                            progress_callback({
+                                "parsed": parsed_count,
+                                "success": success_count,
+                                "failed": failed_count,
+                                "rows_per_second": (parsed_count - started_parsed) / elapsed if elapsed > 0 else 0.0
+                            })
+                finally:
+                    # 提前结束时停止后台解析
+                    batches.close()
+            
+            if not cancelled:
+                self.clear_import_checkpoint(csv_path, kind)
         
         except Exception as e:
-            return {"success": 0, "failed": 0, "error": str(e)}
+            # 出错之前已提交的批次保留在数据库中，检查点也保留，再次导入时从中断处继续
+            return {"success": success_count, "failed": failed_count, "error": str(e)}
+        finally:
+            rejects.close()
         
-        return {
+        result = {
             "success": success_count,
             "failed": failed_count,
-            "failed_records": failed_records
+            "failed_records": failed_records,
+            "cancelled": cancelled,
+            "resumed": resumed
         }
+        if rejects.path_written:
+            result["rejects_path"] = rejects.path_written
+        return result
     
-    def import_prizes_from_csv(self, csv_path: str) -> Dict[str, Any]:
-        """从CSV文件批量导入奖品
+    def get_import_checkpoint(self, csv_path: str, kind: str) -> Optional[Dict[str, Any]]:
+        """查询文件上次中断的导入的检查点
         
         Args:
             csv_path: CSV文件路径
+            kind: 导入的数据类型（users、prizes）
             
         Returns:
-            导入结果，包含成功和失败的数量
+            检查点（offset、line_num、parsed、success、failed、updated_at），
+            没有检查点或文件已被修改时返回None
+        """
+        path, size, mtime_ns = self._file_fingerprint(csv_path)
+        checkpoint = self.user_manager.db.fetch_one(
+            "SELECT offset, line_num, parsed, success, failed, updated_at FROM import_checkpoints "
+            "WHERE kind = ? AND path = ? AND size = ? AND mtime_ns = ?",
+            (kind, path, size, mtime_ns)
+        )
+        return checkpoint
+    
+    def clear_import_checkpoint(self, csv_path: str, kind: str) -> None:
+        """删除文件的导入检查点
+        
+        Args:
+            csv_path: CSV文件路径
+            kind: 导入的数据类型（users、prizes）
+        """
+        self.user_manager.db.execute(
+            "DELETE FROM import_checkpoints WHERE kind = ? AND path = ?", (kind, os.path.abspath(csv_path))
+        )
+    
+    @staticmethod
+    def _save_import_checkpoint(db: SQLiteDB, kind: str, fingerprint: Tuple[str, int, int],
+                                position: Tuple[int, int], counts: Tuple[int, int, int]) -> None:
+        """记录导入检查点，在写入这一批的事务中调用
+        
+        Args:
+            db: 写入这一批数据的数据库对象
+            kind: 导入的数据类型（users、prizes）
+            fingerprint: 文件指纹
+            position: (下一条记录的字节位置, 已读取到的行号)
+            counts: 到这一批为止(读取的行数, 成功数, 失败数)
+        """
+        db.execute(
+            "INSERT OR REPLACE INTO import_checkpoints "
+            "(kind, path, size, mtime_ns, offset, line_num, parsed, success, failed, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (kind,) + fingerprint + position + counts + (datetime.now().isoformat(timespec="seconds"),)
+        )
+    
+    def _dry_run_csv(self, csv_path: str, kind: str,
+                     progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     should_cancel: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """检查CSV文件导入后的结果，不写入数据库
+        
+        除了正式导入会拒绝的行（如名称为空），还检查文件中重复的、与数据库中已有数据重复的
+        工号（用户）或名称和等级（奖品），以及不是有效整数的奖品数量；这些行正式导入时仍会导入。
+        已有数据和文件中出现过的数据都放在集合中查找，检查速度与解析速度相当
+        
+        Args:
+            csv_path: CSV文件路径
+            kind: 导入的数据类型（users、prizes）
+            progress_callback: 每检查一批后调用，参数为检查进度（parsed、success、failed、rows_per_second）
+            should_cancel: 返回True时停止检查
+            
+        Returns:
+            检查结果：success为会导入的行数，failed为会被拒绝的行数，warnings为会导入但有问题的行数，
+            issues为每种问题的行数，有问题的行写入预检报告（见dry_run_path），rejects_path为报告路径
         """
+        import csv
+        
+        if kind == "users":
+            existing = self.user_manager.get_employee_ids()
+        else:
+            existing = self.prize_manager.get_prize_keys()
+        validate = _VALIDATORS[kind]
+        seen = set()
+        issues = {}
+        parsed_count = 0
         success_count = 0
         failed_count = 0
+        warning_count = 0
         failed_records = []
+        cancelled = False
+        # 预检报告与正式导入的拒绝文件分开，不会覆盖中断的导入已写入的拒绝文件
+        rejects = _RejectsWriter(self.dry_run_path(csv_path))
+        started = time.perf_counter()
         
         try:
-            # 检测文件编码
             encoding = self._detect_encoding(csv_path)
-            with open(csv_path, "r", encoding=encoding) as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    try:
-                        name = row.get("name", "").strip()
-                        level = row.get("level", "").strip()
-                        quantity_str = row.get("quantity", "0").strip()
-                        
-                        if not name:
-                            failed_records.append({"row": row, "error": "奖品名称不能为空"})
-                            failed_count += 1
-                            continue
-                        
-                        if not level:
-                            failed_records.append({"row": row, "error": "奖品等级不能为空"})
-                            failed_count += 1
-                            continue
-                        
+            with _CsvLineSource(csv_path, encoding) as source:
+                reader = csv.reader(source)
+                header = [name.strip() for name in next(reader, [])]
+                while True:
+                    if should_cancel and should_cancel():
+                        cancelled = True
+                        break
+                    records = _read_records(reader, self.CHUNK_SIZE)
+                    if not records:
+                        break
+                    
+                    problems = []
+                    for line, fields in records:
+                        row = dict(zip(header, fields))
                         try:
-                            quantity = int(quantity_str)
-                        except ValueError:
-                            quantity = 0
-                        
-                        self.prize_manager.add_prize(name, level, quantity)
-                        success_count += 1
-                        
-                    except Exception as e:
-                        failed_records.append({"row": row, "error": str(e)})
-                        failed_count += 1
-                        continue
+                            value = validate(row)
+                        except Exception as e:
+                            errors = [str(e)]
+                            failed_count += 1
+                        else:
+                            errors = _check_duplicates(kind, row, value, seen, existing)
+                            success_count += 1
+                            if errors:
+                                warning_count += 1
+                        for error in errors:
+                            issues[error] = issues.get(error, 0) + 1
+                        if errors:
+                            problems.append({"line": line, "row": row, "error": "；".join(errors)})
+                    
+                    parsed_count += len(records)
+                    rejects.write(header, problems)
+                    failed_records.extend(problems[:self.MAX_FAILED_RECORDS - len(failed_records)])
+                    if progress_callback:
+                        elapsed = time.perf_counter() - started
+                        progress_callback({
+                            "parsed": parsed_count,
+                            "success": success_count,
+                            "failed": failed_count,
+                            "rows_per_second": parsed_count / elapsed if elapsed > 0 else 0.0
+                        })
         
         except Exception as e:
-            return {"success": 0, "failed": 0, "error": str(e)}
+            return {"dry_run": True, "success": success_count, "failed": failed_count, "error": str(e)}
+        finally:
+            rejects.close()
         
-        return {
+        result = {
+            "dry_run": True,
+            "parsed": parsed_count,
             "success": success_count,
             "failed": failed_count,
-            "failed_records": failed_records
+            "warnings": warning_count,
+            "issues": issues,
+            "failed_records": failed_records,
+            "cancelled": cancelled
         }
+        if rejects.path_written:
+            result["rejects_path"] = rejects.path_written
+        return result
+    
+    def sync_users_from_csv(self, csv_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                            should_cancel: Optional[Callable[[], bool]] = None,
+                            workers: Optional[int] = None, dry_run: bool = False,
+                            max_deleted: Optional[int] = None) -> Dict[str, Any]:
+        """按工号把用户同步为CSV文件中的数据
+        
+        文件中的新工号会被添加，用户名有变化的会被修改，文件中没有的工号会被删除（连同中奖设置），
+        没有变化的用户不会被改动，已有的中奖设置保留；整个同步在一个事务中完成，取消或出错时不做任何修改。
+        文件中有失败的行（包括工号重复）时不会删除任何用户，以免表头或格式错误的文件清空名单
+        
+        Args:
+            csv_path: CSV文件路径
+            progress_callback: 每读取一批后调用，参数为读取进度（parsed、success、failed、rows_per_second）
+            should_cancel: 返回True时停止同步并回滚
+            workers: 解析校验用的进程数，1为不使用多进程，为空时按文件大小自动决定
+            dry_run: 只统计同步会发生的变化，不修改数据库，用于同步前确认
+            max_deleted: 最多允许删除的用户数（一般为预览时确认的数量），超过时拒绝同步
+            
+        Returns:
+            同步结果，包含inserted、updated、deleted、unchanged、failed的数量和是否被取消，
+            有失败的行时还包含拒绝文件路径；预览时同步会被拒绝的原因保存在refused中
+        """
+        import csv
+        
+        progress = {"parsed": 0, "success": 0, "failed": 0, "rows_per_second": 0.0}
+        failed_records = []
+        rejects = _RejectsWriter(self.dry_run_path(csv_path) if dry_run else self.rejects_path(csv_path))
+        started = time.perf_counter()
+        
+        def load_batches(batches, header):
+            for parsed, values, rejected, _ in batches:
+                if should_cancel and should_cancel():
+                    raise _ImportCancelled()
+                progress["parsed"] += parsed
+                progress["success"] += len(values)
+                progress["failed"] += len(rejected)
+                rejects.write(header, rejected)
+                failed_records.extend(rejected[:self.MAX_FAILED_RECORDS - len(failed_records)])
+                if progress_callback:
+                    elapsed = time.perf_counter() - started
+                    progress["rows_per_second"] = progress["parsed"] / elapsed if elapsed > 0 else 0.0
+                    progress_callback(dict(progress))
+                yield values
+        
+        def validate(sync_result):
+            # 工号重复的行同样写入拒绝文件，在修改数据库前写入，同步被拒绝时也能查看
+            duplicates = [
+                {"line": record["line"], "row": {"username": record["username"], "employee_id": record["employee_id"]},
+                 "error": "文件中工号重复"}
+                for record in sync_result.pop("duplicates")
+            ]
+            rejects.write(header, duplicates)
+            failed_records.extend(duplicates[:self.MAX_FAILED_RECORDS - len(failed_records)])
+            progress["failed"] += len(duplicates)
+            
+            refused = None
+            if sync_result["deleted"] > 0 and progress["failed"] > 0:
+                refused = (f"文件中有 {progress['failed']} 行失败，同步会删除 {sync_result['deleted']} 个用户，"
+                           f"已拒绝同步，请修正失败的行后重试")
+            elif max_deleted is not None and sync_result["deleted"] > max_deleted:
+                refused = (f"同步会删除 {sync_result['deleted']} 个用户，多于确认时的 {max_deleted} 个，"
+                           f"文件或用户数据可能已被修改，已拒绝同步")
+            if refused and not dry_run:
+                raise ValueError(refused)
+            sync_result["refused"] = refused
+        
+        try:
+            encoding = self._detect_encoding(csv_path)
+            with _CsvLineSource(csv_path, encoding) as source:
+                reader = csv.reader(source)
+                header = [name.strip() for name in next(reader, [])]
+                workers = self._resolve_workers(csv_path, workers)
+                if workers > 1 and source.seekable:
+                    batches = self._parallel_batches("sync_users", source, header, reader.line_num, workers)
+                else:
+                    batches = self._sequential_batches("sync_users", source, reader, header)
+                try:
+                    sync_result = self.user_manager.sync_users(load_batches(batches, header), dry_run=dry_run,
+                                                               validate=validate)
+                finally:
+                    batches.close()
+        
+        except _ImportCancelled:
+            return {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0,
+                    "failed": progress["failed"], "failed_records": failed_records, "cancelled": True}
+        except Exception as e:
+            result = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "failed": progress["failed"],
+                      "error": str(e)}
+            if rejects.path_written:
+                result["rejects_path"] = rejects.path_written
+            return result
+        finally:
+            rejects.close()
+        
+        result = dict(sync_result, failed=progress["failed"], failed_records=failed_records, cancelled=False,
+                      dry_run=dry_run)
+        if not dry_run:
+            result.pop("refused")
+        if rejects.path_written:
+            result["rejects_path"] = rejects.path_written
+        return result
+    
+    def _resolve_workers(self, csv_path: str, workers: Optional[int]) -> int:
+        """确定解析校验用的进程数
+        
+        Args:
+            csv_path: CSV文件路径
+            workers: 指定的进程数，为空时文件不小于PARALLEL_MIN_SIZE才使用多进程
+            
+        Returns:
+            进程数，1为不使用多进程
+        """
+        if workers is not None:
+            return max(workers, 1)
+        if os.path.getsize(csv_path) < self.PARALLEL_MIN_SIZE:
+            return 1
+        return os.cpu_count() or 1
+    
+    def _sequential_batches(self, kind: str, source: "_CsvLineSource", reader, header: List[str],
+                            line_base: int = 0) -> Iterator[Tuple[int, list, List[Dict[str, Any]], Optional[Tuple[int, int]]]]:
+        """在当前线程中逐批解析校验
+        
+        Args:
+            kind: 数据类型（users、prizes）
+            source: reader读取的CSV文件
+            reader: 已读过表头的csv.reader对象
+            header: 表头列名
+            line_base: reader的行号加上这个数才是文件中的行号（从文件中间开始读取时）
+            
+        Yields:
+            (这一批的行数, 合法数据列表, 失败记录列表, 这一批之后的(字节位置, 行号))，
+            无法按字节定位时位置为None
+        """
+        while True:
+            records = _read_records(reader, self.CHUNK_SIZE)
+            if not records:
+                return
+            if line_base:
+                records = [(line_base + line, fields) for line, fields in records]
+            values, rejected = _validate_records(kind, header, records)
+            position = (source.offset, line_base + reader.line_num) if source.seekable else None
+            yield len(records), values, rejected, position
+    
+    def _parallel_batches(self, kind: str, source: "_CsvLineSource", header: List[str], line_num: int,
+                          workers: int) -> Iterator[Tuple[int, list, List[Dict[str, Any]]]]:
+        """在多个进程中解析校验，按文件顺序返回结果
+        
+        当前进程按记录边界把文件切成块（引号成对时的换行才是记录边界，字段中的换行不会被切开），
+        各进程解析校验，结果按块的顺序交回当前进程写入；同时处理中的块不超过进程数的两倍
+        
+        Args:
+            kind: 数据类型（users、prizes）
+            source: 已读过表头的CSV文件
+            header: 表头列名
+            line_num: 表头所在的最后一行的行号
+            workers: 进程数
+            
+        Yields:
+            (这一块的行数, 合法数据列表, 失败记录列表, 这一块之后的(字节位置, 行号))
+        """
+        import multiprocessing
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # 导入可能在界面程序的后台线程中进行，多线程时fork不安全，使用spawn启动子进程
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        pending = deque()
+        try:
+            for block, block_lines in _read_blocks(source, self.PARALLEL_BLOCK_SIZE):
+                future = executor.submit(_parse_block, kind, header, source.encoding, block, line_num + 1)
+                line_num += block_lines
+                # 读取位置已经在后面的块，每块结束的位置随结果一起返回
+                pending.append((future, (source.offset, line_num)))
+                if len(pending) >= workers * 2:
+                    future, position = pending.popleft()
+                    yield future.result() + (position,)
+            while pending:
+                future, position = pending.popleft()
+                yield future.result() + (position,)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    @staticmethod
+    def rejects_path(csv_path: str) -> str:
+        """导入失败的行写入的拒绝文件路径，与导入文件放在同一目录
+        
+        Args:
+            csv_path: 导入的CSV文件路径
+            
+        Returns:
+            拒绝文件路径
+        """
+        root, _ = os.path.splitext(csv_path)
+        return f"{root}_rejects.csv"
+    
+    @staticmethod
+    def dry_run_path(csv_path: str) -> str:
+        """预检（只检查不导入）时有问题的行写入的报告路径，与导入文件放在同一目录
+        
+        Args:
+            csv_path: 导入的CSV文件路径
+            
+        Returns:
+            预检报告路径
+        """
+        root, _ = os.path.splitext(csv_path)
+        return f"{root}_dryrun.csv"
     
     def close(self) -> None:
         """关闭数据库连接
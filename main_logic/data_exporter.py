@@ -0,0 +1,252 @@
+import io
+import os
+import time
+from typing import Optional, Callable, Iterator, List, Dict, Any, Tuple
+from db.sqlite_db import SQLiteDB
+
+
+# 可导出的数据：数据名称到(依赖的表, 导出的列, FROM子句)，导出的列为(列表达式, 列名)
+# 用户和奖品的前几列与批量导入模板一致，导出的文件可以直接再导入
+_DATASETS = {
+    "users": ("users", [
+        ("username", "username"), ("employee_id", "employee_id"), ("id", "id")
+    ], "FROM users ORDER BY id"),
+    "prizes": ("prizes", [
+        ("name", "name"), ("level", "level"), ("quantity", "quantity"), ("id", "id")
+    ], "FROM prizes ORDER BY id"),
+    "rules": ("winners", [
+        ("u.username", "username"), ("u.employee_id", "employee_id"),
+        ("w.winning_probability", "winning_probability"),
+        ("p.name", "prize_name"), ("p.level", "prize_level"), ("w.user_id", "user_id"), ("w.prize_id", "prize_id")
+    ], "FROM winners w LEFT JOIN users u ON u.id = w.user_id LEFT JOIN prizes p ON p.id = w.prize_id "
+       "ORDER BY w.user_id"),
+    "results": ("draw_results", [
+        ("r.session_id", "session_id"), ("s.seed", "seed"), ("r.round", "round"),
+        ("r.username", "username"), ("r.employee_id", "employee_id"),
+        ("r.prize_name", "prize_name"), ("r.prize_level", "prize_level"), ("r.user_id", "user_id"),
+        ("r.prize_id", "prize_id"), ("r.stock_deducted", "stock_deducted"), ("r.created_at", "created_at")
+    ], "FROM draw_results r LEFT JOIN draw_sessions s ON s.id = r.session_id"),
+}
+
+
+class DataExporter:
+    """批量导出类
+    
+    用游标逐批读取数据并写入文件，内存中只保留一批数据，导出百万行时内存占用也不会增长；
+    支持CSV和JSON Lines两种格式，可以用zstandard压缩
+    """
+    
+    DATASETS = tuple(_DATASETS)
+    FORMATS = ("csv", "jsonl")
+    # 每次从游标读取的行数
+    FETCH_SIZE = 2000
+    # zstandard压缩级别，3是速度和压缩率的折中
+    ZSTD_LEVEL = 3
+    
+    def __init__(self, db_path: str):
+        """初始化批量导出类
+        
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db = SQLiteDB(db_path)
+    
+    @classmethod
+    def resolve_format(cls, output_path: str, fmt: Optional[str] = None,
+                       compress: Optional[bool] = None) -> Tuple[str, bool]:
+        """确定导出格式和是否压缩，未指定时按文件扩展名判断
+        
+        Args:
+            output_path: 导出文件路径，如users.csv、results.jsonl.zst
+            fmt: 导出格式（csv、jsonl）
+            compress: 是否用zstandard压缩
+            
+        Returns:
+            (导出格式, 是否压缩)
+        """
+        root, ext = os.path.splitext(output_path.lower())
+        if compress is None:
+            compress = ext == ".zst"
+        if ext == ".zst":
+            ext = os.path.splitext(root)[1]
+        if fmt is None:
+            fmt = "jsonl" if ext in (".jsonl", ".json") else "csv"
+        if fmt not in cls.FORMATS:
+            raise ValueError(f"不支持的导出格式: {fmt}")
+        return fmt, compress
+    
+    def export(self, dataset: str, output_path: str, fmt: Optional[str] = None, compress: Optional[bool] = None,
+               progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+               should_cancel: Optional[Callable[[], bool]] = None,
+               session_id: Optional[int] = None) -> Dict[str, Any]:
+        """导出数据到文件
+        
+        先写入临时文件，全部写完后再替换目标文件，取消或出错时不会留下不完整的文件
+        
+        Args:
+            dataset: 导出的数据（users、prizes、rules、results）
+            output_path: 导出文件路径
+            fmt: 导出格式（csv、jsonl），为空时按扩展名判断
+            compress: 是否用zstandard压缩，为空时扩展名为.zst才压缩
+            progress_callback: 每写入一批后调用，参数为导出进度（rows、total、rows_per_second）
+            should_cancel: 返回True时停止导出
+            session_id: 只导出这个场次的抽奖结果，只对results有效
+            
+        Returns:
+            导出结果，包含导出的行数、文件路径、格式、是否压缩和是否被取消
+        """
+        if dataset not in _DATASETS:
+            raise ValueError(f"不支持导出的数据: {dataset}")
+        fmt, compress = self.resolve_format(output_path, fmt, compress)
+        
+        total = self.count(dataset, session_id)
+        rows = 0
+        cancelled = False
+        started = time.perf_counter()
+        temp_path = output_path + ".part"
+        
+        try:
+            with self._open_output(temp_path, fmt, compress) as output:
+                batches = self._iter_batches(dataset, session_id)
+                columns = next(batches)
+                write_batch = self._csv_writer(output, columns) if fmt == "csv" else self._jsonl_writer(output, columns)
+                for batch in batches:
+                    if should_cancel and should_cancel():
+                        cancelled = True
+                        break
+                    write_batch(batch)
+                    rows += len(batch)
+                    if progress_callback:
+                        elapsed = time.perf_counter() - started
+                        progress_callback({
+                            "rows": rows,
+                            "total": total,
+                            "rows_per_second": rows / elapsed if elapsed > 0 else 0.0
+                        })
+            if cancelled:
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        return {
+            "dataset": dataset,
+            "path": output_path,
+            "format": fmt,
+            "compressed": compress,
+            "rows": rows,
+            "cancelled": cancelled
+        }
+    
+    def count(self, dataset: str, session_id: Optional[int] = None) -> int:
+        """统计要导出的行数
+        
+        Args:
+            dataset: 导出的数据（users、prizes、rules、results）
+            session_id: 只统计这个场次的抽奖结果，只对results有效
+            
+        Returns:
+            行数，数据表不存在时为0
+        """
+        table = _DATASETS[dataset][0]
+        if not self._table_exists(table):
+            return 0
+        if dataset == "results" and session_id is not None:
+            row = self.db.fetch_one("SELECT COUNT(*) AS cnt FROM draw_results WHERE session_id = ?", (session_id,))
+        else:
+            row = self.db.fetch_one(f"SELECT COUNT(*) AS cnt FROM {table}")
+        return row["cnt"]
+    
+    def _table_exists(self, table: str) -> bool:
+        """数据表是否存在，抽奖结果表在第一次抽奖前可能还没有创建
+        """
+        row = self.db.fetch_one("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return row is not None
+    
+    def _iter_batches(self, dataset: str, session_id: Optional[int] = None) -> Iterator[Any]:
+        """逐批读取要导出的数据
+        
+        Args:
+            dataset: 导出的数据
+            session_id: 只读取这个场次的抽奖结果
+            
+        Yields:
+            第一次返回列名列表，之后每次返回一批数据行
+        """
+        table, columns, from_clause = _DATASETS[dataset]
+        yield [name for _, name in columns]
+        if not self._table_exists(table):
+            return
+        
+        sql = "SELECT " + ", ".join(f"{expression} AS {name}" for expression, name in columns) + " " + from_clause
+        params = ()
+        if dataset == "results":
+            if session_id is not None:
+                sql += " WHERE r.session_id = ?"
+                params = (session_id,)
+            sql += " ORDER BY r.session_id, r.round, r.id"
+        
+        cursor = self.db.execute(sql, params)
+        while True:
+            batch = cursor.fetchmany(self.FETCH_SIZE)
+            if not batch:
+                return
+            yield batch
+    
+    def _open_output(self, path: str, fmt: str, compress: bool) -> io.TextIOWrapper:
+        """打开导出文件，返回文本流
+        
+        Args:
+            path: 文件路径
+            fmt: 导出格式
+            compress: 是否用zstandard压缩
+            
+        Returns:
+            文本流，关闭时同时结束压缩并关闭文件
+        """
+        # 未压缩的CSV带BOM，用Excel打开时中文不会乱码；压缩文件需要先解压，不加BOM
+        encoding = "utf-8-sig" if fmt == "csv" and not compress else "utf-8"
+        if not compress:
+            return open(path, "w", newline="", encoding=encoding)
+        
+        # 压缩库只在导出压缩文件时才加载
+        import zstandard
+        
+        raw = open(path, "wb")
+        try:
+            writer = zstandard.ZstdCompressor(level=self.ZSTD_LEVEL).stream_writer(raw, closefd=True)
+        except BaseException:
+            raw.close()
+            raise
+        return io.TextIOWrapper(writer, encoding=encoding, newline="")
+    
+    @staticmethod
+    def _csv_writer(output, columns: List[str]) -> Callable[[list], None]:
+        """写入CSV表头，返回写入一批数据的函数
+        """
+        import csv
+        
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        return writer.writerows
+    
+    @staticmethod
+    def _jsonl_writer(output, columns: List[str]) -> Callable[[list], None]:
+        """返回以JSON Lines格式写入一批数据的函数，每行一个JSON对象
+        """
+        import json
+        
+        encoder = json.JSONEncoder(ensure_ascii=False)
+        
+        def write_batch(batch):
+            output.write("".join(encoder.encode(dict(zip(columns, row))) + "\n" for row in batch))
+        
+        return write_batch
+    
+    def close(self) -> None:
+        """关闭数据库连接
+        """
+        self.db.close()
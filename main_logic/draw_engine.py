@@ -0,0 +1,396 @@
+from typing import Optional, List, Dict, Any
+from main_logic.draw_random import DrawRandom
+from main_logic.fenwick_tree import FenwickTree
+from main_logic.prize_pool import PrizePool
+
+
+class DrawEngine:
+    """抽奖引擎
+    
+    不依赖数据库和界面的纯抽奖逻辑，供抽奖视图模型和批量模拟共用
+    可参与抽奖的用户以树状数组维护，每次抽取和移出都是O(log n)；
+    抽取结果只取决于随机数和名单顺序下的第k个候选人，与候选池的变更历史无关，
+    因此从日志恢复的场次与不中断的场次在相同种子下结果完全一致
+    奖品按等级分池维护剩余库存，设置等级顺序后每轮只从当前等级的奖品池中抽取，
+    当前等级抽完后自动进入下一个等级；奖品可以按种类均匀抽取，也可以按剩余数量加权抽取
+    抽奖结果变化时通知结果监听器，界面据此增量更新结果列表
+    """
+    
+    def __init__(self, users: List[Dict[str, Any]], prizes: List[Dict[str, Any]],
+                 winners: Dict[int, int], must_win_prizes: Optional[Dict[int, int]] = None,
+                 total_rounds: int = 10, allow_duplicate_winners: bool = True,
+                 rng: Optional[DrawRandom] = None, level_order: Optional[List[str]] = None,
+                 prize_selection: str = "uniform"):
+        """初始化抽奖引擎
+        
+        Args:
+            users: 用户列表，每个用户至少包含id、username、employee_id
+            prizes: 奖品列表，每个奖品至少包含id、name、level、quantity
+            winners: 用户ID到中奖可能性的映射（0为默认，1为必中，2为必不中）
+            must_win_prizes: 必中奖用户ID到必中奖品ID的映射
+            total_rounds: 抽奖总轮次
+            allow_duplicate_winners: 是否允许重复抽中相同人员
+            rng: 真实抽奖使用的随机数生成器，默认使用新种子创建
+            level_order: 奖品等级的抽取顺序，默认不分等级从全部奖品中抽取
+            prize_selection: 奖品抽取方式，uniform为按种类均匀抽取，weighted为按剩余数量加权抽取
+        """
+        self.users = users
+        self.prizes = prizes
+        self.winners = winners
+        self.must_win_prizes = must_win_prizes or {}
+        self.total_rounds = total_rounds
+        self.allow_duplicate_winners = allow_duplicate_winners
+        self.rng = rng or DrawRandom()
+        self.level_order = level_order
+        self.set_prize_selection(prize_selection)
+        self.prize_quantities = {prize['id']: prize['quantity'] for prize in prizes}
+        self._build_prize_pools()
+        self._user_positions = {user['id']: position for position, user in enumerate(users)}
+        self._must_win_users = [user for user in users if winners.get(user['id'], 0) == 1]
+        self.lottery_results = []
+        self.current_round = 0
+        self.must_win_users_won = set()
+        self.winners_history = set()
+        self.result_listeners = []
+        self._rebuild_pools()
+    
+    def add_result_listener(self, listener) -> None:
+        """添加抽奖结果监听器
+        
+        监听器以listener(event, results)的形式调用：
+        event为append时results是新增的结果，event为reset时results是替换后的全部结果
+        
+        Args:
+            listener: 监听器
+        """
+        if listener not in self.result_listeners:
+            self.result_listeners.append(listener)
+    
+    def remove_result_listener(self, listener) -> None:
+        """移除抽奖结果监听器
+        
+        Args:
+            listener: 监听器
+        """
+        if listener in self.result_listeners:
+            self.result_listeners.remove(listener)
+    
+    def notify_results_reset(self) -> None:
+        """通知监听器抽奖结果已整体替换
+        """
+        self._notify_results("reset", self.lottery_results)
+    
+    def _notify_results(self, event: str, results: List[Dict[str, Any]]) -> None:
+        """通知全部结果监听器
+        
+        Args:
+            event: 事件类型（append、reset）
+            results: 事件对应的结果
+        """
+        for listener in list(self.result_listeners):
+            listener(event, results)
+    
+    def _rebuild_pools(self) -> None:
+        """根据当前状态重建候选池
+        """
+        # 可参与抽奖的用户标记（必不中奖用户不参与）
+        active = bytearray(len(self.users))
+        for position, user in enumerate(self.users):
+            if self.winners.get(user['id'], 0) == 2:
+                continue
+            if not self.allow_duplicate_winners and user['id'] in self.winners_history:
+                continue
+            active[position] = 1
+        self._user_active = active
+        self._user_count = sum(active)
+        self._user_tree = FenwickTree(active)
+        self._rebuild_must_win_pool()
+    
+    def _build_prize_pools(self) -> None:
+        """根据当前奖品数量建立全部奖品池和各等级奖品池
+        """
+        self.prize_pool = PrizePool(self.prizes, self.prize_quantities)
+        prizes_by_level = {}
+        for prize in self.prizes:
+            prizes_by_level.setdefault(prize['level'], []).append(prize)
+        self.level_pools = {
+            level: PrizePool(level_prizes, self.prize_quantities)
+            for level, level_prizes in prizes_by_level.items()
+        }
+        self._level_index = 0
+    
+    def _rebuild_must_win_pool(self) -> None:
+        """重建还未中奖的必中奖用户池，保持名单顺序
+        """
+        self._must_win_pool = [
+            user for user in self._must_win_users
+            if user['id'] not in self.must_win_users_won
+            and (self.allow_duplicate_winners or user['id'] not in self.winners_history)
+        ]
+    
+    def _set_user_active(self, user_id: int, active: bool) -> None:
+        """将用户放回或移出候选池
+        """
+        position = self._user_positions.get(user_id)
+        if position is None or self._user_active[position] == active:
+            return
+        self._user_active[position] = active
+        self._user_count += 1 if active else -1
+        self._user_tree.add(position, 1 if active else -1)
+    
+    def _remove_must_win_user(self, user_id: int) -> None:
+        """从必中奖用户池移除用户，必中奖用户数量很少，直接线性查找
+        """
+        for index, user in enumerate(self._must_win_pool):
+            if user['id'] == user_id:
+                del self._must_win_pool[index]
+                return
+    
+    def set_allow_duplicate_winners(self, allow: bool) -> None:
+        """设置是否允许重复抽中相同人员
+        
+        Args:
+            allow: 是否允许重复抽中相同人员
+        """
+        if allow != self.allow_duplicate_winners:
+            self.allow_duplicate_winners = allow
+            self._rebuild_pools()
+    
+    def get_available_users(self) -> List[Dict[str, Any]]:
+        """获取可参与抽奖的用户
+        
+        Returns:
+            可参与抽奖的用户列表
+        """
+        return [user for user, active in zip(self.users, self._user_active) if active]
+    
+    def get_must_win_users(self) -> List[Dict[str, Any]]:
+        """获取还未中奖的必中奖用户
+        
+        Returns:
+            必中奖用户列表，每个用户附带prize_id（如果有）
+        """
+        must_win_users = []
+        for user in self._must_win_pool:
+            user_with_prize = user.copy()
+            user_with_prize['prize_id'] = self.must_win_prizes.get(user['id'])
+            must_win_users.append(user_with_prize)
+        return must_win_users
+    
+    def set_level_order(self, level_order: Optional[List[str]]) -> None:
+        """设置奖品等级的抽取顺序
+        
+        Args:
+            level_order: 奖品等级列表，为None时不分等级从全部奖品中抽取
+        """
+        self.level_order = list(level_order) if level_order else None
+        self._level_index = 0
+    
+    def set_prize_selection(self, prize_selection: str) -> None:
+        """设置奖品抽取方式
+        
+        Args:
+            prize_selection: uniform为按种类均匀抽取，weighted为按剩余数量加权抽取
+        """
+        if prize_selection not in PrizePool.SELECTION_MODES:
+            raise ValueError(f"不支持的奖品抽取方式: {prize_selection}")
+        self.prize_selection = prize_selection
+    
+    def get_active_level(self) -> Optional[str]:
+        """获取当前抽取的奖品等级，当前等级抽完时自动进入下一个等级
+        
+        Returns:
+            奖品等级，未设置等级顺序或全部等级已抽完时返回None
+        """
+        if not self.level_order:
+            return None
+        while self._level_index < len(self.level_order):
+            pool = self.level_pools.get(self.level_order[self._level_index])
+            if pool is not None and pool.remaining > 0:
+                return self.level_order[self._level_index]
+            self._level_index += 1
+        return None
+    
+    def _get_candidate_pool(self) -> Optional[PrizePool]:
+        """获取本轮抽取的奖品池
+        """
+        if not self.level_order:
+            return self.prize_pool
+        level = self.get_active_level()
+        return self.level_pools[level] if level is not None else None
+    
+    def get_available_prizes(self) -> List[Dict[str, Any]]:
+        """获取本轮可抽取的奖品，设置了等级顺序时只包含当前等级
+        
+        Returns:
+            可用奖品列表
+        """
+        pool = self._get_candidate_pool()
+        return pool.get_available_prizes() if pool is not None else []
+    
+    def draw(self) -> Optional[Dict[str, Any]]:
+        """执行一次抽奖
+        
+        Returns:
+            抽奖结果，无法抽奖时返回None
+        """
+        # 检查当前轮次是否已达到总轮次
+        if self.current_round >= self.total_rounds:
+            return None
+        
+        # 增加当前轮次计数
+        self.current_round += 1
+        
+        prize_pool = self._get_candidate_pool()
+        if not self._user_count or prize_pool is None or not len(prize_pool):
+            return None
+        
+        # 计算剩余轮次
+        remaining_rounds = self.total_rounds - self.current_round + 1
+        
+        # 优先从必中奖用户中选择的条件
+        # 1. 还有未中奖的必中奖用户
+        # 2. 剩余轮次大于等于未中奖的必中奖用户数量，确保每个必中奖用户都有机会中奖
+        pending_count = len(self._must_win_pool)
+        should_choose_must_win = pending_count > 0 and remaining_rounds >= pending_count
+        
+        selected_prize = None
+        if should_choose_must_win:
+            selected_user = self._must_win_pool[self.rng.randrange(pending_count)]
+            self.must_win_users_won.add(selected_user['id'])
+            self._remove_must_win_user(selected_user['id'])
+            
+            # 检查是否有指定必中奖品
+            must_win_prize_id = self.must_win_prizes.get(selected_user['id'])
+            if must_win_prize_id:
+                selected_prize = prize_pool.get_available_prize(must_win_prize_id)
+        else:
+            position = self._user_tree.find(self.rng.randrange(self._user_count))
+            selected_user = self.users[position]
+        
+        # 如果没有找到指定的奖品或没有指定奖品，则随机选择一个奖品
+        if not selected_prize:
+            selected_prize = prize_pool.pick(self.rng, self.prize_selection)
+        
+        return self._record(selected_user, selected_prize)
+    
+    def _record(self, user: Dict[str, Any], prize: Dict[str, Any]) -> Dict[str, Any]:
+        """记录一次中奖结果并更新状态
+        
+        Args:
+            user: 中奖用户
+            prize: 中奖奖品
+        
+        Returns:
+            抽奖结果
+        """
+        result = {
+            'user_id': user['id'],
+            'username': user['username'],
+            'employee_id': user['employee_id'],
+            'prize_id': prize['id'],
+            'prize_name': prize['name'],
+            'prize_level': prize['level']
+        }
+        self.lottery_results.append(result)
+        
+        # 减少本地缓存中的奖品数量
+        if prize['id'] in self.prize_quantities:
+            self.prize_quantities[prize['id']] -= 1
+            self.prize_pool.consumed(prize)
+            self.level_pools[prize['level']].consumed(prize)
+        
+        # 记录中奖用户到历史记录
+        self.winners_history.add(user['id'])
+        if not self.allow_duplicate_winners:
+            self._set_user_active(user['id'], False)
+            self._remove_must_win_user(user['id'])
+        
+        self._notify_results("append", [result])
+        return result
+    
+    def adopt_session(self, other: 'DrawEngine') -> None:
+        """接管另一个引擎的抽奖进度，用于重新加载数据后继续当前场次
+        
+        Args:
+            other: 原抽奖引擎
+        """
+        self.rng = other.rng
+        self.level_order = other.level_order
+        self.prize_selection = other.prize_selection
+        self.lottery_results = other.lottery_results
+        self.current_round = other.current_round
+        self.must_win_users_won = other.must_win_users_won
+        self.winners_history = other.winners_history
+        for listener in other.result_listeners:
+            self.add_result_listener(listener)
+        self._rebuild_pools()
+    
+    def get_checkpoint(self) -> Dict[str, Any]:
+        """导出场次检查点
+        
+        中奖结果和中奖历史可以从抽奖结果日志中还原，检查点只保存日志中没有的状态
+        
+        Returns:
+            JSON兼容的检查点字典
+        """
+        return {
+            'current_round': self.current_round,
+            'total_rounds': self.total_rounds,
+            'allow_duplicate_winners': self.allow_duplicate_winners,
+            'level_order': self.level_order,
+            'prize_selection': self.prize_selection,
+            'must_win_users_won': list(self.must_win_users_won),
+            'rng_state': self.rng.get_state_data()
+        }
+    
+    def restore_session(self, checkpoint: Dict[str, Any], results: List[Dict[str, Any]]) -> None:
+        """从检查点和抽奖结果日志恢复场次，只遍历一次数据重建候选池
+        
+        奖品数量应在创建引擎时传入已扣减后的剩余库存
+        
+        Args:
+            checkpoint: get_checkpoint导出的检查点
+            results: 该场次已持久化的抽奖结果，按轮次排序
+        """
+        self.total_rounds = checkpoint['total_rounds']
+        self.allow_duplicate_winners = checkpoint['allow_duplicate_winners']
+        self.set_level_order(checkpoint.get('level_order'))
+        self.set_prize_selection(checkpoint.get('prize_selection', "uniform"))
+        self.current_round = checkpoint['current_round']
+        self.must_win_users_won = set(checkpoint['must_win_users_won'])
+        self.rng.set_state_data(checkpoint['rng_state'])
+        self.lottery_results = [
+            {
+                'user_id': result['user_id'],
+                'username': result['username'],
+                'employee_id': result['employee_id'],
+                'prize_id': result['prize_id'],
+                'prize_name': result['prize_name'],
+                'prize_level': result['prize_level']
+            }
+            for result in results
+        ]
+        self.winners_history = {result['user_id'] for result in results}
+        self._rebuild_pools()
+        self.notify_results_reset()
+    
+    def reset(self) -> None:
+        """重置抽奖状态，奖品数量恢复为初始值
+        
+        只把本场被移出候选池的中奖用户放回，复杂度与中奖人数相关而与总人数无关
+        """
+        removed_ids = self.winners_history | self.must_win_users_won
+        self.prize_quantities = {prize['id']: prize['quantity'] for prize in self.prizes}
+        self._build_prize_pools()
+        self.lottery_results = []
+        self.current_round = 0
+        self.must_win_users_won.clear()
+        self.winners_history.clear()
+        
+        for user_id in removed_ids:
+            if self.winners.get(user_id, 0) != 2:
+                self._set_user_active(user_id, True)
+        self._rebuild_must_win_pool()
+        if self.result_listeners:
+            self.notify_results_reset()
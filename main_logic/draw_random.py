@@ -0,0 +1,65 @@
+import random
+import secrets
+import hashlib
+from typing import Optional, List
+
+
+def new_seed() -> int:
+    """生成一个新的64位随机种子
+    
+    Returns:
+        随机种子
+    """
+    return secrets.randbits(64)
+
+
+def spawn_seeds(root_seed: int, count: int) -> List[int]:
+    """从根种子派生出互相独立且可复现的子种子
+    
+    Args:
+        root_seed: 根种子
+        count: 子种子数量
+    
+    Returns:
+        子种子列表
+    """
+    seeds = []
+    for index in range(count):
+        digest = hashlib.blake2b(f"{root_seed}:{index}".encode("ascii"), digest_size=8).digest()
+        seeds.append(int.from_bytes(digest, "big"))
+    return seeds
+
+
+class DrawRandom(random.Random):
+    """可审计的抽奖随机数生成器
+    
+    每个实例记录自己的初始种子，内部状态可以导出为JSON兼容的列表并恢复，
+    用于复现抽奖过程和断点恢复。真实抽奖与界面动画应使用不同的实例，互不干扰
+    """
+    
+    def __init__(self, seed: Optional[int] = None):
+        """初始化随机数生成器
+        
+        Args:
+            seed: 初始种子，默认生成新的随机种子
+        """
+        self.initial_seed = new_seed() if seed is None else seed
+        super().__init__(self.initial_seed)
+    
+    def get_state_data(self) -> list:
+        """导出内部状态
+        
+        Returns:
+            JSON兼容的状态列表
+        """
+        version, internal_state, gauss_next = self.getstate()
+        return [version, list(internal_state), gauss_next]
+    
+    def set_state_data(self, data: list) -> None:
+        """从导出的状态恢复
+        
+        Args:
+            data: get_state_data导出的状态列表
+        """
+        version, internal_state, gauss_next = data
+        self.setstate((version, tuple(internal_state), gauss_next))
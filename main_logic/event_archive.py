@@ -0,0 +1,286 @@
+import io
+import os
+import json
+import sqlite3
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Optional, Callable, Iterator, List, Dict, Any
+from db.sqlite_db import SQLiteDB
+
+
+class EventArchive:
+    """活动归档类
+    
+    把一场活动的全部数据（用户、奖品、中奖设置、抽奖场次、抽奖结果和场次状态）打包成一个
+    zstandard压缩的归档文件，用于在电脑之间迁移活动（如从彩排电脑到现场电脑）
+    
+    归档格式为JSON Lines：第一行是文件头，之后每张表依次写入表头行（表名和列名）、
+    每行数据一个JSON数组、表尾行（行数和数据行的SHA-256），最后一行是归档结束标记
+    """
+    
+    FORMAT = "lotteryassist-archive"
+    VERSION = 1
+    # 归档的表，按恢复时的写入顺序排列
+    TABLES = ("users", "prizes", "winners", "draw_sessions", "draw_results", "draw_session_state",
+              "draw_session_snapshots")
+    # 每次读取或写入的行数
+    BATCH_SIZE = 5000
+    # 在线备份时每步复制的页数，步与步之间其他连接可以继续写入
+    BACKUP_PAGES = 1024
+    ZSTD_LEVEL = 9
+    
+    def __init__(self, db_path: str):
+        """初始化活动归档类
+        
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = db_path
+    
+    def create(self, archive_path: str,
+               progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """创建归档
+        
+        先用SQLite的在线备份接口把数据库复制到临时文件，程序运行中也能得到一致的快照，
+        再从快照中逐批读取数据写入归档；归档先写入临时文件，完成后再替换目标文件
+        
+        Args:
+            archive_path: 归档文件路径
+            progress_callback: 每写入一批后调用，参数为进度（table、rows）
+            
+        Returns:
+            归档结果，包含每张表的行数和校验值
+        """
+        import zstandard
+        
+        tables = {}
+        temp_path = archive_path + ".part"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot = sqlite3.connect(os.path.join(temp_dir, "snapshot.db"))
+            try:
+                self._backup_to(snapshot)
+                with open(temp_path, "wb") as raw:
+                    compressor = zstandard.ZstdCompressor(level=self.ZSTD_LEVEL, write_checksum=True)
+                    with compressor.stream_writer(raw, closefd=False) as writer:
+                        self._write_line(writer, {
+                            "format": self.FORMAT,
+                            "version": self.VERSION,
+                            "created_at": datetime.now().isoformat(timespec="seconds"),
+                            "source": os.path.basename(self.db_path)
+                        })
+                        for table in self.TABLES:
+                            if self._table_columns(snapshot, table):
+                                tables[table] = self._write_table(writer, snapshot, table, progress_callback)
+                        self._write_line(writer, {"end_archive": True, "tables": len(tables)})
+                os.replace(temp_path, archive_path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            finally:
+                snapshot.close()
+        
+        return {"path": archive_path, "tables": tables}
+    
+    def restore(self, archive_path: str,
+                progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """从归档恢复数据，替换数据库中的全部活动数据
+        
+        所有表的清空和写入在一个事务中完成，数据用executemany逐批写入；每张表读完后核对行数和校验值，
+        归档损坏、被截断或校验不一致时整个恢复回滚，数据库保持原样
+        
+        Args:
+            archive_path: 归档文件路径
+            progress_callback: 每写入一批后调用，参数为进度（table、rows）
+            
+        Returns:
+            恢复结果，包含每张表的行数和校验值
+        """
+        self._init_tables()
+        tables = {}
+        db = SQLiteDB(self.db_path)
+        try:
+            with db.transaction():
+                for table in self.TABLES:
+                    db.execute(f"DELETE FROM {table}")
+                # 导入检查点对应的是被替换的数据，一并清除
+                if self._table_columns(db.connection, "import_checkpoints"):
+                    db.execute("DELETE FROM import_checkpoints")
+                
+                lines = self._read_lines(archive_path)
+                header = json.loads(next(lines, b"{}"))
+                if header.get("format") != self.FORMAT:
+                    raise ValueError("不是抽奖助手的归档文件")
+                if header.get("version", 0) > self.VERSION:
+                    raise ValueError(f"归档版本{header['version']}高于当前支持的版本{self.VERSION}")
+                
+                for line in lines:
+                    record = json.loads(line)
+                    if record.get("end_archive"):
+                        if record["tables"] != len(tables):
+                            raise ValueError("归档中的表数量不一致")
+                        break
+                    table = record.get("table")
+                    if table not in self.TABLES or table in tables:
+                        raise ValueError(f"归档中有无法识别的表: {table}")
+                    tables[table] = self._restore_table(db, table, record["columns"], lines, progress_callback)
+                else:
+                    raise ValueError("归档文件不完整")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"归档文件已损坏: {e}") from e
+        finally:
+            db.close()
+        
+        return {"path": archive_path, "tables": tables}
+    
+    def _backup_to(self, snapshot: sqlite3.Connection) -> None:
+        """用在线备份接口把数据库复制到快照连接
+        
+        Args:
+            snapshot: 快照数据库连接
+        """
+        source = sqlite3.connect(self.db_path)
+        try:
+            source.backup(snapshot, pages=self.BACKUP_PAGES)
+        finally:
+            source.close()
+    
+    def _write_table(self, writer, snapshot: sqlite3.Connection, table: str,
+                     progress_callback: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+        """把一张表写入归档
+        
+        Args:
+            writer: 归档的压缩写入流
+            snapshot: 快照数据库连接
+            table: 表名
+            progress_callback: 进度回调
+            
+        Returns:
+            这张表的行数和校验值
+        """
+        columns = self._table_columns(snapshot, table)
+        self._write_line(writer, {"table": table, "columns": columns})
+        
+        digest = hashlib.sha256()
+        rows = 0
+        cursor = snapshot.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid")
+        while True:
+            batch = cursor.fetchmany(self.BATCH_SIZE)
+            if not batch:
+                break
+            data = "".join(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n" for row in batch)
+            data = data.encode("utf-8")
+            digest.update(data)
+            writer.write(data)
+            rows += len(batch)
+            if progress_callback:
+                progress_callback({"table": table, "rows": rows})
+        
+        checksum = digest.hexdigest()
+        self._write_line(writer, {"end": table, "rows": rows, "sha256": checksum})
+        return {"rows": rows, "sha256": checksum}
+    
+    def _restore_table(self, db: SQLiteDB, table: str, columns: List[str], lines: Iterator[bytes],
+                       progress_callback: Optional[Callable[[Dict[str, Any]], None]]) -> Dict[str, Any]:
+        """把归档中的一张表写入数据库
+        
+        Args:
+            db: 已在事务中的数据库对象
+            table: 表名
+            columns: 归档中这张表的列名
+            lines: 归档的行迭代器，位于这张表的第一行数据
+            progress_callback: 进度回调
+            
+        Returns:
+            这张表的行数和校验值
+        """
+        missing = set(columns) - set(self._table_columns(db.connection, table))
+        if missing:
+            raise ValueError(f"数据库的{table}表中没有这些列: {', '.join(sorted(missing))}")
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        
+        digest = hashlib.sha256()
+        rows = 0
+        batch = []
+        for line in lines:
+            if not line.startswith(b"["):
+                end = json.loads(line)
+                break
+            digest.update(line)
+            batch.append(json.loads(line))
+            if len(batch) >= self.BATCH_SIZE:
+                rows += self._insert_batch(db, sql, batch, table, rows, progress_callback)
+                batch = []
+        else:
+            raise ValueError("归档文件不完整")
+        if batch:
+            rows += self._insert_batch(db, sql, batch, table, rows, progress_callback)
+        
+        checksum = digest.hexdigest()
+        if end.get("end") != table or end.get("rows") != rows or end.get("sha256") != checksum:
+            raise ValueError(f"{table}表的校验不一致，归档可能已损坏")
+        return {"rows": rows, "sha256": checksum}
+    
+    @staticmethod
+    def _insert_batch(db: SQLiteDB, sql: str, batch: List[list], table: str, done: int,
+                      progress_callback: Optional[Callable[[Dict[str, Any]], None]]) -> int:
+        """写入一批数据
+        
+        Args:
+            db: 已在事务中的数据库对象
+            sql: INSERT语句
+            batch: 数据行列表
+            table: 表名，用于报告进度
+            done: 这张表之前已写入的行数
+            progress_callback: 进度回调
+            
+        Returns:
+            写入的行数
+        """
+        db.executemany(sql, batch)
+        if progress_callback:
+            progress_callback({"table": table, "rows": done + len(batch)})
+        return len(batch)
+    
+    def _init_tables(self) -> None:
+        """确保目标数据库中有全部活动数据表，表结构由各管理类创建
+        """
+        from manager.user_manager import UserManager
+        from manager.prize_manager import PrizeManager
+        from manager.result_manager import ResultManager
+        
+        for manager_class in (UserManager, PrizeManager, ResultManager):
+            manager = manager_class(self.db_path)
+            manager.close()
+    
+    @staticmethod
+    def _table_columns(connection: sqlite3.Connection, table: str) -> List[str]:
+        """查询表的列名
+        
+        Returns:
+            列名列表，表不存在时为空
+        """
+        return [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+    
+    @staticmethod
+    def _read_lines(archive_path: str) -> Iterator[bytes]:
+        """逐行读取解压后的归档内容
+        
+        Yields:
+            每行内容（包含换行符）
+        """
+        import zstandard
+        
+        with open(archive_path, "rb") as raw:
+            reader = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+            try:
+                yield from reader
+            except zstandard.ZstdError as e:
+                raise ValueError(f"归档文件已损坏: {e}") from e
+    
+    @staticmethod
+    def _write_line(writer, record: Dict[str, Any]) -> None:
+        """写入一行JSON
+        """
+        writer.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
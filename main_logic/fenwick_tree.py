@@ -0,0 +1,79 @@
+from typing import List
+
+
+class FenwickTree:
+    """树状数组（Fenwick树）
+    
+    维护一组非负整数权重，支持O(log n)的单点修改、前缀和查询，
+    以及按累计权重定位元素，用于在动态变化的候选集合中按权重随机抽取
+    """
+    
+    def __init__(self, weights: List[int]):
+        """以O(n)复杂度构建树状数组
+        
+        Args:
+            weights: 初始权重列表
+        """
+        self.size = len(weights)
+        self._tree = [0] + list(weights)
+        for index in range(1, self.size + 1):
+            parent = index + (index & -index)
+            if parent <= self.size:
+                self._tree[parent] += self._tree[index]
+        self._highest_bit = 1 << (self.size.bit_length() - 1) if self.size else 0
+    
+    def add(self, index: int, delta: int) -> None:
+        """修改指定位置的权重
+        
+        Args:
+            index: 位置（从0开始）
+            delta: 权重增量
+        """
+        index += 1
+        while index <= self.size:
+            self._tree[index] += delta
+            index += index & -index
+    
+    def prefix_sum(self, count: int) -> int:
+        """计算前count个元素的权重之和
+        
+        Args:
+            count: 元素个数
+        
+        Returns:
+            权重之和
+        """
+        total = 0
+        while count > 0:
+            total += self._tree[count]
+            count -= count & -count
+        return total
+    
+    def total(self) -> int:
+        """计算全部权重之和
+        
+        Returns:
+            权重之和
+        """
+        return self.prefix_sum(self.size)
+    
+    def find(self, target: int) -> int:
+        """查找累计权重首次超过target的位置
+        
+        target取[0, total)中的均匀随机整数时，每个位置被选中的概率与其权重成正比
+        
+        Args:
+            target: 目标累计权重
+        
+        Returns:
+            位置（从0开始）
+        """
+        position = 0
+        step = self._highest_bit
+        while step:
+            next_position = position + step
+            if next_position <= self.size and self._tree[next_position] <= target:
+                position = next_position
+                target -= self._tree[next_position]
+            step >>= 1
+        return position
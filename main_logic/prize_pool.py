@@ -0,0 +1,111 @@
+from typing import Optional, List, Dict, Any
+from main_logic.fenwick_tree import FenwickTree
+
+
+class PrizePool:
+    """奖品池
+    
+    维护一组奖品的剩余库存，奖品数量保存在抽奖引擎共享的字典中
+    用两个树状数组分别记录每种奖品的剩余数量和是否还有库存，
+    按种类均匀抽取、按剩余数量加权抽取以及扣减库存都是O(log P)，
+    抽取结果只取决于剩余库存，与抽取历史无关
+    """
+    
+    # 奖品抽取方式
+    # uniform: 每种有库存的奖品概率相同
+    # weighted: 按剩余数量加权，剩余越多越容易抽中
+    SELECTION_MODES = ("uniform", "weighted")
+    
+    def __init__(self, prizes: List[Dict[str, Any]], quantities: Dict[int, int]):
+        """初始化奖品池
+        
+        Args:
+            prizes: 奖品列表
+            quantities: 奖品ID到剩余数量的映射，与抽奖引擎共享
+        """
+        self.prizes = prizes
+        self._quantities = quantities
+        self._positions = {prize['id']: position for position, prize in enumerate(prizes)}
+        stock = [max(quantities.get(prize['id'], 0), 0) for prize in prizes]
+        self._stock_tree = FenwickTree(stock)
+        self._kind_tree = FenwickTree([1 if count > 0 else 0 for count in stock])
+        self.remaining = sum(stock)
+        self._kinds = sum(1 for count in stock if count > 0)
+    
+    def __len__(self) -> int:
+        """仍有库存的奖品种类数
+        """
+        return self._kinds
+    
+    def get_available_prizes(self) -> List[Dict[str, Any]]:
+        """获取仍有库存的奖品
+        
+        Returns:
+            奖品列表
+        """
+        return [prize for prize in self.prizes if self._quantities.get(prize['id'], 0) > 0]
+    
+    def get_available_prize(self, prize_id: int) -> Optional[Dict[str, Any]]:
+        """获取指定的奖品，奖品不在池中或已无库存时返回None
+        
+        Args:
+            prize_id: 奖品ID
+        
+        Returns:
+            奖品信息
+        """
+        position = self._positions.get(prize_id)
+        if position is not None and self._quantities.get(prize_id, 0) > 0:
+            return self.prizes[position]
+        return None
+    
+    def pick(self, rng, mode: str = "uniform") -> Dict[str, Any]:
+        """随机抽取一个奖品
+        
+        Args:
+            rng: 随机数生成器
+            mode: 抽取方式，uniform为按种类均匀抽取，weighted为按剩余数量加权抽取
+        
+        Returns:
+            奖品信息
+        """
+        if mode == "weighted":
+            position = self._stock_tree.find(rng.randrange(self.remaining))
+        else:
+            position = self._kind_tree.find(rng.randrange(self._kinds))
+        return self.prizes[position]
+    
+    def consumed(self, prize: Dict[str, Any]) -> None:
+        """奖品数量已被扣减一个后调用，更新剩余库存
+        
+        Args:
+            prize: 被抽中的奖品
+        """
+        position = self._positions.get(prize['id'])
+        if position is None:
+            return
+        self.remaining -= 1
+        self._stock_tree.add(position, -1)
+        if self._quantities.get(prize['id'], 0) <= 0:
+            self._kinds -= 1
+            self._kind_tree.add(position, -1)
+
+
+def default_level_order(prizes: List[Dict[str, Any]]) -> List[str]:
+    """生成默认的奖品等级抽取顺序
+    
+    通常奖项越低数量越多，因此按等级总数量从多到少排列；
+    数量相同时，录入越晚的等级越先抽取
+    
+    Args:
+        prizes: 奖品列表
+    
+    Returns:
+        奖品等级列表
+    """
+    totals = {}
+    first_seen = {}
+    for index, prize in enumerate(prizes):
+        totals[prize['level']] = totals.get(prize['level'], 0) + max(prize['quantity'], 0)
+        first_seen.setdefault(prize['level'], index)
+    return sorted(totals, key=lambda level: (-totals[level], -first_seen[level]))
@@ -0,0 +1,172 @@
+import json
+import hashlib
+from typing import Optional, List, Dict, Any
+from main_logic.draw_engine import DrawEngine
+from main_logic.draw_random import DrawRandom
+
+
+# 验证结果中最多列出的不一致轮次
+MAX_MISMATCHES = 20
+
+
+def users_digest(users: List[Dict[str, Any]]) -> str:
+    """计算人员名单的摘要，名单内容或顺序变化时摘要随之变化
+    
+    抽取结果取决于名单顺序下的第k个候选人，快照中只保存名单摘要而不保存整个名单
+    
+    Args:
+        users: 用户列表
+        
+    Returns:
+        SHA-256摘要
+    """
+    digest = hashlib.sha256()
+    for start in range(0, len(users), 10000):
+        digest.update("".join(
+            f"{user['id']}\t{user['username']}\t{user['employee_id']}\n" for user in users[start:start + 10000]
+        ).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def session_snapshot(engine: DrawEngine, include_data: bool = True) -> Dict[str, Any]:
+    """生成场次快照，用于之后复现和验证场次
+    
+    场次开始、中途重新加载数据或恢复场次时保存包含数据的快照（当时的奖品库存、中奖设置和名单摘要），
+    中途修改抽奖选项时只保存检查点
+    
+    Args:
+        engine: 抽奖引擎
+        include_data: 是否包含奖品库存、中奖设置和名单摘要
+        
+    Returns:
+        JSON兼容的快照字典
+    """
+    snapshot = {'checkpoint': engine.get_checkpoint()}
+    if include_data:
+        snapshot['prizes'] = [
+            {'id': prize['id'], 'name': prize['name'], 'level': prize['level'],
+             'quantity': engine.prize_quantities[prize['id']]}
+            for prize in engine.prizes
+        ]
+        snapshot['winners'] = [
+            [user_id, probability, engine.must_win_prizes.get(user_id)]
+            for user_id, probability in engine.winners.items()
+        ]
+        snapshot['users_count'] = len(engine.users)
+        snapshot['users_sha256'] = users_digest(engine.users)
+    return snapshot
+
+
+def replay_session(seed: int, snapshots: List[Dict[str, Any]], users: List[Dict[str, Any]],
+                   final_round: int) -> Dict[str, Any]:
+    """按场次的种子和快照重新抽奖
+    
+    每个快照在抽奖进行到它记录的轮次时生效：包含数据的快照以快照中的库存和中奖设置创建新引擎，
+    并接管之前的抽奖进度（与视图模型重新加载数据的方式相同），之后按检查点设置抽奖选项
+    
+    Args:
+        seed: 场次的随机种子
+        snapshots: 场次的快照，每项包含round和snapshot，按轮次排序
+        users: 当前的人员名单，必须与快照中的名单摘要一致
+        final_round: 场次进行到的轮次
+        
+    Returns:
+        重放结果，包含results（每项带round）；无法重放时包含reason
+    """
+    engine = None
+    digest = None
+    pending = list(snapshots)
+    results = []
+    while True:
+        while pending and pending[0]['round'] <= (engine.current_round if engine else 0):
+            snapshot = pending.pop(0)['snapshot']
+            checkpoint = snapshot['checkpoint']
+            if 'prizes' in snapshot:
+                if digest is None:
+                    digest = users_digest(users)
+                if snapshot['users_sha256'] != digest:
+                    return {'results': results, 'reason': "人员名单与场次进行时不同，无法复现"}
+                winners = {user_id: probability for user_id, probability, _ in snapshot['winners']}
+                must_win_prizes = {user_id: prize_id for user_id, _, prize_id in snapshot['winners'] if prize_id}
+                new_engine = DrawEngine(
+                    users, snapshot['prizes'], winners, must_win_prizes,
+                    total_rounds=checkpoint['total_rounds'],
+                    allow_duplicate_winners=checkpoint['allow_duplicate_winners'],
+                    rng=DrawRandom(seed),
+                    level_order=checkpoint.get('level_order'),
+                    prize_selection=checkpoint.get('prize_selection', "uniform")
+                )
+                if engine is not None:
+                    new_engine.adopt_session(engine)
+                engine = new_engine
+            elif engine is None:
+                return {'results': results, 'reason': "场次没有开始时的数据快照，无法复现"}
+            
+            engine.total_rounds = checkpoint['total_rounds']
+            engine.set_allow_duplicate_winners(checkpoint['allow_duplicate_winners'])
+            engine.set_level_order(checkpoint.get('level_order'))
+            engine.set_prize_selection(checkpoint.get('prize_selection', "uniform"))
+            # 随机数状态不一致说明快照之前的抽奖过程已经不同
+            if json.loads(json.dumps(engine.rng.get_state_data())) != checkpoint['rng_state']:
+                return {'results': results, 'reason': f"第{checkpoint['current_round']}轮的随机数状态与记录不一致"}
+        
+        if engine is None:
+            return {'results': results, 'reason': "场次没有开始时的数据快照，无法复现"}
+        if engine.current_round >= final_round or engine.current_round >= engine.total_rounds:
+            break
+        result = engine.draw()
+        if result is not None:
+            results.append(dict(result, round=engine.current_round))
+    return {'results': results, 'reason': None}
+
+
+def verify_session(session: Dict[str, Any], snapshots: List[Dict[str, Any]], users: List[Dict[str, Any]],
+                   recorded: List[Dict[str, Any]], final_round: int) -> Dict[str, Any]:
+    """重放场次并与数据库中记录的抽奖结果逐轮比较
+    
+    Args:
+        session: 场次信息（draw_sessions表的一行）
+        snapshots: 场次的快照，每项包含round和snapshot，按轮次排序
+        users: 当前的人员名单
+        recorded: 数据库中该场次的抽奖结果，按轮次排序
+        final_round: 场次进行到的轮次
+        
+    Returns:
+        验证结果，包含是否一致（verified）、比较的轮次、重放和记录的结果数、
+        不一致的轮次（最多MAX_MISMATCHES条），无法重放时包含原因
+    """
+    report = {
+        'session_id': session['id'],
+        'seed': session['seed'],
+        'rounds': final_round,
+        'recorded': len(recorded),
+        'replayed': 0,
+        'verified': False,
+        'reason': None,
+        'mismatches': []
+    }
+    if not snapshots:
+        report['reason'] = "场次没有保存快照（早期版本创建的场次），无法验证"
+        return report
+    
+    replay = replay_session(int(session['seed']), snapshots, users, final_round)
+    report['replayed'] = len(replay['results'])
+    report['reason'] = replay['reason']
+    
+    keys = ('user_id', 'prize_id')
+    expected = {result['round']: result for result in replay['results']}
+    actual = {result['round']: result for result in recorded}
+    for round_no in sorted(set(expected) | set(actual)):
+        replayed = expected.get(round_no)
+        stored = actual.get(round_no)
+        if replayed and stored and all(replayed[key] == stored[key] for key in keys):
+            continue
+        report['mismatches'].append({
+            'round': round_no,
+            'replayed': {key: replayed[key] for key in keys} if replayed else None,
+            'recorded': {key: stored[key] for key in keys} if stored else None
+        })
+        if len(report['mismatches']) >= MAX_MISMATCHES:
+            break
+    report['verified'] = report['reason'] is None and not report['mismatches']
+    return report
@@ -0,0 +1,273 @@
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Optional, List, Dict, Any, Callable
+from manager.user_manager import UserManager
+from manager.prize_manager import PrizeManager
+from manager.winner_manager import WinnerManager
+from main_logic.draw_engine import DrawEngine
+from main_logic.draw_random import DrawRandom, new_seed, spawn_seeds
+
+
+# 共享内存中每个用户占用的字段数：用户ID、中奖可能性、必中奖品ID
+_ROSTER_FIELDS = 3
+
+# 工作进程内缓存的人员名单，由_init_worker在进程启动时从共享内存读取一次
+_worker_users: List[Dict[str, Any]] = []
+_worker_winners: Dict[int, int] = {}
+_worker_must_win_prizes: Dict[int, int] = {}
+
+
+def _init_worker(shm_name: str, user_count: int) -> None:
+    """工作进程初始化，从共享内存读取人员名单快照
+    
+    Args:
+        shm_name: 共享内存名称
+        user_count: 用户数量
+    """
+    global _worker_users, _worker_winners, _worker_must_win_prizes
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        values = array("q")
+        values.frombytes(bytes(shm.buf[:user_count * _ROSTER_FIELDS * values.itemsize]))
+    finally:
+        shm.close()
+    
+    _worker_users = []
+    _worker_winners = {}
+    _worker_must_win_prizes = {}
+    for offset in range(0, len(values), _ROSTER_FIELDS):
+        user_id, probability, prize_id = values[offset:offset + _ROSTER_FIELDS]
+        _worker_users.append({'id': user_id, 'username': '', 'employee_id': ''})
+        if probability:
+            _worker_winners[user_id] = probability
+        if prize_id:
+            _worker_must_win_prizes[user_id] = prize_id
+
+
+def _run_sessions(users: List[Dict[str, Any]], winners: Dict[int, int], must_win_prizes: Dict[int, int],
+                  scenario: Dict[str, Any], session_count: int, seed: int) -> Dict[str, Any]:
+    """连续模拟多场抽奖并汇总统计
+    
+    Args:
+        users: 用户列表
+        winners: 用户ID到中奖可能性的映射
+        must_win_prizes: 必中奖用户ID到必中奖品ID的映射
+        scenario: 模拟方案
+        session_count: 模拟场次
+        seed: 随机种子
+    
+    Returns:
+        统计结果
+    """
+    engine = DrawEngine(
+        users, scenario['prizes'], winners, must_win_prizes,
+        total_rounds=scenario['total_rounds'],
+        allow_duplicate_winners=scenario['allow_duplicate_winners'],
+        rng=DrawRandom(seed),
+        level_order=scenario.get('level_order'),
+        prize_selection=scenario.get('prize_selection', "uniform")
+    )
+    must_win_ids = [user['id'] for user in users if winners.get(user['id'], 0) == 1]
+    
+    stats = _empty_stats()
+    for _ in range(session_count):
+        engine.reset()
+        draws = 0
+        while engine.current_round < engine.total_rounds:
+            result = engine.draw()
+            if result is None:
+                stats['failed_draws'] += 1
+                continue
+            draws += 1
+            stats['user_wins'][result['user_id']] += 1
+            stats['prize_awards'][result['prize_id']] += 1
+        
+        stats['sessions'] += 1
+        stats['draws'] += draws
+        if draws == engine.total_rounds:
+            stats['completed_sessions'] += 1
+        if must_win_ids and all(user_id in engine.winners_history for user_id in must_win_ids):
+            stats['must_win_fulfilled'] += 1
+    return stats
+
+
+def _run_chunk(scenario: Dict[str, Any], session_count: int, seed: int) -> Dict[str, Any]:
+    """工作进程入口，使用进程内缓存的人员名单执行一批模拟
+    """
+    return _run_sessions(_worker_users, _worker_winners, _worker_must_win_prizes, scenario, session_count, seed)
+
+
+def _empty_stats() -> Dict[str, Any]:
+    """创建空的统计结果
+    """
+    return {
+        'sessions': 0,
+        'completed_sessions': 0,
+        'draws': 0,
+        'failed_draws': 0,
+        'must_win_fulfilled': 0,
+        'user_wins': Counter(),
+        'prize_awards': Counter()
+    }
+
+
+def _merge_stats(total: Dict[str, Any], part: Dict[str, Any]) -> None:
+    """将一批统计结果合并到总结果中
+    """
+    for key in ('sessions', 'completed_sessions', 'draws', 'failed_draws', 'must_win_fulfilled'):
+        total[key] += part[key]
+    total['user_wins'].update(part['user_wins'])
+    total['prize_awards'].update(part['prize_awards'])
+
+
+class SimulationRunner:
+    """抽奖模拟器
+    
+    使用进程池在所有CPU核心上批量模拟抽奖，用于公平性检验和不同规则的推演
+    人员名单以只读快照的形式放在共享内存中，各工作进程只读取一次，不随任务重复序列化
+    """
+    
+    def __init__(self, db_path: str, workers: Optional[int] = None):
+        """初始化抽奖模拟器
+        
+        Args:
+            db_path: 数据库文件路径
+            workers: 工作进程数，默认为CPU核心数
+        """
+        self.db_path = db_path
+        self.workers = workers or os.cpu_count() or 1
+        self._load_data()
+    
+    def _load_data(self) -> None:
+        """从数据库加载人员名单、奖品和中奖概率
+        """
+        user_manager = UserManager(self.db_path)
+        prize_manager = PrizeManager(self.db_path)
+        winner_manager = WinnerManager(self.db_path)
+        try:
+            self.users = [
+                {'id': user['id'], 'username': '', 'employee_id': ''}
+                for user in user_manager.get_all_users()
+            ]
+            self.prizes = prize_manager.get_all_prizes()
+            self.winners = {}
+            self.must_win_prizes = {}
+            for winner in winner_manager.get_all_winners():
+                self.winners[winner['user_id']] = winner['winning_probability']
+                if winner['prize_id']:
+                    self.must_win_prizes[winner['user_id']] = winner['prize_id']
+        finally:
+            user_manager.close()
+            prize_manager.close()
+            winner_manager.close()
+    
+    def make_scenario(self, name: str, total_rounds: int = 10, allow_duplicate_winners: bool = True,
+                      prize_quantities: Optional[Dict[int, int]] = None,
+                      level_order: Optional[List[str]] = None,
+                      prize_selection: str = "uniform") -> Dict[str, Any]:
+        """创建模拟方案
+        
+        Args:
+            name: 方案名称
+            total_rounds: 每场抽奖的总轮次
+            allow_duplicate_winners: 是否允许重复抽中相同人员
+            prize_quantities: 奖品ID到库存的映射，用于推演不同库存，默认使用数据库中的数量
+            level_order: 奖品等级的抽取顺序，默认不分等级
+            prize_selection: 奖品抽取方式，uniform或weighted
+        
+        Returns:
+            模拟方案
+        """
+        prizes = []
+        for prize in self.prizes:
+            prize = prize.copy()
+            if prize_quantities and prize['id'] in prize_quantities:
+                prize['quantity'] = prize_quantities[prize['id']]
+            prizes.append(prize)
+        return {
+            'name': name,
+            'total_rounds': total_rounds,
+            'allow_duplicate_winners': allow_duplicate_winners,
+            'level_order': level_order,
+            'prize_selection': prize_selection,
+            'prizes': prizes
+        }
+    
+    def _pack_roster(self) -> array:
+        """将人员名单打包为连续的整数数组
+        """
+        values = array("q")
+        for user in self.users:
+            values.extend((
+                user['id'],
+                self.winners.get(user['id'], 0),
+                self.must_win_prizes.get(user['id']) or 0
+            ))
+        return values
+    
+    def run(self, scenarios: List[Dict[str, Any]], sessions: int, seed: Optional[int] = None,
+            chunk_size: int = 10000,
+            progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """执行模拟
+        
+        每个方案的场次按chunk_size切分为任务，每个任务使用从根种子派生的独立种子，
+        因此在种子相同的情况下，无论进程数多少、任务完成顺序如何，结果都可以复现
+        
+        Args:
+            scenarios: 模拟方案列表
+            sessions: 每个方案模拟的场次
+            seed: 根种子，默认随机生成
+            chunk_size: 每个任务模拟的场次
+            progress_callback: 进度回调，每合并一批结果调用一次，参数为方案名称和当前累计结果
+        
+        Returns:
+            包含根种子和各方案统计结果的字典
+        """
+        if seed is None:
+            seed = new_seed()
+        
+        tasks = []
+        for scenario_index, scenario in enumerate(scenarios):
+            remaining = sessions
+            while remaining > 0:
+                count = min(chunk_size, remaining)
+                tasks.append((scenario_index, count))
+                remaining -= count
+        task_seeds = spawn_seeds(seed, len(tasks))
+        
+        results = {scenario['name']: _empty_stats() for scenario in scenarios}
+        
+        def merge(scenario_index: int, part: Dict[str, Any]) -> None:
+            name = scenarios[scenario_index]['name']
+            _merge_stats(results[name], part)
+            if progress_callback:
+                progress_callback(name, results[name])
+        
+        if self.workers <= 1 or len(tasks) <= 1:
+            for (scenario_index, count), task_seed in zip(tasks, task_seeds):
+                part = _run_sessions(self.users, self.winners, self.must_win_prizes,
+                                     scenarios[scenario_index], count, task_seed)
+                merge(scenario_index, part)
+            return {'seed': seed, 'results': results}
+        
+        values = self._pack_roster()
+        shm = shared_memory.SharedMemory(create=True, size=max(len(values) * values.itemsize, 1))
+        try:
+            shm.buf[:len(values) * values.itemsize] = values.tobytes()
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=(shm.name, len(self.users))) as executor:
+                futures = {
+                    executor.submit(_run_chunk, scenarios[scenario_index], count, task_seed): scenario_index
+                    for (scenario_index, count), task_seed in zip(tasks, task_seeds)
+                }
+                # 按完成顺序增量合并结果，合并是可交换的，不影响最终结果
+                for future in as_completed(futures):
+                    merge(futures[future], future.result())
+        finally:
+            shm.close()
+            shm.unlink()
+        
+        return {'seed': seed, 'results': results}
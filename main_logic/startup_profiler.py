@@ -0,0 +1,358 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any
+
+
+class _TimedLoader:
+    """包装模块加载器，统计模块执行时间
+    
+    只包装exec_module，其他属性全部转发给原加载器；模块执行完后恢复原加载器
+    """
+    
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        """初始化计时加载器
+        
+        Args:
+            loader: 原加载器
+            profiler: 启动分析器
+        """
+        self._loader = loader
+        self._profiler = profiler
+    
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+    
+    def create_module(self, spec):
+        """创建模块，交给原加载器处理
+        """
+        return self._loader.create_module(spec)
+    
+    def exec_module(self, module):
+        """执行模块并记录耗时
+        """
+        spec = getattr(module, "__spec__", None)
+        self._profiler._import_started(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._import_finished()
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self._loader
+            if spec is not None and spec.loader is self:
+                spec.loader = self._loader
+
+
+class _ImportTimer:
+    """插入sys.meta_path最前面的查找器，为其他查找器找到的模块包装计时加载器
+    """
+    
+    def __init__(self, profiler: "StartupProfiler"):
+        """初始化导入计时查找器
+        
+        Args:
+            profiler: 启动分析器
+        """
+        self._profiler = profiler
+    
+    def find_spec(self, fullname, path=None, target=None):
+        """依次调用其他查找器查找模块，找到后包装加载器
+        """
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """启动性能分析器
+    
+    记录三类数据并输出为JSON报告，便于比较不同版本的启动耗时：
+    模块导入耗时（与python -X importtime相同，分为自身耗时和包含子模块的累计耗时）、
+    各启动阶段的耗时，以及首次绘制窗口等关键时间点
+    """
+    
+    # 启用启动分析的环境变量，值为报告路径，设为1时使用默认路径
+    ENV_VAR = "LOTTERY_PROFILE_STARTUP"
+    # 启用启动分析的命令行参数，可用--profile-startup=报告路径指定路径
+    FLAG = "--profile-startup"
+    DEFAULT_REPORT_PATH = "startup_profile.json"
+    REPORT_VERSION = 1
+    
+    def __init__(self, report_path: str = DEFAULT_REPORT_PATH):
+        """初始化启动性能分析器
+        
+        Args:
+            report_path: 报告文件路径
+        """
+        self.report_path = report_path
+        self.imports: List[Dict[str, Any]] = []
+        self.phases: List[Dict[str, Any]] = []
+        self.marks: Dict[str, float] = {}
+        self._start = time.perf_counter()
+        self._import_stack = []  # 正在执行的模块：[模块名, 开始时间, 子模块累计耗时, 深度]
+        self._import_timer = None
+        self._first_paint_filter = None
+    
+    def start(self) -> None:
+        """开始记录模块导入耗时
+        """
+        if self._import_timer is None:
+            self._import_timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self._import_timer)
+    
+    def stop(self) -> None:
+        """停止记录模块导入耗时
+        """
+        if self._import_timer is not None:
+            if self._import_timer in sys.meta_path:
+                sys.meta_path.remove(self._import_timer)
+            self._import_timer = None
+    
+    def elapsed_ms(self) -> float:
+        """距开始分析经过的时间（毫秒）
+        """
+        return (time.perf_counter() - self._start) * 1000
+    
+    def _import_started(self, name: str) -> None:
+        """模块开始执行
+        """
+        self._import_stack.append([name, time.perf_counter(), 0.0, len(self._import_stack)])
+    
+    def _import_finished(self) -> None:
+        """模块执行结束，计算自身耗时和累计耗时
+        """
+        name, started, children, depth = self._import_stack.pop()
+        cumulative = time.perf_counter() - started
+        if self._import_stack:
+            self._import_stack[-1][2] += cumulative
+        self.imports.append({
+            'module': name,
+            'self_us': round((cumulative - children) * 1e6),
+            'cumulative_us': round(cumulative * 1e6),
+            'depth': depth
+        })
+    
+    @contextmanager
+    def phase(self, name: str):
+        """记录一个启动阶段的耗时
+        
+        Args:
+            name: 阶段名称
+        """
+        started = self.elapsed_ms()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'start_ms': round(started, 3),
+                'duration_ms': round(self.elapsed_ms() - started, 3)
+            })
+    
+    def mark(self, name: str) -> None:
+        """记录一个时间点，同名时间点只记录第一次
+        
+        Args:
+            name: 时间点名称
+        """
+        self.marks.setdefault(name, round(self.elapsed_ms(), 3))
+    
+    def watch_first_paint(self, window) -> None:
+        """记录窗口首次绘制的时间
+        
+        Args:
+            window: 主窗口
+        """
+        from PyQt5.QtCore import QObject, QEvent
+        
+        profiler = self
+        
+        class FirstPaintFilter(QObject):
+            def eventFilter(self, watched, event):
+                if event.type() == QEvent.Paint and "first_paint" not in profiler.marks:
+                    profiler.mark("first_paint")
+                    watched.removeEventFilter(self)
+                return False
+        
+        self._first_paint_filter = FirstPaintFilter(window)
+        window.installEventFilter(self._first_paint_filter)
+    
+    def finish(self) -> Optional[str]:
+        """结束分析并写出报告
+        
+        Returns:
+            报告文件路径，写入失败时返回None
+        """
+        import json
+        global _active_profiler
+        
+        self.mark("finished")
+        self.stop()
+        if _active_profiler is self:
+            _active_profiler = None
+        try:
+            with open(self.report_path, "w", encoding="utf-8") as f:
+                json.dump(self.get_report(), f, ensure_ascii=False, indent=2)
+            return self.report_path
+        except OSError:
+            return None
+    
+    def get_report(self) -> Dict[str, Any]:
+        """生成分析报告
+        
+        Returns:
+            报告字典
+        """
+        import platform
+        from datetime import datetime
+        
+        top_level = [item for item in self.imports if item['depth'] == 0]
+        return {
+            'version': self.REPORT_VERSION,
+            'created_at': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'compiled': "__compiled__" in globals() or bool(getattr(sys, "frozen", False)),
+            'import_total_ms': round(sum(item['cumulative_us'] for item in top_level) / 1000, 3),
+            'imports': self.imports,
+            'phases': self.phases,
+            'marks': self.marks
+        }
+
+
+_active_profiler: Optional[StartupProfiler] = None
+
+
+def start_from_environment(argv: Optional[List[str]] = None) -> Optional[StartupProfiler]:
+    """根据环境变量或命令行参数决定是否开始启动分析
+    
+    命令行中的--profile-startup参数会从argv中移除，避免传给Qt
+    
+    Args:
+        argv: 命令行参数列表，默认使用sys.argv
+    
+    Returns:
+        启动分析器，未启用时返回None
+    """
+    global _active_profiler
+    
+    if argv is None:
+        argv = sys.argv
+    report_path = os.environ.get(StartupProfiler.ENV_VAR)
+    for arg in list(argv[1:]):
+        if arg == StartupProfiler.FLAG or arg.startswith(StartupProfiler.FLAG + "="):
+            report_path = arg.partition("=")[2] or report_path or "1"
+            argv.remove(arg)
+    if not report_path or report_path == "0":
+        return None
+    
+    if report_path == "1":
+        report_path = StartupProfiler.DEFAULT_REPORT_PATH
+    _active_profiler = StartupProfiler(report_path)
+    _active_profiler.start()
+    return _active_profiler
+
+
+def get_profiler() -> Optional[StartupProfiler]:
+    """获取正在进行的启动分析器
+    
+    Returns:
+        启动分析器，未启用或已结束时返回None
+    """
+    return _active_profiler
+
+
+@contextmanager
+def phase(name: str):
+    """记录一个启动阶段的耗时，未启用启动分析时不做任何事
+    
+    也可以作为装饰器使用，只有启动分析进行中被调用时才会记录
+    
+    Args:
+        name: 阶段名称
+    """
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+def mark(name: str) -> None:
+    """记录一个时间点，未启用启动分析时不做任何事
+    
+    Args:
+        name: 时间点名称
+    """
+    if _active_profiler is not None:
+        _active_profiler.mark(name)
+
+
+def finish() -> Optional[str]:
+    """结束正在进行的启动分析并写出报告，未启用启动分析时不做任何事
+    
+    Returns:
+        报告文件路径，未启用或写入失败时返回None
+    """
+    if _active_profiler is None:
+        return None
+    return _active_profiler.finish()
+
+
+def compare_reports(old: Dict[str, Any], new: Dict[str, Any], limit: int = 20) -> Dict[str, Any]:
+    """比较两份启动分析报告
+    
+    Args:
+        old: 旧版本的报告
+        new: 新版本的报告
+        limit: 最多列出的导入耗时变化的模块数
+    
+    Returns:
+        比较结果，包含导入总耗时、各阶段、各时间点的变化，以及累计导入耗时变化最大的模块
+    """
+    def diff(old_value, new_value):
+        return {
+            'old': old_value,
+            'new': new_value,
+            'delta': round(new_value - old_value, 3) if old_value is not None and new_value is not None else None
+        }
+    
+    def phase_totals(report):
+        totals = {}
+        for item in report.get('phases', []):
+            totals[item['name']] = totals.get(item['name'], 0) + item['duration_ms']
+        return totals
+    
+    def import_times(report):
+        return {item['module']: item['cumulative_us'] / 1000 for item in report.get('imports', [])}
+    
+    old_phases, new_phases = phase_totals(old), phase_totals(new)
+    old_marks, new_marks = old.get('marks', {}), new.get('marks', {})
+    old_imports, new_imports = import_times(old), import_times(new)
+    
+    import_changes = [
+        dict({'module': module}, **diff(old_imports.get(module), new_imports.get(module)))
+        for module in set(old_imports) | set(new_imports)
+    ]
+    import_changes.sort(
+        key=lambda item: abs(item['delta']) if item['delta'] is not None else (item['old'] or item['new']),
+        reverse=True
+    )
+    
+    return {
+        'import_total_ms': diff(old.get('import_total_ms'), new.get('import_total_ms')),
+        'phases': {name: diff(old_phases.get(name), new_phases.get(name))
+                   for name in list(dict.fromkeys(list(old_phases) + list(new_phases)))},
+        'marks': {name: diff(old_marks.get(name), new_marks.get(name))
+                  for name in list(dict.fromkeys(list(old_marks) + list(new_marks)))},
+        'imports': import_changes[:limit]
+    }
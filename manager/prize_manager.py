@@ -1,5 +1,5 @@
 from db.sqlite_db import SQLiteDB
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 
 
 class PrizeManager:
@@ -8,6 +8,9 @@ class PrizeManager:
     用于管理奖品数据，包含增删改查功能
     """
     
+    # 允许排序的列，排序列名只从这里取，不直接拼接调用方传入的字符串
+    SORT_COLUMNS = ("name", "level", "quantity")
+    
     def __init__(self, db_path: str):
         """初始化奖品管理类
         
@@ -27,6 +30,10 @@ class PrizeManager:
             "quantity": "INTEGER DEFAULT 0"
         }
         self.db.create_table("prizes", columns)
+        # 按名称、等级、数量排序和按等级筛选时走索引，奖品多时不必全表排序
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_prizes_name ON prizes (name)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_prizes_level ON prizes (level)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_prizes_quantity ON prizes (quantity)")
     
     def add_prize(self, name: str, level: str, quantity: int = 0) -> int:
         """增加奖品数据
@@ -43,6 +50,19 @@ class PrizeManager:
         cursor = self.db.execute(sql, (name, level, quantity))
         return cursor.lastrowid
     
+    def add_prizes(self, prizes: List[Tuple[str, str, int]]) -> int:
+        """批量增加奖品数据
+        
+        Args:
+            prizes: 奖品列表，每项为(奖品名称, 奖品等级, 奖品数量)
+            
+        Returns:
+            增加的奖品数量
+        """
+        sql = "INSERT INTO prizes (name, level, quantity) VALUES (?, ?, ?)"
+        cursor = self.db.executemany(sql, prizes)
+        return cursor.rowcount
+    
     def delete_prize(self, prize_id: int) -> bool:
         """删除奖品数据
         
@@ -141,6 +161,23 @@ class PrizeManager:
         sql = "SELECT * FROM prizes WHERE level = ?"
         return self.db.fetch_all(sql, (level,))
     
+    def get_levels(self) -> List[str]:
+        """查询全部奖品等级，由等级索引直接得到，不读取奖品数据
+        
+        Returns:
+            按名称排序的奖品等级列表
+        """
+        return [row['level'] for row in self.db.fetch_all("SELECT DISTINCT level FROM prizes ORDER BY level")]
+    
+    def get_prize_keys(self) -> Set[Tuple[str, str]]:
+        """查询所有奖品的(名称, 等级)
+        
+        Returns:
+            (奖品名称, 奖品等级)集合
+        """
+        cursor = self.db.execute("SELECT DISTINCT name, level FROM prizes")
+        return {(row[0], row[1]) for row in cursor}
+    
     def get_all_prizes(self) -> List[Dict[str, Any]]:
         """
         查询所有奖品数据
@@ -150,6 +187,42 @@ class PrizeManager:
         sql = "SELECT * FROM prizes"
         return self.db.fetch_all(sql)
     
+    def query_prizes(self, keyword: Optional[str] = None, level: Optional[str] = None,
+                     sort_column: Optional[str] = None, descending: bool = False) -> List[Dict[str, Any]]:
+        """按条件筛选并排序奖品数据，筛选和排序都在数据库中完成
+        
+        Args:
+            keyword: 奖品名称关键字（可选）
+            level: 奖品等级（可选）
+            sort_column: 排序列，只能是SORT_COLUMNS中的列，为空时按ID排序
+            descending: 是否降序
+            
+        Returns:
+            奖品数据列表
+        """
+        if sort_column is not None and sort_column not in self.SORT_COLUMNS:
+            raise ValueError(f"不支持的排序列: {sort_column}")
+        
+        conditions = []
+        params = []
+        if keyword:
+            conditions.append("name LIKE ?")
+            params.append(f"%{keyword}%")
+        if level:
+            conditions.append("level = ?")
+            params.append(level)
+        
+        sql = "SELECT * FROM prizes"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        direction = "DESC" if descending else "ASC"
+        # 排序值相同时按ID排序，保证每次查询的顺序一致
+        if sort_column is None:
+            sql += f" ORDER BY id {direction}"
+        else:
+            sql += f" ORDER BY {sort_column} {direction}, id {direction}"
+        return self.db.fetch_all(sql, tuple(params))
+    
     def close(self) -> None:
         """关闭数据库连接
         """
@@ -0,0 +1,466 @@
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from db.sqlite_db import SQLiteDB
+from typing import Optional, List, Dict, Any
+
+
+class ResultManager:
+    """抽奖结果管理类
+    
+    用于持久化抽奖场次和每次抽奖结果
+    结果通过后台写线程批量写入数据库（write-behind），调用方只负责入队，不会阻塞界面
+    每批结果在一个事务中提交，并在同一事务中以条件UPDATE扣减奖品库存
+    写入失败（如数据库被其他程序锁定）的批次不会丢弃，保留在写线程中按退避间隔重试，直到写入成功
+    抽奖结果表同时作为追加写的日志，配合场次状态表中的检查点可以在程序崩溃后恢复场次
+    场次快照表记录场次开始时和中途变化时的抽奖选项、奖品库存和中奖设置，用于复现和验证场次
+    """
+    
+    # 同步策略与SQLite的synchronous参数对应
+    # full: 每次提交都fsync，断电也不会丢失已提交的批次
+    # normal: WAL模式下只在检查点时fsync，程序崩溃不丢数据，断电可能丢失最近的批次
+    # off: 不主动fsync，由操作系统决定落盘时机
+    SYNC_MODES = ("off", "normal", "full")
+    # 图形界面中通过环境变量或命令行参数选择同步策略，如现场抽奖时使用full
+    SYNC_ENV_VAR = "LOTTERY_SYNC_MODE"
+    SYNC_FLAG = "--sync"
+    # 写入失败后的重试间隔（秒），每次失败翻倍，不超过最大值
+    RETRY_DELAY = 0.5
+    MAX_RETRY_DELAY = 5.0
+    
+    def __init__(self, db_path: str, batch_size: int = 64, flush_interval: float = 0.2, sync_mode: str = "normal"):
+        """初始化抽奖结果管理类
+        
+        Args:
+            db_path: 数据库文件路径
+            batch_size: 每批最多合并提交的结果数
+            flush_interval: 攒批的最长等待时间（秒）
+            sync_mode: 同步策略，可选off、normal、full
+        """
+        if sync_mode not in self.SYNC_MODES:
+            raise ValueError(f"不支持的同步策略: {sync_mode}")
+        
+        self.db_path = db_path
+        self.db = SQLiteDB(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sync_mode = sync_mode
+        self.last_error: Optional[str] = None  # 最近一次写入失败的原因，写入成功后清空
+        self._init_result_tables()
+        
+        self._queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None  # 后台写线程，第一次写入时才启动
+    
+    @classmethod
+    def sync_mode_from_environment(cls, argv: Optional[List[str]] = None) -> str:
+        """根据命令行参数或环境变量确定同步策略
+        
+        命令行中的--sync=模式参数优先于环境变量，并会从argv中移除，避免传给Qt
+        
+        Args:
+            argv: 命令行参数列表
+            
+        Returns:
+            同步策略，都没有设置时为normal
+        """
+        sync_mode = os.environ.get(cls.SYNC_ENV_VAR) or "normal"
+        for arg in list(argv[1:] if argv else []):
+            if arg.startswith(cls.SYNC_FLAG + "="):
+                sync_mode = arg.partition("=")[2]
+                argv.remove(arg)
+        sync_mode = sync_mode.lower()
+        if sync_mode not in cls.SYNC_MODES:
+            raise ValueError(f"不支持的同步策略: {sync_mode}，可选: {', '.join(cls.SYNC_MODES)}")
+        return sync_mode
+    
+    def _init_result_tables(self) -> None:
+        """初始化抽奖场次表和抽奖结果表
+        """
+        session_columns = {
+            "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+            "seed": "TEXT NOT NULL",
+            "total_rounds": "INTEGER NOT NULL",
+            "allow_duplicate_winners": "INTEGER DEFAULT 1",
+            "status": "TEXT DEFAULT 'active'",
+            "created_at": "TEXT"
+        }
+        self.db.create_table("draw_sessions", session_columns)
+        
+        result_columns = {
+            "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+            "session_id": "INTEGER NOT NULL",
+            "round": "INTEGER NOT NULL",
+            "user_id": "INTEGER NOT NULL",
+            "username": "TEXT",
+            "employee_id": "TEXT",
+            "prize_id": "INTEGER NOT NULL",
+            "prize_name": "TEXT",
+            "prize_level": "TEXT",
+            "stock_deducted": "INTEGER DEFAULT 0",
+            "created_at": "TEXT"
+        }
+        self.db.create_table("draw_results", result_columns)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_draw_results_session ON draw_results (session_id, round)")
+        
+        state_columns = {
+            "session_id": "INTEGER PRIMARY KEY",
+            "current_round": "INTEGER NOT NULL",
+            "state": "TEXT NOT NULL",
+            "updated_at": "TEXT"
+        }
+        self.db.create_table("draw_session_state", state_columns)
+        
+        snapshot_columns = {
+            "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+            "session_id": "INTEGER NOT NULL",
+            "round": "INTEGER NOT NULL",
+            "snapshot": "TEXT NOT NULL",
+            "created_at": "TEXT"
+        }
+        self.db.create_table("draw_session_snapshots", snapshot_columns)
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_draw_session_snapshots_session ON draw_session_snapshots (session_id, round)"
+        )
+    
+    def create_session(self, seed: int, total_rounds: int, allow_duplicate_winners: bool,
+                       snapshot: Optional[Dict[str, Any]] = None) -> int:
+        """创建抽奖场次
+        
+        Args:
+            seed: 场次随机种子
+            total_rounds: 抽奖总轮次
+            allow_duplicate_winners: 是否允许重复抽中相同人员
+            snapshot: 场次开始时的快照（见session_replay.session_snapshot），与场次在同一事务中写入
+        
+        Returns:
+            新场次的ID
+        """
+        sql = ("INSERT INTO draw_sessions (seed, total_rounds, allow_duplicate_winners, status, created_at) "
+               "VALUES (?, ?, ?, 'active', ?)")
+        created_at = self._now()
+        with self.db.transaction():
+            cursor = self.db.execute(sql, (str(seed), total_rounds, int(allow_duplicate_winners), created_at))
+            if snapshot is not None:
+                self._insert_snapshot(self.db.connection, cursor.lastrowid, 0, snapshot, created_at)
+        return cursor.lastrowid
+    
+    def record_result(self, session_id: int, round_no: int, result: Dict[str, Any],
+                      checkpoint: Optional[Dict[str, Any]] = None) -> None:
+        """记录一次抽奖结果，立即返回，由后台线程批量写入
+        
+        Args:
+            session_id: 场次ID
+            round_no: 轮次
+            result: 抽奖结果
+            checkpoint: 抽奖后的场次检查点，与结果在同一事务中写入
+        """
+        self._enqueue(("result", session_id, round_no, dict(result), self._now(), checkpoint))
+    
+    def save_checkpoint(self, session_id: int, checkpoint: Dict[str, Any]) -> None:
+        """记录场次检查点，用于没有产生中奖结果的轮次
+        
+        Args:
+            session_id: 场次ID
+            checkpoint: 场次检查点
+        """
+        self._enqueue(("checkpoint", session_id, checkpoint, self._now()))
+    
+    def save_snapshot(self, session_id: int, round_no: int, snapshot: Dict[str, Any]) -> None:
+        """记录场次中途的快照，与抽奖结果按顺序写入
+        
+        Args:
+            session_id: 场次ID
+            round_no: 快照生效时已完成的轮次
+            snapshot: 场次快照
+        """
+        self._enqueue(("snapshot", session_id, round_no, snapshot, self._now()))
+    
+    def set_session_status(self, session_id: int, status: str) -> None:
+        """修改场次状态，与抽奖结果按顺序写入
+        
+        Args:
+            session_id: 场次ID
+            status: 场次状态（active、finished）
+        """
+        self._enqueue(("status", session_id, status))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待已入队的数据全部写入数据库
+        
+        有写入失败的批次时会立即重试一次，仍然失败时返回False，失败原因见last_error
+        
+        Args:
+            timeout: 最长等待时间（秒），默认一直等待
+        
+        Returns:
+            是否在超时前全部写入成功
+        """
+        if self._writer is None and self._queue.empty():
+            return True
+        status = {"event": threading.Event(), "ok": False}
+        self._enqueue(("flush", status))
+        return status["event"].wait(timeout) and status["ok"]
+    
+    def ensure_flushed(self, timeout: Optional[float] = None) -> None:
+        """等待已入队的数据全部写入数据库，未能写入时抛出异常
+        
+        Args:
+            timeout: 最长等待时间（秒），默认一直等待
+        """
+        if not self.flush(timeout):
+            raise RuntimeError(f"抽奖结果未能写入数据库: {self.last_error or '等待超时'}")
+    
+    def discard_session(self, session_id: int) -> bool:
+        """删除场次及其抽奖结果，并归还已扣减的奖品库存
+        
+        尚未写入的结果必须先写入，否则重试成功后会把已删除场次的结果重新写回
+        
+        Args:
+            session_id: 场次ID
+        
+        Returns:
+            是否删除成功
+        """
+        self.ensure_flushed()
+        if not self.db.connection:
+            self.db.connect()
+        connection = self.db.connection
+        with connection:
+            deducted = connection.execute(
+                "SELECT prize_id, COUNT(*) AS cnt FROM draw_results "
+                "WHERE session_id = ? AND stock_deducted = 1 GROUP BY prize_id",
+                (session_id,)
+            ).fetchall()
+            connection.executemany(
+                "UPDATE prizes SET quantity = quantity + ? WHERE id = ?",
+                [(row["cnt"], row["prize_id"]) for row in deducted]
+            )
+            connection.execute("DELETE FROM draw_results WHERE session_id = ?", (session_id,))
+            connection.execute("DELETE FROM draw_session_state WHERE session_id = ?", (session_id,))
+            connection.execute("DELETE FROM draw_session_snapshots WHERE session_id = ?", (session_id,))
+            cursor = connection.execute("DELETE FROM draw_sessions WHERE id = ?", (session_id,))
+        return cursor.rowcount > 0
+    
+    def get_session_by_id(self, session_id: int) -> Optional[Dict[str, Any]]:
+        """根据ID查询抽奖场次
+        
+        Args:
+            session_id: 场次ID
+        
+        Returns:
+            场次信息字典
+        """
+        sql = "SELECT * FROM draw_sessions WHERE id = ?"
+        return self.db.fetch_one(sql, (session_id,))
+    
+    def get_latest_session(self) -> Optional[Dict[str, Any]]:
+        """查询最近创建的抽奖场次
+        
+        Returns:
+            场次信息字典，没有场次时返回None
+        """
+        return self.db.fetch_one("SELECT * FROM draw_sessions ORDER BY id DESC LIMIT 1")
+    
+    def get_results_by_session(self, session_id: int) -> List[Dict[str, Any]]:
+        """查询场次的全部抽奖结果
+        
+        Args:
+            session_id: 场次ID
+        
+        Returns:
+            按轮次排序的抽奖结果列表
+        """
+        sql = "SELECT * FROM draw_results WHERE session_id = ? ORDER BY round, id"
+        return self.db.fetch_all(sql, (session_id,))
+    
+    def get_session_snapshots(self, session_id: int) -> List[Dict[str, Any]]:
+        """查询场次的全部快照
+        
+        Args:
+            session_id: 场次ID
+        
+        Returns:
+            按轮次排序的快照列表，每项包含round和解析后的snapshot
+        """
+        sql = "SELECT round, snapshot FROM draw_session_snapshots WHERE session_id = ? ORDER BY round, id"
+        return [
+            {'round': row['round'], 'snapshot': json.loads(row['snapshot'])}
+            for row in self.db.fetch_all(sql, (session_id,))
+        ]
+    
+    def get_session_round(self, session_id: int) -> int:
+        """查询场次已完成的轮次
+        
+        Args:
+            session_id: 场次ID
+        
+        Returns:
+            最近一次检查点中的轮次，还没有抽奖时为0
+        """
+        state = self.db.fetch_one("SELECT current_round FROM draw_session_state WHERE session_id = ?", (session_id,))
+        return state['current_round'] if state else 0
+    
+    def get_interrupted_session(self) -> Optional[Dict[str, Any]]:
+        """查询最近一个未完成的场次
+        
+        Returns:
+            场次信息字典，包含current_round和解析后的检查点checkpoint，没有时返回None
+        """
+        sql = ("SELECT s.*, st.current_round, st.state FROM draw_sessions s "
+               "JOIN draw_session_state st ON st.session_id = s.id "
+               "WHERE s.status = 'active' ORDER BY s.id DESC LIMIT 1")
+        session = self.db.fetch_one(sql)
+        if session:
+            session['checkpoint'] = json.loads(session.pop('state'))
+        return session
+    
+    def _enqueue(self, item: tuple) -> None:
+        """将待写入的数据放入队列，需要时启动后台写线程
+        
+        Args:
+            item: 待写入的数据
+        """
+        # 写线程意外退出后重新启动，否则之后入队的数据无人写入
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._writer_loop, name="ResultWriter", daemon=True)
+            self._writer.start()
+        self._queue.put(item)
+    
+    def _writer_loop(self) -> None:
+        """后台写线程，攒批后在一个事务中写入
+        
+        写入失败的数据保留在pending中，按退避间隔重试，重试时排在新数据之前，写入顺序不变
+        """
+        db = SQLiteDB(self.db_path)
+        pending = []
+        retry_delay = self.RETRY_DELAY
+        running = True
+        while running:
+            try:
+                # 有待重试的数据时最多等待一个退避间隔
+                batch = [self._queue.get(timeout=retry_delay if pending else None)]
+            except queue.Empty:
+                batch = []
+            # 在等待时间内尽量多攒一些结果，合并成一次提交
+            while batch and len(batch) < self.batch_size and batch[-1][0] not in ("flush", "stop"):
+                try:
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+                except queue.Empty:
+                    break
+            
+            writes = pending + [item for item in batch if item[0] not in ("flush", "stop")]
+            if writes:
+                try:
+                    self._write_batch(db, writes)
+                    pending = []
+                    retry_delay = self.RETRY_DELAY
+                    self.last_error = None
+                except Exception as e:
+                    # 连接可能处于异常状态，重试时重新连接
+                    db.close()
+                    pending = writes
+                    retry_delay = min(retry_delay * 2, self.MAX_RETRY_DELAY)
+                    self.last_error = str(e)
+            
+            for item in batch:
+                if item[0] == "flush":
+                    item[1]["ok"] = not pending
+                    item[1]["event"].set()
+                elif item[0] == "stop":
+                    running = False
+        
+        db.close()
+    
+    def _write_batch(self, db: SQLiteDB, items: List[tuple]) -> None:
+        """在一个事务中写入一批数据
+        
+        Args:
+            db: 写线程专用的数据库连接
+            items: 待写入的数据
+        """
+        if not db.connection:
+            db.connect()
+            db.connection.execute("PRAGMA journal_mode = WAL")
+            db.connection.execute(f"PRAGMA synchronous = {self.sync_mode.upper()}")
+        connection = db.connection
+        with connection:
+            rows = []
+            checkpoints = {}  # 每个场次只保留本批中最新的检查点
+            for item in items:
+                if item[0] == "result":
+                    _, session_id, round_no, result, created_at, checkpoint = item
+                    if checkpoint is not None:
+                        checkpoints[session_id] = (checkpoint, created_at)
+                    # 条件扣减库存，库存已为0时不会被扣成负数
+                    cursor = connection.execute(
+                        "UPDATE prizes SET quantity = quantity - 1 WHERE id = ? AND quantity > 0",
+                        (result['prize_id'],)
+                    )
+                    rows.append((
+                        session_id, round_no, result['user_id'], result['username'], result['employee_id'],
+                        result['prize_id'], result['prize_name'], result['prize_level'],
+                        1 if cursor.rowcount > 0 else 0, created_at
+                    ))
+                elif item[0] == "checkpoint":
+                    _, session_id, checkpoint, created_at = item
+                    checkpoints[session_id] = (checkpoint, created_at)
+                elif item[0] == "snapshot":
+                    if rows:
+                        self._insert_results(connection, rows)
+                        rows = []
+                    _, session_id, round_no, snapshot, created_at = item
+                    self._insert_snapshot(connection, session_id, round_no, snapshot, created_at)
+                elif item[0] == "status":
+                    if rows:
+                        self._insert_results(connection, rows)
+                        rows = []
+                    _, session_id, status = item
+                    connection.execute("UPDATE draw_sessions SET status = ? WHERE id = ?", (status, session_id))
+            if rows:
+                self._insert_results(connection, rows)
+            if checkpoints:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO draw_session_state (session_id, current_round, state, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (session_id, checkpoint['current_round'], json.dumps(checkpoint), created_at)
+                        for session_id, (checkpoint, created_at) in checkpoints.items()
+                    ]
+                )
+    
+    @staticmethod
+    def _insert_results(connection, rows: List[tuple]) -> None:
+        """批量插入抽奖结果
+        """
+        connection.executemany(
+            "INSERT INTO draw_results (session_id, round, user_id, username, employee_id, prize_id, "
+            "prize_name, prize_level, stock_deducted, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+    
+    @staticmethod
+    def _insert_snapshot(connection, session_id: int, round_no: int, snapshot: Dict[str, Any], created_at: str) -> None:
+        """插入一条场次快照
+        """
+        connection.execute(
+            "INSERT INTO draw_session_snapshots (session_id, round, snapshot, created_at) VALUES (?, ?, ?, ?)",
+            (session_id, round_no, json.dumps(snapshot, ensure_ascii=False), created_at)
+        )
+    
+    @staticmethod
+    def _now() -> str:
+        """当前时间字符串
+        """
+        return datetime.now().isoformat(timespec="seconds")
+    
+    def close(self) -> None:
+        """写入剩余数据并关闭数据库连接
+        
+        关闭前最后一次写入仍失败时，未写入的数据会丢失，失败原因见last_error
+        """
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(("stop",))
+            self._writer.join()
+        self.db.close()
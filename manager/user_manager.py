@@ -1,6 +1,6 @@
 from db.sqlite_db import SQLiteDB
 from manager.winner_manager import WinnerManager
-from typing import Optional, List, Dict, Any
+from typing import Optional, Callable, Iterable, List, Dict, Any, Set, Tuple
 
 
 class UserManager:
@@ -28,6 +28,8 @@ class UserManager:
             "employee_id": "TEXT"
         }
         self.db.create_table("users", columns)
+        # 同步导入按工号对比用户
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_users_employee_id ON users (employee_id)")
     
     def add_user(self, username: str, employee_id: str) -> int:
         """增加用户数据
@@ -43,6 +45,91 @@ class UserManager:
         cursor = self.db.execute(sql, (username, employee_id))
         return cursor.lastrowid
     
+    def add_users(self, users: List[Tuple[str, str]]) -> int:
+        """批量增加用户数据
+        
+        Args:
+            users: 用户列表，每项为(用户名, 工号)
+            
+        Returns:
+            增加的用户数量
+        """
+        sql = "INSERT INTO users (username, employee_id) VALUES (?, ?)"
+        cursor = self.db.executemany(sql, users)
+        return cursor.rowcount
+    
+    def sync_users(self, batches: Iterable[List[Tuple[int, str, str]]], delete_missing: bool = True,
+                   dry_run: bool = False,
+                   validate: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """按工号把用户表同步为给定的数据
+        
+        数据先写入按工号建索引的临时表，再与用户表对比，只插入新工号、修改用户名有变化的用户、
+        删除不在数据中的工号（同时删除其中奖设置）；整个同步在一个事务中完成，出错时全部回滚。
+        没有工号的已有用户不参与同步；数据中没有任何用户时拒绝同步，以免删除全部用户
+        
+        Args:
+            batches: 多批数据，每项为(行号, 用户名, 工号)，工号不能为空
+            delete_missing: 是否删除不在数据中的工号
+            dry_run: 只统计会发生的变化，不修改用户表
+            validate: 统计出变化后、修改用户表前调用，参数为同步结果，抛出异常时整个同步回滚
+            
+        Returns:
+            同步结果，包含inserted、updated、deleted、unchanged的数量，
+            以及duplicates（工号重复而被忽略的数据，保留每个工号第一次出现的行）
+        """
+        in_sync = "SELECT 1 FROM temp.user_sync s WHERE s.employee_id = users.employee_id"
+        with self.db.transaction():
+            self.db.execute("DROP TABLE IF EXISTS temp.user_sync")
+            self.db.execute(
+                "CREATE TEMP TABLE user_sync (line INTEGER PRIMARY KEY, username TEXT NOT NULL, employee_id TEXT NOT NULL)"
+            )
+            for batch in batches:
+                self.db.executemany("INSERT INTO temp.user_sync (line, username, employee_id) VALUES (?, ?, ?)", batch)
+            self.db.execute("CREATE INDEX temp.idx_user_sync_employee_id ON user_sync (employee_id, line)")
+            
+            # 同一工号只保留第一次出现的行
+            duplicate_filter = ("FROM temp.user_sync s WHERE EXISTS "
+                                "(SELECT 1 FROM temp.user_sync t WHERE t.employee_id = s.employee_id AND t.line < s.line)")
+            duplicates = self.db.fetch_all(f"SELECT s.line, s.username, s.employee_id {duplicate_filter} ORDER BY s.line")
+            if duplicates:
+                self.db.execute(f"DELETE FROM temp.user_sync WHERE line IN (SELECT s.line {duplicate_filter})")
+            total = self.db.fetch_one("SELECT COUNT(*) AS cnt FROM temp.user_sync")['cnt']
+            
+            # 先统计会发生的变化，确认后再修改用户表
+            new_rows = "FROM temp.user_sync s WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.employee_id = s.employee_id)"
+            changed_users = f"FROM users WHERE EXISTS ({in_sync} AND s.username <> users.username)"
+            missing = f"SELECT id FROM users WHERE employee_id <> '' AND NOT EXISTS ({in_sync})"
+            result = {
+                "inserted": self.db.fetch_one(f"SELECT COUNT(*) AS cnt {new_rows}")['cnt'],
+                "updated": self.db.fetch_one(f"SELECT COUNT(*) AS cnt {changed_users}")['cnt'],
+                "deleted": self.db.fetch_one(f"SELECT COUNT(*) AS cnt FROM ({missing})")['cnt'] if delete_missing else 0,
+                "unchanged": self.db.fetch_one(
+                    "SELECT COUNT(*) AS cnt FROM temp.user_sync s WHERE EXISTS "
+                    "(SELECT 1 FROM users u WHERE u.employee_id = s.employee_id AND u.username = s.username)"
+                )['cnt'],
+                "duplicates": duplicates
+            }
+            if total == 0 and result["deleted"] > 0:
+                raise ValueError("没有有效的用户数据，已拒绝同步，以免删除全部用户")
+            if validate:
+                validate(result)
+            
+            if not dry_run:
+                self.db.execute(
+                    "UPDATE users SET username = "
+                    "(SELECT s.username FROM temp.user_sync s WHERE s.employee_id = users.employee_id) "
+                    f"WHERE EXISTS ({in_sync} AND s.username <> users.username)"
+                )
+                if delete_missing:
+                    self.db.execute(f"DELETE FROM winners WHERE user_id IN ({missing})")
+                    self.db.execute(f"DELETE FROM users WHERE id IN ({missing})")
+                self.db.execute(
+                    f"INSERT INTO users (username, employee_id) SELECT s.username, s.employee_id {new_rows} ORDER BY s.line"
+                )
+            self.db.execute("DROP TABLE temp.user_sync")
+        
+        return result
+    
     def delete_user(self, user_id: int) -> bool:
         """删除用户数据
         
@@ -113,6 +200,47 @@ class UserManager:
         sql = "SELECT * FROM users"
         return self.db.fetch_all(sql)
     
+    def get_employee_ids(self) -> Set[str]:
+        """查询所有非空的工号
+        
+        Returns:
+            工号集合
+        """
+        cursor = self.db.execute("SELECT DISTINCT employee_id FROM users WHERE employee_id <> ''")
+        return {row[0] for row in cursor}
+    
+    def count_users(self, keyword: Optional[str] = None) -> int:
+        """统计用户数量
+        
+        Args:
+            keyword: 用户名关键字，为空时统计全部用户
+            
+        Returns:
+            用户数量
+        """
+        if keyword:
+            row = self.db.fetch_one("SELECT COUNT(*) AS cnt FROM users WHERE username LIKE ?", (f"%{keyword}%",))
+        else:
+            row = self.db.fetch_one("SELECT COUNT(*) AS cnt FROM users")
+        return row['cnt'] if row else 0
+    
+    def get_users_page(self, offset: int, limit: int, keyword: Optional[str] = None) -> List[Dict[str, Any]]:
+        """分页查询用户数据，按ID排序
+        
+        Args:
+            offset: 起始位置
+            limit: 最多返回的数量
+            keyword: 用户名关键字，为空时查询全部用户
+            
+        Returns:
+            用户数据列表
+        """
+        if keyword:
+            sql = "SELECT * FROM users WHERE username LIKE ? ORDER BY id LIMIT ? OFFSET ?"
+            return self.db.fetch_all(sql, (f"%{keyword}%", limit, offset))
+        sql = "SELECT * FROM users ORDER BY id LIMIT ? OFFSET ?"
+        return self.db.fetch_all(sql, (limit, offset))
+    
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """根据用户名查询用户数据
         
@@ -161,6 +161,22 @@ class WinnerManager:
         sql = "SELECT * FROM winners"
         return self.db.fetch_all(sql)
     
+    def get_users_with_rules(self, keyword: Optional[str] = None) -> List[Dict[str, Any]]:
+        """查询用户及其中奖设置，没有中奖设置的用户中奖可能性为0
+        
+        Args:
+            keyword: 用户名关键字，为空时查询全部用户
+            
+        Returns:
+            用户数据列表，每个用户包含winning_probability和prize_id
+        """
+        sql = ("SELECT u.id, u.username, u.employee_id, "
+               "COALESCE(w.winning_probability, 0) AS winning_probability, w.prize_id "
+               "FROM users u LEFT JOIN winners w ON w.user_id = u.id")
+        if keyword:
+            return self.db.fetch_all(sql + " WHERE u.username LIKE ? ORDER BY u.id", (f"%{keyword}%",))
+        return self.db.fetch_all(sql + " ORDER BY u.id")
+    
     def close(self) -> None:
         """关闭数据库连接
         """
@@ -1,10 +1,15 @@
-import random
-import csv
 import os
 from manager.user_manager import UserManager
 from manager.prize_manager import PrizeManager
 from manager.winner_manager import WinnerManager
-from typing import List, Dict, Any
+from manager.result_manager import ResultManager
+from main_logic.draw_engine import DrawEngine
+from main_logic.draw_random import DrawRandom
+from main_logic.animation_feed import AnimationFeed
+from main_logic.prize_pool import default_level_order
+from main_logic.data_exporter import DataExporter
+from main_logic import session_replay
+from typing import Optional, Callable, List, Dict, Any
 
 
 class LotteryViewModel:
@@ -13,47 +18,200 @@ class LotteryViewModel:
     负责处理抽奖相关的业务逻辑，并与抽奖界面进行数据绑定
     """
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, sync_mode: str = "normal"):
         """初始化抽奖视图模型
         
         Args:
             db_path: 数据库文件路径
+            sync_mode: 抽奖结果写入数据库的同步策略（off、normal、full），见ResultManager
         """
         self.user_manager = UserManager(db_path)
         self.prize_manager = PrizeManager(db_path)
         self.winner_manager = WinnerManager(db_path)
-        self.lottery_results = []
+        self.result_manager = ResultManager(db_path, sync_mode=sync_mode)
+        self.session_id = None  # 当前场次在数据库中的ID，第一次抽奖前才创建
         self.total_rounds = 10  # 默认总轮次
-        self.current_round = 0  # 当前轮次
-        self.must_win_users_won = set()  # 记录已中奖的必中奖用户
         self.allow_duplicate_winners = True  # 是否允许重复抽中相同人员，默认允许
-        self.winners_history = set()  # 记录已中奖的所有用户ID
+        self.level_order = None  # 奖品等级抽取顺序，None表示不分等级
+        self.prize_selection = "uniform"  # 奖品抽取方式，默认每种奖品概率相同
+        self.animation_rng = DrawRandom()  # 抽奖动画使用的随机数生成器，与真实抽奖互不干扰
+        self.animation_feed = AnimationFeed(self.animation_rng)  # 抽奖动画的预渲染显示队列
+        self.result_listeners = []  # 抽奖结果监听器，每次创建引擎时重新注册
+        self.engine = None
         self._load_data()
     
-    def _load_data(self):
-        """加载数据到字典
+    def _load_data(self, seed: Optional[int] = None):
+        """加载数据并创建抽奖引擎
+        
+        已有抽奖场次时由新引擎接管当前进度，否则以指定种子开始新的场次
+        
+        Args:
+            seed: 新场次的随机种子，默认生成新的种子
         """
+        # 等待后台写入完成，确保读取到的奖品库存已扣减本场的中奖结果；未能写入时保留当前引擎不变
+        self.result_manager.ensure_flushed()
+        
         # 加载用户数据
         self.users = self.user_manager.get_all_users()
         
         # 加载奖品数据
         self.prizes = self.prize_manager.get_all_prizes()
         
-        # 加载中奖概率数据
+        # 加载中奖概率数据及必中奖品
         self.winners = {}
+        self.must_win_prizes = {}
         for winner in self.winner_manager.get_all_winners():
             self.winners[winner['user_id']] = winner['winning_probability']
-        
-        # 初始化奖品数量本地缓存
-        self.prize_quantities = {}
-        for prize in self.prizes:
-            self.prize_quantities[prize['id']] = prize['quantity']
+            if winner['prize_id']:
+                self.must_win_prizes[winner['user_id']] = winner['prize_id']
+        
+        previous_engine = self.engine
+        self.engine = DrawEngine(
+            self.users, self.prizes, self.winners, self.must_win_prizes,
+            total_rounds=self.total_rounds,
+            allow_duplicate_winners=self.allow_duplicate_winners,
+            rng=DrawRandom(seed),
+            level_order=self.level_order,
+            prize_selection=self.prize_selection
+        )
+        if previous_engine is not None:
+            self.engine.adopt_session(previous_engine)
+            # 场次进行中重新加载了数据，记录新的库存和中奖设置，验证场次时从这一轮起使用
+            self._save_snapshot(include_data=True)
+        else:
+            for listener in self.result_listeners:
+                self.engine.add_result_listener(listener)
+            self.engine.notify_results_reset()
     
     def reload_data(self):
         """重新加载数据
         """
         self._load_data()
     
+    def add_result_listener(self, listener):
+        """添加抽奖结果监听器，新结果和结果整体替换时都会收到通知
+        
+        Args:
+            listener: 监听器，以listener(event, results)的形式调用，event为append或reset
+        """
+        if listener not in self.result_listeners:
+            self.result_listeners.append(listener)
+        self.engine.add_result_listener(listener)
+    
+    def get_session_seed(self) -> int:
+        """获取当前抽奖场次的随机种子
+        
+        Returns:
+            随机种子
+        """
+        return self.engine.rng.initial_seed
+    
+    def start_session(self, seed: Optional[int] = None):
+        """清空当前场次并开始新的场次
+        
+        种子只决定随机数序列，抽奖结果还取决于用户、中奖设置、奖品库存和抽奖选项。
+        库存在抽奖时已持久化扣减，之后的场次从扣减后的库存开始，因此用相同的种子重新开始
+        一般不能得到与原场次相同的结果；要复现或验证已进行的场次使用verify_session，
+        它按场次记录的种子和快照重新抽奖，断点恢复见resume_session
+        
+        Args:
+            seed: 随机种子，默认生成新的种子
+        """
+        self.engine = None
+        self.session_id = None
+        self._load_data(seed)
+    
+    def ensure_session(self) -> int:
+        """确保当前场次已在数据库中创建
+        
+        Returns:
+            场次ID
+        """
+        if self.session_id is None:
+            self.session_id = self.result_manager.create_session(
+                self.get_session_seed(), self.total_rounds, self.allow_duplicate_winners,
+                snapshot=session_replay.session_snapshot(self.engine)
+            )
+        return self.session_id
+    
+    def _save_snapshot(self, include_data: bool = False):
+        """场次已创建时记录当前的快照，用于验证场次
+        
+        Args:
+            include_data: 是否包含奖品库存、中奖设置和名单摘要，只修改抽奖选项时不需要
+        """
+        if self.session_id is not None:
+            self.result_manager.save_snapshot(
+                self.session_id, self.engine.current_round, session_replay.session_snapshot(self.engine, include_data)
+            )
+    
+    def verify_session(self, session_id: Optional[int] = None) -> Dict[str, Any]:
+        """按场次记录的种子和快照重新抽奖，与数据库中的抽奖结果逐轮比较
+        
+        人员名单需与场次进行时相同（按名单摘要检查），奖品库存和中奖设置使用快照中的数据，
+        与数据库中的当前数据无关
+        
+        Args:
+            session_id: 场次ID，默认为当前场次
+            
+        Returns:
+            验证结果，见session_replay.verify_session
+        """
+        self.result_manager.ensure_flushed()
+        session_id = session_id or self.session_id
+        session = self.result_manager.get_session_by_id(session_id) if session_id else None
+        if session is None:
+            raise ValueError(f"抽奖场次不存在: {session_id}")
+        return session_replay.verify_session(
+            session,
+            self.result_manager.get_session_snapshots(session_id),
+            self.user_manager.get_all_users(),
+            self.result_manager.get_results_by_session(session_id),
+            self.result_manager.get_session_round(session_id)
+        )
+    
+    def get_interrupted_session(self) -> Optional[Dict[str, Any]]:
+        """获取上次未完成的抽奖场次
+        
+        Returns:
+            场次信息，没有时返回None
+        """
+        return self.result_manager.get_interrupted_session()
+    
+    def resume_session(self, session: Dict[str, Any]):
+        """恢复未完成的抽奖场次
+        
+        奖品库存在抽奖时已持久化扣减，直接从数据库读取即为剩余库存；
+        中奖结果从日志一次性读出，引擎在一次遍历中重建候选池，不经过界面逐条重放
+        
+        Args:
+            session: get_interrupted_session返回的场次信息
+        """
+        checkpoint = session['checkpoint']
+        self.total_rounds = checkpoint['total_rounds']
+        self.allow_duplicate_winners = checkpoint['allow_duplicate_winners']
+        self.level_order = checkpoint.get('level_order')
+        self.prize_selection = checkpoint.get('prize_selection', "uniform")
+        self.start_session(int(session['seed']))
+        self.engine.restore_session(checkpoint, self.result_manager.get_results_by_session(session['id']))
+        self.session_id = session['id']
+        # 恢复时的数据可能与中断前不同，从当前轮次起使用新的快照
+        self._save_snapshot(include_data=True)
+    
+    def abandon_session(self, session: Dict[str, Any]):
+        """放弃未完成的抽奖场次，已抽出的结果和已扣减的库存保留
+        
+        Args:
+            session: get_interrupted_session返回的场次信息
+        """
+        self.result_manager.set_session_status(session['id'], "abandoned")
+    
+    @property
+    def prize_quantities(self) -> Dict[int, int]:
+        """奖品数量本地缓存
+        """
+        return self.engine.prize_quantities
+    
     def set_total_rounds(self, rounds: int):
         """设置抽奖总轮次
         
@@ -62,6 +220,8 @@ class LotteryViewModel:
         """
         if rounds > 0:
             self.total_rounds = rounds
+            self.engine.total_rounds = rounds
+            self._save_snapshot()
     
     def get_total_rounds(self) -> int:
         """获取抽奖总轮次
@@ -77,7 +237,7 @@ class LotteryViewModel:
         Returns:
             当前轮次数
         """
-        return self.current_round
+        return self.engine.current_round
     
     def set_allow_duplicate_winners(self, allow: bool):
         """设置是否允许重复抽中相同人员
@@ -86,6 +246,8 @@ class LotteryViewModel:
             allow: 是否允许重复抽中相同人员
         """
         self.allow_duplicate_winners = allow
+        self.engine.set_allow_duplicate_winners(allow)
+        self._save_snapshot()
     
     def get_allow_duplicate_winners(self) -> bool:
         """获取是否允许重复抽中相同人员
@@ -95,20 +257,65 @@ class LotteryViewModel:
         """
         return self.allow_duplicate_winners
     
+    def get_prize_levels(self) -> List[str]:
+        """获取默认顺序的全部奖品等级
+        
+        Returns:
+            奖品等级列表，按数量从多到少排列
+        """
+        return default_level_order(self.prizes)
+    
+    def set_level_order(self, level_order: Optional[List[str]]):
+        """设置奖品等级的抽取顺序
+        
+        Args:
+            level_order: 奖品等级列表，为None时不分等级从全部奖品中抽取
+        """
+        self.level_order = list(level_order) if level_order else None
+        self.engine.set_level_order(self.level_order)
+        self._save_snapshot()
+    
+    def get_level_order(self) -> Optional[List[str]]:
+        """获取奖品等级的抽取顺序
+        
+        Returns:
+            奖品等级列表，未设置时返回None
+        """
+        return self.level_order
+    
+    def set_weighted_prize_selection(self, weighted: bool):
+        """设置是否按剩余数量加权抽取奖品
+        
+        Args:
+            weighted: 为True时剩余越多的奖品越容易抽中，为False时每种奖品概率相同
+        """
+        self.prize_selection = "weighted" if weighted else "uniform"
+        self.engine.set_prize_selection(self.prize_selection)
+        self._save_snapshot()
+    
+    def get_weighted_prize_selection(self) -> bool:
+        """获取是否按剩余数量加权抽取奖品
+        
+        Returns:
+            是否加权抽取
+        """
+        return self.prize_selection == "weighted"
+    
+    def get_active_level(self) -> Optional[str]:
+        """获取当前抽取的奖品等级
+        
+        Returns:
+            奖品等级，未按等级抽取时返回None
+        """
+        return self.engine.get_active_level()
+    
     def get_available_users(self) -> List[Dict[str, Any]]:
         """获取可参与抽奖的用户
         
         Returns:
             可参与抽奖的用户列表
         """
-        available_users = []
-        for user in self.users:
-            # 必不中奖用户不参与
-            if self.winners.get(user['id'], 0) != 2:
-                # 检查是否允许重复中奖，如果不允许，则排除已经中奖的用户
-                if self.allow_duplicate_winners or user['id'] not in self.winners_history:
-                    available_users.append(user)
-        return available_users
+        return self.engine.get_available_users()
     
     def get_must_win_users(self) -> List[Dict[str, Any]]:
         """获取必中奖用户
@@ -116,18 +323,7 @@ class LotteryViewModel:
         Returns:
             必中奖用户列表，每个用户包含user_id和prize_id（如果有）
         """
-        must_win_users = []
-        for user in self.users:
-            if self.winners.get(user['id'], 0) == 1:
-                # 检查是否允许重复中奖，如果不允许，则排除已经中奖的用户
-                if self.allow_duplicate_winners or user['id'] not in self.winners_history:
-                    # 获取用户的必中奖品信息
-                    winner_info = self.winner_manager.get_winner_by_user_id(user['id'])
-                    user_with_prize = user.copy()
-                    if winner_info:
-                        user_with_prize['prize_id'] = winner_info.get('prize_id')
-                    must_win_users.append(user_with_prize)
-        return must_win_users
+        return self.engine.get_must_win_users()
     
     def get_available_prizes(self) -> List[Dict[str, Any]]:
         """获取可用奖品
@@ -135,12 +331,30 @@ class LotteryViewModel:
         Returns:
             可用奖品列表
         """
-        available_prizes = []
-        for prize in self.prizes:
-            # 检查本地缓存中的奖品数量是否大于0
-            if self.prize_quantities.get(prize['id'], 0) > 0:
-                available_prizes.append(prize)
-        return available_prizes
+        return self.engine.get_available_prizes()
+    
+    def start_animation(self) -> bool:
+        """开始生成抽奖动画的显示内容
+        
+        显示全部用户（包括必不中奖用户）和当前可抽取的奖品
+        
+        Returns:
+            是否有可显示的内容
+        """
+        return self.animation_feed.start(self.users, self.get_available_prizes())
+    
+    def get_animation_text(self) -> Optional[str]:
+        """获取下一帧抽奖动画的显示文字
+        
+        Returns:
+            显示文字，没有内容时返回None
+        """
+        return self.animation_feed.next_text()
+    
+    def stop_animation(self):
+        """停止生成抽奖动画的显示内容
+        """
+        self.animation_feed.stop()
     
     def draw_lottery(self) -> Dict[str, Any]:
         """执行一次抽奖
@@ -148,137 +362,80 @@ class LotteryViewModel:
         Returns:
             抽奖结果
         """
-        # 检查当前轮次是否已达到总轮次
-        if self.current_round >= self.total_rounds:
-            return None
-        
-        # 增加当前轮次计数
-        self.current_round += 1
-        
-        # 获取可参与抽奖的用户
-        available_users = self.get_available_users()
-        
-        # 获取必中奖用户
-        must_win_users = self.get_must_win_users()
-        
-        # 获取可用奖品
-        available_prizes = self.get_available_prizes()
-        
-        if not available_users or not available_prizes:
-            return None
-        
-        # 计算剩余轮次
-        remaining_rounds = self.total_rounds - self.current_round + 1
-        
-        # 计算还未中奖的必中奖用户
-        not_won_must_win_users = [user for user in must_win_users if user['id'] not in self.must_win_users_won]
-        
-        # 优先从必中奖用户中选择的条件
-        # 1. 还有未中奖的必中奖用户
-        # 2. 剩余轮次大于等于未中奖的必中奖用户数量，确保每个必中奖用户都有机会中奖
-        should_choose_must_win = len(not_won_must_win_users) > 0 and remaining_rounds >= len(not_won_must_win_users)
-        
-        # 选择用户
-        selected_user = None
-        selected_prize = None
-        
-        if should_choose_must_win:
-            # 从还未中奖的必中奖用户中选择
-            selected_user = random.choice(not_won_must_win_users)
-            # 标记该用户已中奖
-            self.must_win_users_won.add(selected_user['id'])
-            
-            # 检查是否有指定必中奖品
-            if 'prize_id' in selected_user and selected_user['prize_id']:
-                # 查找指定的奖品
-                for prize in available_prizes:
-                    if prize['id'] == selected_user['prize_id']:
-                        selected_prize = prize
-                        break
-            
-            # 如果没有找到指定的奖品或没有指定奖品，则随机选择一个奖品
-            if not selected_prize:
-                selected_prize = random.choice(available_prizes)
+        # 场次在抽奖前创建，场次开始时的快照对应抽奖前的状态
+        session_id = self.ensure_session()
+        round_before = self.engine.current_round
+        result = self.engine.draw()
+        if self.engine.current_round == round_before:
+            return result
+        
+        checkpoint = self.engine.get_checkpoint()
+        if result:
+            # 结果和检查点写入后台队列后立即返回，持久化不增加停止抽奖的延迟
+            self.result_manager.record_result(session_id, self.engine.current_round, result, checkpoint)
         else:
-            # 从所有可用用户中随机选择
-            if available_users:
-                selected_user = random.choice(available_users)
-                # 随机选择一个奖品
-                selected_prize = random.choice(available_prizes)
-        
-        # 检查是否成功选择了用户和奖品
-        if not selected_user or not selected_prize:
-            return None
-        
-        # 记录抽奖结果
-        result = {
-            'user_id': selected_user['id'],
-            'username': selected_user['username'],
-            'employee_id': selected_user['employee_id'],
-            'prize_id': selected_prize['id'],
-            'prize_name': selected_prize['name'],
-            'prize_level': selected_prize['level']
-        }
-        
-        self.lottery_results.append(result)
-        
-        # 减少本地缓存中的奖品数量
-        if selected_prize['id'] in self.prize_quantities:
-            self.prize_quantities[selected_prize['id']] -= 1
-        
-        # 记录中奖用户到历史记录
-        self.winners_history.add(selected_user['id'])
-        
+            self.result_manager.save_checkpoint(session_id, checkpoint)
+        if self.engine.current_round >= self.engine.total_rounds:
+            self.result_manager.set_session_status(self.session_id, "finished")
         return result
     
+    def get_persistence_error(self) -> Optional[str]:
+        """获取抽奖结果写入数据库失败的原因
+        
+        写入失败的结果会在后台继续重试，写入成功后恢复为None
+        
+        Returns:
+            失败原因，没有失败时返回None
+        """
+        return self.result_manager.last_error
+    
     def get_lottery_results(self) -> List[Dict[str, Any]]:
         """获取抽奖结果
         
         Returns:
             抽奖结果列表
         """
-        return self.lottery_results
+        return self.engine.lottery_results
     
-    def export_results(self, export_path: str) -> bool:
-        """导出抽奖结果
+    def export_results(self, export_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                       should_cancel: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """导出本场的抽奖结果
+        
+        结果从数据库中逐批读取后写入文件，导出前先等待尚未写入的结果落库；
+        导出可以在后台线程中执行，导出对象使用单独的数据库连接
         
         Args:
-            export_path: 导出文件路径
+            export_path: 导出文件路径，按扩展名决定格式（.csv、.jsonl）和是否压缩（.zst）
+            progress_callback: 每写入一批后调用，参数为导出进度
+            should_cancel: 返回True时停止导出
             
         Returns:
-            是否导出成功
+            导出结果，包含导出的行数和是否被取消
         """
+        self.result_manager.ensure_flushed()
+        exporter = DataExporter(self.result_manager.db_path)
         try:
-            with open(export_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                # 写入表头
-                writer.writerow(['用户名', '工号', '奖品名称', '奖品等级'])
-                # 写入数据
-                for result in self.lottery_results:
-                    writer.writerow([
-                        result['username'],
-                        result['employee_id'],
-                        result['prize_name'],
-                        result['prize_level']
-                    ])
-            return True
-        except Exception:
-            return False
+            # 还没有抽奖时没有场次，只导出表头
+            return exporter.export("results", export_path, progress_callback=progress_callback,
+                                   should_cancel=should_cancel, session_id=self.session_id or 0)
+        finally:
+            exporter.close()
     
     def clear_results(self):
         """清空抽奖结果
         """
-        self.lottery_results = []
-        self.current_round = 0  # 重置当前轮次
-        self.must_win_users_won.clear()  # 重置已中奖的必中奖用户集合
-        self.winners_history.clear()  # 重置已中奖的所有用户记录
+        # 删除本场已持久化的结果并归还奖品库存
+        if self.session_id is not None:
+            self.result_manager.discard_session(self.session_id)
         
-        # 重新从数据库中加载数据，确保奖品数量是最新的
-        self._load_data()
+        # 重新从数据库中加载数据，确保奖品数量是最新的，同时以新种子开始新的场次
+        self.start_session()
     
     def close(self) -> None:
         """关闭数据库连接
         """
+        self.animation_feed.stop()
+        self.result_manager.close()
         self.user_manager.close()
         self.prize_manager.close()
         self.winner_manager.close()
@@ -1,6 +1,7 @@
 from manager.prize_manager import PrizeManager
 from main_logic.batch_importer import BatchImporter
-from typing import List, Dict, Any
+from main_logic.data_exporter import DataExporter
+from typing import Optional, Callable, List, Dict, Any
 
 
 class PrizeViewModel:
@@ -110,6 +111,14 @@ class PrizeViewModel:
         """
         return self.prize_manager.get_prizes_by_level(level)
     
+    def get_levels(self) -> List[str]:
+        """获取全部奖品等级，用于按等级筛选
+        
+        Returns:
+            奖品等级列表
+        """
+        return self.prize_manager.get_levels()
+    
     def get_all_prizes(self) -> List[Dict[str, Any]]:
         """获取所有奖品
         
@@ -118,6 +127,31 @@ class PrizeViewModel:
         """
         return self.prize_manager.get_all_prizes()
     
+    def query_prizes(self, keyword: Optional[str] = None, level: Optional[str] = None,
+                     sort_column: Optional[str] = None, descending: bool = False) -> List[Dict[str, Any]]:
+        """按条件筛选并排序奖品
+        
+        Args:
+            keyword: 奖品名称关键字（可选）
+            level: 奖品等级（可选）
+            sort_column: 排序列（name、level、quantity），为空时按ID排序
+            descending: 是否降序
+            
+        Returns:
+            奖品列表
+        """
+        return self.prize_manager.query_prizes(keyword, level, sort_column, descending)
+    
+    def create_search_manager(self) -> PrizeManager:
+        """创建供搜索线程使用的奖品管理对象
+        
+        SQLite连接不能跨线程共享，搜索线程使用自己的连接
+        
+        Returns:
+            奖品管理对象
+        """
+        return PrizeManager(self.prize_manager.db.db_path)
+    
     def generate_prize_template(self) -> str:
         """生成奖品批量导入模板
         
@@ -126,16 +160,64 @@ class PrizeViewModel:
         """
         return self.batch_importer.generate_prize_template()
     
-    def import_prizes_from_csv(self, csv_path: str) -> Dict[str, Any]:
+    def get_import_checkpoint(self, csv_path: str) -> Optional[Dict[str, Any]]:
+        """查询文件上次中断的导入进度
+        
+        Args:
+            csv_path: CSV文件路径
+            
+        Returns:
+            检查点，包含已读取的行数（parsed）和已导入的数量（success、failed），没有时返回None
+        """
+        try:
+            return self.batch_importer.get_import_checkpoint(csv_path, "prizes")
+        except Exception:
+            return None
+    
+    def import_prizes_from_csv(self, csv_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                               should_cancel: Optional[Callable[[], bool]] = None, dry_run: bool = False,
+                               resume: bool = True) -> Dict[str, Any]:
         """从CSV文件批量导入奖品
         
+        导入通常在后台线程中执行，每次导入都使用单独的导入对象，SQLite连接不跨线程共享
+        
         Args:
             csv_path: CSV文件路径
+            progress_callback: 每导入一批后调用，参数为导入进度
+            should_cancel: 返回True时停止导入
+            dry_run: 为True时只检查文件，不写入数据库
+            resume: 上次导入中断时是否从中断处继续
             
         Returns:
             导入结果
         """
-        return self.batch_importer.import_prizes_from_csv(csv_path)
+        importer = BatchImporter(self.batch_importer.db_path)
+        try:
+            return importer.import_prizes_from_csv(csv_path, progress_callback, should_cancel,
+                                                   dry_run=dry_run, resume=resume)
+        finally:
+            importer.close()
+    
+    def export_prizes(self, export_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      should_cancel: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """导出全部奖品
+        
+        导出通常在后台线程中执行，每次导出都使用单独的导出对象，SQLite连接不跨线程共享
+        
+        Args:
+            export_path: 导出文件路径，按扩展名决定格式（.csv、.jsonl）和是否压缩（.zst）
+            progress_callback: 每写入一批后调用，参数为导出进度
+            should_cancel: 返回True时停止导出
+            
+        Returns:
+            导出结果，包含导出的行数和是否被取消
+        """
+        exporter = DataExporter(self.prize_manager.db.db_path)
+        try:
+            return exporter.export("prizes", export_path, progress_callback=progress_callback,
+                                   should_cancel=should_cancel)
+        finally:
+            exporter.close()
     
     def close(self) -> None:
         """关闭数据库连接
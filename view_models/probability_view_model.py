@@ -1,6 +1,8 @@
 from manager.winner_manager import WinnerManager
 from manager.user_manager import UserManager
-from typing import List, Dict, Any
+from manager.prize_manager import PrizeManager
+from main_logic.data_exporter import DataExporter
+from typing import Optional, Callable, List, Dict, Any
 
 
 class ProbabilityViewModel:
@@ -17,6 +19,7 @@ class ProbabilityViewModel:
         """
         self.winner_manager = WinnerManager(db_path)
         self.user_manager = UserManager(db_path)
+        self.prize_manager = PrizeManager(db_path)
     
     def add_or_update_winner(self, user_id: int, winning_probability: int, prize_id: int = None) -> bool:
         """添加或更新中奖概率
@@ -105,23 +108,60 @@ class ProbabilityViewModel:
                 users.append(user)
         return users
     
-    def get_all_users_with_probability(self) -> List[Dict[str, Any]]:
+    def get_all_users_with_probability(self, keyword: Optional[str] = None) -> List[Dict[str, Any]]:
         """获取所有用户及其中奖概率
         
+        Args:
+            keyword: 用户名关键字，为空时获取全部用户
+            
         Returns:
-            用户及其中奖概率列表
+            用户及其中奖概率列表，每个用户包含winning_probability和prize_id
         """
-        users = self.user_manager.get_all_users()
-        for user in users:
-            winner = self.winner_manager.get_winner_by_user_id(user['id'])
-            if winner:
-                user['winning_probability'] = winner['winning_probability']
-            else:
-                user['winning_probability'] = 0  # 默认值
-        return users
+        # 一次关联查询取出全部用户的中奖设置，不再逐个用户查询
+        return self.winner_manager.get_users_with_rules(keyword)
+    
+    def create_search_manager(self) -> WinnerManager:
+        """创建供搜索线程使用的中奖管理对象
+        
+        SQLite连接不能跨线程共享，搜索线程使用自己的连接
+        
+        Returns:
+            中奖管理对象
+        """
+        return WinnerManager(self.winner_manager.db.db_path)
+    
+    def get_all_prizes(self) -> List[Dict[str, Any]]:
+        """获取所有奖品，用于选择必中奖品
+        
+        Returns:
+            奖品列表
+        """
+        return self.prize_manager.get_all_prizes()
+    
+    def export_rules(self, export_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     should_cancel: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """导出全部中奖设置
+        
+        导出通常在后台线程中执行，每次导出都使用单独的导出对象，SQLite连接不跨线程共享
+        
+        Args:
+            export_path: 导出文件路径，按扩展名决定格式（.csv、.jsonl）和是否压缩（.zst）
+            progress_callback: 每写入一批后调用，参数为导出进度
+            should_cancel: 返回True时停止导出
+            
+        Returns:
+            导出结果，包含导出的行数和是否被取消
+        """
+        exporter = DataExporter(self.winner_manager.db.db_path)
+        try:
+            return exporter.export("rules", export_path, progress_callback=progress_callback,
+                                   should_cancel=should_cancel)
+        finally:
+            exporter.close()
     
     def close(self) -> None:
         """关闭数据库连接
         """
         self.winner_manager.close()
         self.user_manager.close()
+        self.prize_manager.close()
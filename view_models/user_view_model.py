@@ -1,6 +1,7 @@
 from manager.user_manager import UserManager
 from main_logic.batch_importer import BatchImporter
-from typing import List, Dict, Any
+from main_logic.data_exporter import DataExporter
+from typing import Optional, Callable, List, Dict, Any, Tuple
 
 
 class UserViewModel:
@@ -105,6 +106,54 @@ class UserViewModel:
         """
         return self.user_manager.get_all_users()
     
+    def count_users(self, keyword: Optional[str] = None) -> int:
+        """统计用户数量
+        
+        Args:
+            keyword: 用户名关键字，为空时统计全部用户
+            
+        Returns:
+            用户数量
+        """
+        return self.user_manager.count_users(keyword)
+    
+    def get_users_page(self, offset: int, limit: int, keyword: Optional[str] = None) -> List[Dict[str, Any]]:
+        """分页获取用户
+        
+        Args:
+            offset: 起始位置
+            limit: 最多返回的数量
+            keyword: 用户名关键字，为空时获取全部用户
+            
+        Returns:
+            用户列表
+        """
+        return self.user_manager.get_users_page(offset, limit, keyword)
+    
+    def create_search_manager(self) -> UserManager:
+        """创建供搜索线程使用的用户管理对象
+        
+        SQLite连接不能跨线程共享，搜索线程使用自己的连接
+        
+        Returns:
+            用户管理对象
+        """
+        return UserManager(self.user_manager.db.db_path)
+    
+    @staticmethod
+    def search_users(manager: UserManager, keyword: Optional[str], limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """搜索用户，返回匹配的数量和第一页用户
+        
+        Args:
+            manager: create_search_manager创建的用户管理对象
+            keyword: 用户名关键字，为空时搜索全部用户
+            limit: 第一页的数量
+            
+        Returns:
+            (匹配的用户数量, 第一页用户列表)
+        """
+        return manager.count_users(keyword), manager.get_users_page(0, limit, keyword)
+    
     def generate_user_template(self) -> str:
         """生成用户批量导入模板
         
@@ -113,16 +162,88 @@ class UserViewModel:
         """
         return self.batch_importer.generate_user_template()
     
-    def import_users_from_csv(self, csv_path: str) -> Dict[str, Any]:
+    def get_import_checkpoint(self, csv_path: str) -> Optional[Dict[str, Any]]:
+        """查询文件上次中断的导入进度
+        
+        Args:
+            csv_path: CSV文件路径
+            
+        Returns:
+            检查点，包含已读取的行数（parsed）和已导入的数量（success、failed），没有时返回None
+        """
+        try:
+            return self.batch_importer.get_import_checkpoint(csv_path, "users")
+        except Exception:
+            return None
+    
+    def import_users_from_csv(self, csv_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                              should_cancel: Optional[Callable[[], bool]] = None, dry_run: bool = False,
+                              resume: bool = True) -> Dict[str, Any]:
         """从CSV文件批量导入用户
         
+        导入通常在后台线程中执行，每次导入都使用单独的导入对象，SQLite连接不跨线程共享
+        
         Args:
             csv_path: CSV文件路径
+            progress_callback: 每导入一批后调用，参数为导入进度
+            should_cancel: 返回True时停止导入
+            dry_run: 为True时只检查文件，不写入数据库
+            resume: 上次导入中断时是否从中断处继续
             
         Returns:
             导入结果
         """
-        return self.batch_importer.import_users_from_csv(csv_path)
+        importer = BatchImporter(self.batch_importer.db_path)
+        try:
+            return importer.import_users_from_csv(csv_path, progress_callback, should_cancel,
+                                                  dry_run=dry_run, resume=resume)
+        finally:
+            importer.close()
+    
+    def export_users(self, export_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     should_cancel: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """导出全部用户
+        
+        导出通常在后台线程中执行，每次导出都使用单独的导出对象，SQLite连接不跨线程共享
+        
+        Args:
+            export_path: 导出文件路径，按扩展名决定格式（.csv、.jsonl）和是否压缩（.zst）
+            progress_callback: 每写入一批后调用，参数为导出进度
+            should_cancel: 返回True时停止导出
+            
+        Returns:
+            导出结果，包含导出的行数和是否被取消
+        """
+        exporter = DataExporter(self.user_manager.db.db_path)
+        try:
+            return exporter.export("users", export_path, progress_callback=progress_callback,
+                                   should_cancel=should_cancel)
+        finally:
+            exporter.close()
+    
+    def sync_users_from_csv(self, csv_path: str, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                            should_cancel: Optional[Callable[[], bool]] = None, dry_run: bool = False,
+                            max_deleted: Optional[int] = None) -> Dict[str, Any]:
+        """按工号把用户同步为CSV文件中的数据
+        
+        同步通常在后台线程中执行，每次同步都使用单独的导入对象，SQLite连接不跨线程共享
+        
+        Args:
+            csv_path: CSV文件路径
+            progress_callback: 每读取一批后调用，参数为读取进度
+            should_cancel: 返回True时停止同步并回滚
+            dry_run: 只统计同步会发生的变化，不修改数据库
+            max_deleted: 最多允许删除的用户数，超过时拒绝同步
+            
+        Returns:
+            同步结果
+        """
+        importer = BatchImporter(self.batch_importer.db_path)
+        try:
+            return importer.sync_users_from_csv(csv_path, progress_callback, should_cancel,
+                                                dry_run=dry_run, max_deleted=max_deleted)
+        finally:
+            importer.close()
     
     def close(self) -> None:
         """关闭数据库连接
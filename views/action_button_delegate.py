@@ -0,0 +1,93 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionButton, QApplication
+from PyQt5.QtCore import Qt, QEvent, QRect, QSize, pyqtSignal
+
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """操作按钮委托
+    
+    在单元格中直接绘制一组按钮（如修改、删除），不为每一行创建真正的按钮控件，
+    只有可见的行会被绘制，表格行数再多也不会增加控件数量
+    """
+    
+    # 按钮被点击，参数为按钮名称和行号
+    clicked = pyqtSignal(str, int)
+    
+    BUTTON_HEIGHT = 30
+    MARGIN = 4
+    SPACING = 5
+    
+    def __init__(self, actions, parent=None):
+        """初始化操作按钮委托
+        
+        Args:
+            actions: 按钮列表，每项为(按钮名称, 按钮文字)
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.actions = list(actions)
+        self._pressed = None  # 鼠标按下的(行号, 按钮名称)
+    
+    def _button_rects(self, rect: QRect):
+        """计算单元格中每个按钮的位置
+        
+        Args:
+            rect: 单元格区域
+        
+        Returns:
+            (按钮名称, 按钮文字, 按钮区域)列表
+        """
+        count = len(self.actions)
+        width = max((rect.width() - 2 * self.MARGIN - self.SPACING * (count - 1)) // count, 0)
+        height = min(self.BUTTON_HEIGHT, rect.height() - 2 * self.MARGIN)
+        top = rect.top() + (rect.height() - height) // 2
+        rects = []
+        for position, (name, text) in enumerate(self.actions):
+            left = rect.left() + self.MARGIN + position * (width + self.SPACING)
+            rects.append((name, text, QRect(left, top, width, height)))
+        return rects
+    
+    def paint(self, painter, option, index):
+        """绘制单元格背景和按钮
+        """
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, widget)
+        
+        for name, text, rect in self._button_rects(option.rect):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = text
+            button.state = QStyle.State_Enabled | QStyle.State_Raised
+            if self._pressed == (index.row(), name):
+                button.state = QStyle.State_Enabled | QStyle.State_Sunken
+            style.drawControl(QStyle.CE_PushButton, button, painter, widget)
+    
+    def editorEvent(self, event, model, option, index):
+        """处理按钮上的鼠标点击
+        """
+        if event.type() not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease):
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+        
+        clicked_name = None
+        for name, _, rect in self._button_rects(option.rect):
+            if rect.contains(event.pos()):
+                clicked_name = name
+                break
+        
+        if event.type() == QEvent.MouseButtonPress:
+            self._pressed = (index.row(), clicked_name) if clicked_name else None
+            return clicked_name is not None
+        
+        pressed, self._pressed = self._pressed, None
+        if clicked_name and pressed == (index.row(), clicked_name):
+            self.clicked.emit(clicked_name, index.row())
+            return True
+        return pressed is not None
+    
+    def sizeHint(self, option, index):
+        """单元格建议大小
+        """
+        width = len(self.actions) * 60 + 2 * self.MARGIN
+        return QSize(width, self.BUTTON_HEIGHT + 2 * self.MARGIN)
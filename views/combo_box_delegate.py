@@ -0,0 +1,52 @@
+from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox
+from PyQt5.QtCore import Qt
+
+
+class ComboBoxDelegate(QStyledItemDelegate):
+    """下拉框编辑委托
+    
+    平时只绘制文字，单元格进入编辑状态时才创建下拉框，选择后立即提交并关闭编辑器
+    下拉框共用同一个选项列表模型，单元格的EditRole为选项值
+    """
+    
+    def __init__(self, option_model, parent=None):
+        """初始化下拉框编辑委托
+        
+        Args:
+            option_model: 选项列表模型（OptionListModel）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.option_model = option_model
+    
+    def createEditor(self, parent, option, index):
+        """创建下拉框编辑器
+        """
+        editor = QComboBox(parent)
+        editor.setModel(self.option_model)
+        editor.activated.connect(lambda _: self._commit_and_close(editor))
+        return editor
+    
+    def setEditorData(self, editor, index):
+        """选中单元格当前的选项
+        """
+        position = editor.findData(index.data(Qt.EditRole), Qt.UserRole)
+        editor.setCurrentIndex(max(position, 0))
+    
+    def setModelData(self, editor, model, index):
+        """把选中的选项值写回模型
+        """
+        value = editor.currentData(Qt.UserRole)
+        if value != index.data(Qt.EditRole):
+            model.setData(index, value, Qt.EditRole)
+    
+    def updateEditorGeometry(self, editor, option, index):
+        """编辑器占满单元格
+        """
+        editor.setGeometry(option.rect)
+    
+    def _commit_and_close(self, editor):
+        """提交选择并关闭编辑器
+        """
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor, QStyledItemDelegate.NoHint)
@@ -0,0 +1,46 @@
+from views.import_progress_dialog import ImportProgressDialog
+
+
+class ExportProgressDialog(ImportProgressDialog):
+    """批量导出进度对话框
+    
+    与导入进度对话框的行为相同，按已导出的行数显示进度条
+    """
+    
+    # 导出文件类型，按扩展名决定格式和是否压缩
+    FILE_FILTER = (
+        "CSV文件 (*.csv);;CSV文件，zstd压缩 (*.csv.zst);;"
+        "JSON Lines文件 (*.jsonl);;JSON Lines文件，zstd压缩 (*.jsonl.zst)"
+    )
+    
+    def __init__(self, runner, parent=None):
+        """初始化批量导出进度对话框
+        
+        Args:
+            runner: 执行导出的后台任务（TaskRunner）
+            parent: 父窗口
+        """
+        super().__init__(runner, parent)
+        self.setWindowTitle("导出")
+        self.setLabelText("正在导出...")
+    
+    def update_progress(self, progress):
+        """显示导出进度
+        
+        Args:
+            progress: 导出进度（rows、total、rows_per_second）
+        """
+        if progress['total'] > 0:
+            self.setMaximum(progress['total'])
+            self.setValue(min(progress['rows'], progress['total']))
+        self.setLabelText(
+            f"已导出: {progress['rows']} / {progress['total']} 行，速度: {progress['rows_per_second']:.0f} 行/秒"
+        )
+    
+    def cancel_import(self):
+        """请求停止导出，未写完的文件会被删除
+        """
+        if self.task_done:
+            return
+        self.runner.cancel()
+        self.setLabelText("正在取消...")
@@ -0,0 +1,55 @@
+from PyQt5.QtWidgets import QProgressDialog
+from PyQt5.QtCore import Qt
+
+
+class ImportProgressDialog(QProgressDialog):
+    """批量导入进度对话框
+    
+    显示后台导入任务的进度，点击取消时请求任务停止，任务结束后自动关闭
+    """
+    
+    def __init__(self, runner, parent=None):
+        """初始化批量导入进度对话框
+        
+        Args:
+            runner: 执行导入的后台任务（TaskRunner）
+            parent: 父窗口
+        """
+        super().__init__("正在导入...", "取消", 0, 0, parent)
+        self.runner = runner
+        self.task_done = False
+        self.setWindowTitle("批量导入")
+        self.setWindowModality(Qt.WindowModal)
+        self.setMinimumDuration(0)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.canceled.connect(self.cancel_import)
+        runner.signals.progress.connect(self.update_progress)
+        runner.signals.finished.connect(self.finish)
+        runner.signals.failed.connect(self.finish)
+    
+    def update_progress(self, progress):
+        """显示导入进度
+        
+        Args:
+            progress: 导入进度（parsed、success、failed、rows_per_second）
+        """
+        self.setLabelText(
+            f"已读取: {progress['parsed']} 行，成功: {progress['success']} 条，"
+            f"失败: {progress['failed']} 条，速度: {progress['rows_per_second']:.0f} 行/秒"
+        )
+    
+    def finish(self, *args):
+        """任务结束后关闭对话框
+        """
+        self.task_done = True
+        self.close()
+    
+    def cancel_import(self):
+        """请求停止导入，等待当前这一批回滚后任务结束
+        """
+        # 关闭对话框时也会发出取消信号，任务已结束时不再处理
+        if self.task_done:
+            return
+        self.runner.cancel()
+        self.setLabelText("正在取消...")
@@ -1,9 +1,11 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
-    QTableWidgetItem, QMessageBox, QFileDialog, QHeaderView, QLineEdit, QCheckBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView,
+    QMessageBox, QFileDialog, QHeaderView, QLineEdit, QCheckBox
 )
 from PyQt5.QtCore import Qt, QTimer
-import random
+from views.result_table_model import ResultTableModel
+from views.task_runner import TaskRunner
+from views.export_progress_dialog import ExportProgressDialog
 
 
 class LotteryView(QWidget):
@@ -20,6 +22,7 @@ class LotteryView(QWidget):
         self.lottery_view_model = lottery_view_model
         self.init_ui()
         self.is_drawing = False
+        self.persistence_warned = False  # 是否已提醒过结果写入失败，恢复正常后重置
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_lottery_display)
     
@@ -70,8 +73,41 @@ class LotteryView(QWidget):
         self.duplicate_checkbox.stateChanged.connect(self.toggle_duplicate_winners)
         rounds_layout.addWidget(self.duplicate_checkbox)
         
+        # 添加是否按剩余数量加权抽取奖品的复选框
+        self.weighted_checkbox = QCheckBox("按剩余数量加权抽取奖品")
+        self.weighted_checkbox.setChecked(self.lottery_view_model.get_weighted_prize_selection())
+        self.weighted_checkbox.stateChanged.connect(self.toggle_weighted_prize_selection)
+        rounds_layout.addWidget(self.weighted_checkbox)
+        
         lottery_layout.addLayout(rounds_layout)
         
+        # 创建按奖品等级抽奖的设置区域
+        level_layout = QHBoxLayout()
+        level_layout.setSpacing(10)
+        
+        self.level_checkbox = QCheckBox("按奖品等级依次抽奖")
+        self.level_checkbox.setChecked(self.lottery_view_model.get_level_order() is not None)
+        self.level_checkbox.stateChanged.connect(self.apply_level_order)
+        level_layout.addWidget(self.level_checkbox)
+        
+        level_layout.addWidget(QLabel("等级顺序:"))
+        self.level_order_input = QLineEdit()
+        self.level_order_input.setPlaceholderText("用逗号分隔，如: 三等奖,二等奖,一等奖")
+        self.level_order_input.editingFinished.connect(self.apply_level_order)
+        level_layout.addWidget(self.level_order_input)
+        
+        self.level_info = QLabel()
+        level_layout.addWidget(self.level_info)
+        self.refresh_level_info()
+        
+        lottery_layout.addLayout(level_layout)
+        
+        # 显示当前场次的随机种子，便于复现和审计
+        self.seed_info = QLabel()
+        self.seed_info.setAlignment(Qt.AlignCenter)
+        self.update_seed_info()
+        lottery_layout.addWidget(self.seed_info)
+        
         # 创建开始/停止按钮
         button_layout = QHBoxLayout()
         button_layout.setSpacing(20)
@@ -102,10 +138,12 @@ class LotteryView(QWidget):
         
         result_layout.addWidget(QLabel("抽奖结果"))
         
-        # 创建结果表格
-        self.result_table = QTableWidget()
-        self.result_table.setColumnCount(4)
-        self.result_table.setHorizontalHeaderLabels(["用户名", "工号", "奖品名称", "奖品等级"])
+        # 创建结果表格，由抽奖结果事件增量更新
+        self.result_model = ResultTableModel(self)
+        self.result_model.handle_result_event("reset", self.lottery_view_model.get_lottery_results())
+        self.lottery_view_model.add_result_listener(self.result_model.handle_result_event)
+        self.result_table = QTableView()
+        self.result_table.setModel(self.result_model)
         self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         result_layout.addWidget(self.result_table)
         
@@ -128,6 +166,8 @@ class LotteryView(QWidget):
     def start_lottery(self):
         """开始抽奖
         """
+        self.check_persistence_error()
+        
         # 检查当前轮次是否已达到总轮次
         current_round = self.lottery_view_model.get_current_round()
         total_rounds = self.lottery_view_model.get_total_rounds()
@@ -148,13 +188,17 @@ class LotteryView(QWidget):
             QMessageBox.warning(self, "警告", "没有可用的奖品")
             return
         
-        # 开始抽奖动画
+        # 在动画开始前创建场次记录，避免停止抽奖时等待数据库
+        self.lottery_view_model.ensure_session()
+        
+        # 开始抽奖动画，显示内容由后台预先生成
+        self.lottery_view_model.start_animation()
         self.is_drawing = True
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         
         # 启动定时器，更新抽奖显示
-        self.timer.start(50)  # 每50毫秒更新一次
+        self.timer.start(16)  # 约每秒60帧
     
     def stop_lottery(self):
         """停止抽奖
@@ -164,15 +208,13 @@ class LotteryView(QWidget):
         
         # 停止定时器
         self.timer.stop()
+        self.lottery_view_model.stop_animation()
         
         # 执行抽奖
         result = self.lottery_view_model.draw_lottery()
         if result:
             # 更新显示
             self.lottery_display.setText(f"中奖人: {result['username']}\n奖品: {result['prize_name']}")
-            
-            # 更新结果表格
-            self.update_result_table()
         else:
             self.lottery_display.setText("抽奖失败，请检查数据")
         
@@ -185,44 +227,113 @@ class LotteryView(QWidget):
         current_round = self.lottery_view_model.get_current_round()
         total_rounds = self.lottery_view_model.get_total_rounds()
         self.rounds_info.setText(f"当前轮次: {current_round}/{total_rounds}")
+        self.update_level_info()
+        
+        self.check_persistence_error()
         
         # 检查是否已达到总轮次
         if current_round >= total_rounds:
             QMessageBox.information(self, "提示", "已达到抽奖总轮次，请清空结果后再开始新的抽奖")
     
+    def check_persistence_error(self):
+        """检查抽奖结果是否写入数据库失败，失败时提醒一次，恢复正常前不重复提醒
+        """
+        error = self.lottery_view_model.get_persistence_error()
+        if error and not self.persistence_warned:
+            QMessageBox.warning(
+                self, "警告",
+                f"抽奖结果写入数据库失败，正在后台重试: {error}\n请检查数据库是否被其他程序占用，在写入成功前不要关闭程序"
+            )
+        self.persistence_warned = bool(error)
+    
     def update_lottery_display(self):
         """更新抽奖显示
         """
-        # 获取所有用户（包括必不中奖用户）和可用奖品
-        all_users = self.lottery_view_model.users
-        available_prizes = self.lottery_view_model.get_available_prizes()
+        # 取出预先生成的一帧，每帧开销与人员和奖品数量无关
+        text = self.lottery_view_model.get_animation_text()
+        if text is None:
+            return
         
-        if not all_users or not available_prizes:
+        # 内容没有变化时不重新设置，避免多余的重绘
+        if text != self.lottery_display.text():
+            self.lottery_display.setText(text)
+    
+    def offer_session_resume(self):
+        """检查上次是否有未完成的抽奖场次，并询问是否恢复
+        """
+        session = self.lottery_view_model.get_interrupted_session()
+        if not session:
             return
         
-        # 随机选择用户和奖品
-        random_user = random.choice(all_users)
-        random_prize = random.choice(available_prizes)
+        checkpoint = session['checkpoint']
+        reply = QMessageBox.question(
+            self, "恢复抽奖",
+            f"检测到上次未完成的抽奖（当前轮次: {checkpoint['current_round']}/{checkpoint['total_rounds']}），是否继续？",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
         
-        # 更新显示
-        self.lottery_display.setText(f"中奖人: {random_user['username']}\n奖品: {random_prize['name']}")
+        if reply == QMessageBox.Yes:
+            self.lottery_view_model.resume_session(session)
+            self.refresh_session_display()
+        else:
+            self.lottery_view_model.abandon_session(session)
     
-    def update_result_table(self):
-        """更新结果表格
+    def refresh_session_display(self):
+        """根据视图模型中的场次状态刷新界面
         """
-        results = self.lottery_view_model.get_lottery_results()
+        current_round = self.lottery_view_model.get_current_round()
+        total_rounds = self.lottery_view_model.get_total_rounds()
+        self.rounds_input.setText(str(total_rounds))
+        self.rounds_info.setText(f"当前轮次: {current_round}/{total_rounds}")
+        
+        self.duplicate_checkbox.blockSignals(True)
+        self.duplicate_checkbox.setChecked(self.lottery_view_model.get_allow_duplicate_winners())
+        self.duplicate_checkbox.blockSignals(False)
+        self.weighted_checkbox.blockSignals(True)
+        self.weighted_checkbox.setChecked(self.lottery_view_model.get_weighted_prize_selection())
+        self.weighted_checkbox.blockSignals(False)
+        self.refresh_level_info()
         
-        # 清空表格
-        self.result_table.setRowCount(0)
-        
-        # 添加结果数据
-        for result in results:
-            row = self.result_table.rowCount()
-            self.result_table.insertRow(row)
-            self.result_table.setItem(row, 0, QTableWidgetItem(result['username']))
-            self.result_table.setItem(row, 1, QTableWidgetItem(result['employee_id']))
-            self.result_table.setItem(row, 2, QTableWidgetItem(result['prize_name']))
-            self.result_table.setItem(row, 3, QTableWidgetItem(result['prize_level']))
+        results = self.lottery_view_model.get_lottery_results()
+        if results:
+            last = results[-1]
+            self.lottery_display.setText(f"中奖人: {last['username']}\n奖品: {last['prize_name']}")
+        self.update_seed_info()
+    
+    def apply_level_order(self):
+        """应用奖品等级抽取顺序设置
+        """
+        if not self.level_checkbox.isChecked():
+            self.lottery_view_model.set_level_order(None)
+        else:
+            text = self.level_order_input.text().replace("，", ",")
+            levels = [level.strip() for level in text.split(",") if level.strip()]
+            self.lottery_view_model.set_level_order(levels or self.lottery_view_model.get_prize_levels())
+        self.refresh_level_info()
+    
+    def refresh_level_info(self):
+        """根据视图模型刷新等级顺序输入框和当前等级显示
+        """
+        level_order = self.lottery_view_model.get_level_order()
+        self.level_checkbox.blockSignals(True)
+        self.level_checkbox.setChecked(level_order is not None)
+        self.level_checkbox.blockSignals(False)
+        self.level_order_input.setText(",".join(level_order or self.lottery_view_model.get_prize_levels()))
+        self.update_level_info()
+    
+    def update_level_info(self):
+        """更新当前抽取等级显示
+        """
+        if self.lottery_view_model.get_level_order() is None:
+            self.level_info.setText("")
+            return
+        level = self.lottery_view_model.get_active_level()
+        self.level_info.setText(f"当前等级: {level}" if level else "全部等级已抽完")
+    
+    def update_seed_info(self):
+        """更新随机种子显示
+        """
+        self.seed_info.setText(f"本场随机种子: {self.lottery_view_model.get_session_seed()}")
     
     def export_results(self):
         """导出抽奖结果
@@ -233,17 +344,33 @@ class LotteryView(QWidget):
             return
         
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "保存抽奖结果", "lottery_results.csv", "CSV文件 (*.csv)"
+            self, "保存抽奖结果", "lottery_results.csv", ExportProgressDialog.FILE_FILTER
         )
         
         if not file_path:
             return
         
-        success = self.lottery_view_model.export_results(file_path)
-        if success:
-            QMessageBox.information(self, "提示", f"结果已导出到: {file_path}")
+        # 在后台线程中逐批导出，数据量大时界面也不会卡住
+        self.export_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.lottery_view_model.export_results(
+                file_path, progress_callback, should_cancel
+            )
+        )
+        self.export_dialog = ExportProgressDialog(self.export_runner, self)
+        self.export_runner.signals.finished.connect(self.on_export_finished)
+        self.export_runner.signals.failed.connect(lambda error: QMessageBox.critical(self, "错误", f"导出失败: {error}"))
+        self.export_runner.start()
+    
+    def on_export_finished(self, result):
+        """导出结束后显示结果
+        
+        Args:
+            result: 导出结果
+        """
+        if result['cancelled']:
+            QMessageBox.information(self, "提示", "导出已取消")
         else:
-            QMessageBox.critical(self, "错误", "导出失败")
+            QMessageBox.information(self, "提示", f"已导出 {result['rows']} 条到: {result['path']}")
     
     def clear_results(self):
         """清空抽奖结果
@@ -254,12 +381,17 @@ class LotteryView(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            self.lottery_view_model.clear_results()
+            try:
+                self.lottery_view_model.clear_results()
+            except RuntimeError as e:
+                QMessageBox.critical(self, "错误", f"清空失败: {e}")
+                return
             self.lottery_display.setText("点击开始按钮开始抽奖")
-            self.update_result_table()
             # 更新当前轮次信息
             total_rounds = self.lottery_view_model.get_total_rounds()
             self.rounds_info.setText(f"当前轮次: 0/{total_rounds}")
+            self.update_seed_info()
+            self.refresh_level_info()
             QMessageBox.information(self, "提示", "结果已清空")
     
     def set_total_rounds(self):
@@ -285,8 +417,21 @@ class LotteryView(QWidget):
         allow = state == Qt.Checked
         self.lottery_view_model.set_allow_duplicate_winners(allow)
     
+    def toggle_weighted_prize_selection(self, state):
+        """切换是否按剩余数量加权抽取奖品
+        
+        Args:
+            state: 复选框状态
+        """
+        self.lottery_view_model.set_weighted_prize_selection(state == Qt.Checked)
+    
     def reload_data(self):
         """重新加载数据
         """
-        self.lottery_view_model.reload_data()
+        try:
+            self.lottery_view_model.reload_data()
+        except RuntimeError as e:
+            QMessageBox.critical(self, "错误", f"重新加载失败: {e}")
+            return
+        self.refresh_level_info()
         QMessageBox.information(self, "提示", "数据已重新加载")
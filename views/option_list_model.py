@@ -0,0 +1,62 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class OptionListModel(QAbstractListModel):
+    """下拉选项列表模型
+    
+    同一份选项供表格中所有下拉编辑器共用，编辑器不再各自复制选项
+    显示文字为DisplayRole，选项值为UserRole
+    """
+    
+    def __init__(self, options=None, parent=None):
+        """初始化下拉选项列表模型
+        
+        Args:
+            options: 选项列表，每项为(显示文字, 选项值)
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._options = []
+        self._labels = {}
+        self.set_options(options or [])
+    
+    def set_options(self, options):
+        """替换全部选项
+        
+        Args:
+            options: 选项列表，每项为(显示文字, 选项值)
+        """
+        self.beginResetModel()
+        self._options = list(options)
+        self._labels = {value: label for label, value in self._options}
+        self.endResetModel()
+    
+    def label_for(self, value):
+        """获取选项值对应的显示文字
+        
+        Args:
+            value: 选项值
+        
+        Returns:
+            显示文字，没有对应选项时返回None
+        """
+        return self._labels.get(value)
+    
+    def rowCount(self, parent=QModelIndex()):
+        """选项数量
+        """
+        if parent.isValid():
+            return 0
+        return len(self._options)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        """选项的显示文字或选项值
+        """
+        if not index.isValid():
+            return None
+        label, value = self._options[index.row()]
+        if role == Qt.DisplayRole:
+            return label
+        if role == Qt.UserRole:
+            return value
+        return None
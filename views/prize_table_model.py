@@ -0,0 +1,159 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class PrizeTableModel(QAbstractTableModel):
+    """奖品表格模型
+    
+    筛选和排序交给数据库完成，修改或删除单个奖品时只更新对应的行
+    """
+    
+    COLUMNS = ["奖品名称", "奖品等级", "奖品数量", "操作"]
+    # 列号到数据库排序列的映射，不在其中的列不参与排序
+    SORT_COLUMNS = {0: "name", 1: "level", 2: "quantity"}
+    ACTION_COLUMN = 3
+    
+    def __init__(self, prize_view_model, parent=None):
+        """初始化奖品表格模型
+        
+        Args:
+            prize_view_model: 奖品视图模型
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.prize_view_model = prize_view_model
+        self.keyword = None
+        self.level = None
+        self.sort_column = None
+        self.descending = False
+        self._prizes = []
+    
+    def refresh(self, keyword=None):
+        """按关键字重新查询奖品，保持当前的排序方式
+        
+        Args:
+            keyword: 奖品名称关键字，为空时显示全部奖品
+        """
+        self.keyword = keyword or None
+        self._reload()
+    
+    def set_level(self, level=None):
+        """按奖品等级筛选，保持当前的关键字和排序方式
+        
+        Args:
+            level: 奖品等级，为空时显示全部等级
+        """
+        self.level = level or None
+        self._reload()
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """按列排序，由数据库完成排序后重新加载
+        """
+        self.sort_column = self.SORT_COLUMNS.get(column)
+        self.descending = order == Qt.DescendingOrder
+        self._reload()
+    
+    def show_search_result(self, keyword, level, sort_column, descending, prizes):
+        """显示在搜索线程中查好的奖品
+        
+        Args:
+            keyword: 奖品名称关键字
+            level: 查询时使用的奖品等级
+            sort_column: 查询时使用的排序列
+            descending: 查询时是否降序
+            prizes: 奖品列表
+        """
+        self.keyword = keyword or None
+        # 查询期间等级或排序方式变了，按新的条件重新查询
+        if level != self.level or sort_column != self.sort_column or descending != self.descending:
+            self._reload()
+            return
+        self.beginResetModel()
+        self._prizes = prizes
+        self.endResetModel()
+    
+    def _reload(self):
+        """按当前的关键字、等级和排序方式重新加载全部行
+        """
+        self.beginResetModel()
+        self._prizes = self.prize_view_model.query_prizes(self.keyword, self.level, self.sort_column, self.descending)
+        self.endResetModel()
+    
+    def get_prize(self, row):
+        """获取指定行的奖品
+        
+        Args:
+            row: 行号
+        
+        Returns:
+            奖品信息，行号无效时返回None
+        """
+        if 0 <= row < len(self._prizes):
+            return self._prizes[row]
+        return None
+    
+    def update_prize(self, row):
+        """从数据库重新读取指定行的奖品并只刷新该行
+        
+        Args:
+            row: 行号
+        """
+        prize = self.get_prize(row)
+        if prize is None:
+            return
+        updated = self.prize_view_model.get_prize_by_id(prize['id'])
+        if updated is None:
+            self.remove_prize(row)
+            return
+        self._prizes[row] = updated
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+    
+    def remove_prize(self, row):
+        """移除指定行
+        
+        Args:
+            row: 行号
+        """
+        if not 0 <= row < len(self._prizes):
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._prizes[row]
+        self.endRemoveRows()
+    
+    def rowCount(self, parent=QModelIndex()):
+        """行数，即奖品数量
+        """
+        if parent.isValid():
+            return 0
+        return len(self._prizes)
+    
+    def columnCount(self, parent=QModelIndex()):
+        """列数
+        """
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        """单元格内容，UserRole返回奖品ID
+        """
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.UserRole):
+            return None
+        prize = self._prizes[index.row()]
+        if role == Qt.UserRole:
+            return prize['id']
+        if index.column() == 0:
+            return prize['name']
+        if index.column() == 1:
+            return prize['level']
+        if index.column() == 2:
+            return str(prize['quantity'])
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """表头显示内容，行表头为序号
+        """
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return section + 1
@@ -1,9 +1,17 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QTableWidget, QTableWidgetItem, QMessageBox, QFileDialog, QHeaderView, QDialog, QDialogButtonBox, QShortcut
+    QTableView, QAbstractItemView, QMessageBox, QFileDialog, QHeaderView, QDialog, QDialogButtonBox, QShortcut,
+    QComboBox
 )
-from PyQt5.QtCore import Qt, QEvent
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QKeySequence
+from main_logic import startup_profiler
+from views.prize_table_model import PrizeTableModel
+from views.action_button_delegate import ActionButtonDelegate
+from views.search_controller import SearchController
+from views.task_runner import TaskRunner
+from views.import_progress_dialog import ImportProgressDialog
+from views.export_progress_dialog import ExportProgressDialog
 
 
 class PrizeView(QWidget):
@@ -21,8 +29,8 @@ class PrizeView(QWidget):
         self.prize_view_model = prize_view_model
         self.probability_view_model = probability_view_model
         self.init_ui()
-        self.prize_id_map = {}  # 存储行索引到奖品ID的映射
-        self.refresh_prize_list()
+        # 界面先显示出来，表格数据在事件循环空闲时再加载
+        QTimer.singleShot(0, self.refresh_prize_list)
         
         # 添加快捷键，Ctrl+H 隐藏/显示中奖概率管理按钮
         self.shortcut = QShortcut(QKeySequence("Ctrl+H"), self)
@@ -69,6 +77,12 @@ class PrizeView(QWidget):
         self.search_button.clicked.connect(self.search_prize)
         search_layout.addWidget(self.search_button)
         
+        search_layout.addWidget(QLabel("奖品等级:"))
+        self.level_filter = QComboBox()
+        self.level_filter.addItem("全部等级", None)
+        self.level_filter.currentIndexChanged.connect(self.filter_by_level)
+        search_layout.addWidget(self.level_filter)
+        
         self.refresh_button = QPushButton("刷新")
         self.refresh_button.clicked.connect(self.refresh_prize_list)
         search_layout.addWidget(self.refresh_button)
@@ -94,18 +108,47 @@ class PrizeView(QWidget):
         self.import_csv_button.clicked.connect(self.import_prizes_from_csv)
         batch_layout.addWidget(self.import_csv_button)
         
+        self.check_csv_button = QPushButton("导入预检")
+        self.check_csv_button.clicked.connect(self.check_prizes_csv)
+        batch_layout.addWidget(self.check_csv_button)
+        
+        self.export_button = QPushButton("导出")
+        self.export_button.clicked.connect(self.export_prizes)
+        batch_layout.addWidget(self.export_button)
+        
         self.batch_delete_button = QPushButton("批量删除")
         self.batch_delete_button.clicked.connect(self.batch_delete_prizes)
         batch_layout.addWidget(self.batch_delete_button)
         
         main_layout.addLayout(batch_layout)
         
-        # 创建奖品列表
-        self.prize_table = QTableWidget()
-        self.prize_table.setColumnCount(4)
-        self.prize_table.setHorizontalHeaderLabels(["奖品名称", "奖品等级", "奖品数量", "操作"])
+        # 创建奖品列表，点击表头时由数据库排序，操作按钮由委托绘制
+        self.notify_empty_result = False  # 点击查询按钮时，没有结果要提示
+        self.prize_model = PrizeTableModel(self.prize_view_model, self)
+        self.prize_table = QTableView()
+        self.prize_table.setModel(self.prize_model)
+        self.prize_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.prize_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.prize_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # 初始不显示排序标记，按添加顺序显示
+        self.prize_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.prize_table.setSortingEnabled(True)
+        self.prize_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.prize_table.verticalHeader().setDefaultSectionSize(40)
+        
+        self.action_delegate = ActionButtonDelegate([("edit", "修改"), ("delete", "删除")], self.prize_table)
+        self.action_delegate.clicked.connect(self.handle_prize_action)
+        self.prize_table.setItemDelegateForColumn(PrizeTableModel.ACTION_COLUMN, self.action_delegate)
         main_layout.addWidget(self.prize_table)
+        
+        # 边输入边查询，查询在搜索线程中执行，沿用表格当前的排序方式
+        self.search_controller = SearchController(
+            self.prize_view_model.create_search_manager,
+            self.query_prizes_in_worker,
+            parent=self
+        )
+        self.search_controller.attach(self.search_input)
+        self.search_controller.results_ready.connect(self.show_search_result)
     
     def add_prize(self):
         """添加奖品
@@ -146,94 +189,85 @@ class PrizeView(QWidget):
             QMessageBox.warning(self, "警告", "请输入奖品名称")
             return
         
-        prizes = self.prize_view_model.search_prizes_by_name(name)
-        if prizes:
-            # 清空表格
-            self.prize_table.setRowCount(0)
-            self.prize_id_map.clear()  # 清空映射
-            
-            # 添加查询结果
-            for prize in prizes:
-                row = self.prize_table.rowCount()
-                self.prize_table.insertRow(row)
-                self.prize_table.setItem(row, 0, QTableWidgetItem(prize['name']))
-                self.prize_table.setItem(row, 1, QTableWidgetItem(prize['level']))
-                self.prize_table.setItem(row, 2, QTableWidgetItem(str(prize['quantity'])))
-                
-                # 存储行索引到奖品ID的映射
-                self.prize_id_map[row] = prize['id']
-                
-                # 添加操作按钮
-                button_layout = QHBoxLayout()
-                button_layout.setSpacing(5)
-                
-                edit_button = QPushButton("修改")
-                edit_button.setFixedHeight(30)
-                edit_button.clicked.connect(lambda checked, pid=prize['id']: self.edit_prize(pid))
-                button_layout.addWidget(edit_button)
-                
-                delete_button = QPushButton("删除")
-                delete_button.setFixedHeight(30)
-                delete_button.clicked.connect(lambda checked, pid=prize['id']: self.delete_prize(pid))
-                button_layout.addWidget(delete_button)
-                
-                button_widget = QWidget()
-                button_widget.setLayout(button_layout)
-                self.prize_table.setCellWidget(row, 3, button_widget)
-                
-                # 设置行高
-                self.prize_table.setRowHeight(row, 70)
-        else:
+        self.notify_empty_result = True
+        self.search_controller.search_now(name)
+    
+    def query_prizes_in_worker(self, manager, keyword):
+        """在搜索线程中查询奖品
+        
+        Args:
+            manager: 搜索线程中的奖品管理对象
+            keyword: 奖品名称关键字
+        
+        Returns:
+            (奖品等级, 排序列, 是否降序, 奖品列表)
+        """
+        level = self.prize_model.level
+        sort_column = self.prize_model.sort_column
+        descending = self.prize_model.descending
+        return level, sort_column, descending, manager.query_prizes(keyword or None, level, sort_column, descending)
+    
+    def show_search_result(self, keyword, result):
+        """显示搜索线程返回的查询结果
+        
+        Args:
+            keyword: 奖品名称关键字
+            result: (奖品等级, 排序列, 是否降序, 奖品列表)
+        """
+        level, sort_column, descending, prizes = result
+        self.prize_model.show_search_result(keyword, level, sort_column, descending, prizes)
+        if self.notify_empty_result and self.prize_model.rowCount() == 0:
             QMessageBox.information(self, "提示", "未找到奖品")
+        self.notify_empty_result = False
     
+    @startup_profiler.phase("populate:prizes")
     def refresh_prize_list(self):
-        """刷新奖品列表
+        """刷新奖品列表，保留查询框中的条件和选中的等级
         """
-        prizes = self.prize_view_model.get_all_prizes()
-        
-        # 清空表格
-        self.prize_table.setRowCount(0)
-        
-        # 添加奖品数据
-        self.prize_id_map.clear()  # 清空映射
-        for prize in prizes:
-            row = self.prize_table.rowCount()
-            self.prize_table.insertRow(row)
-            self.prize_table.setItem(row, 0, QTableWidgetItem(prize['name']))
-            self.prize_table.setItem(row, 1, QTableWidgetItem(prize['level']))
-            self.prize_table.setItem(row, 2, QTableWidgetItem(str(prize['quantity'])))
-            
-            # 存储行索引到奖品ID的映射
-            self.prize_id_map[row] = prize['id']
-            
-            # 添加操作按钮
-            button_layout = QHBoxLayout()
-            button_layout.setSpacing(5)
-            
-            edit_button = QPushButton("修改")
-            edit_button.setFixedHeight(30)
-            edit_button.clicked.connect(lambda checked, pid=prize['id']: self.edit_prize(pid))
-            button_layout.addWidget(edit_button)
-            
-            delete_button = QPushButton("删除")
-            delete_button.setFixedHeight(30)
-            delete_button.clicked.connect(lambda checked, pid=prize['id']: self.delete_prize(pid))
-            button_layout.addWidget(delete_button)
-            
-            button_widget = QWidget()
-            button_widget.setLayout(button_layout)
-            self.prize_table.setCellWidget(row, 3, button_widget)
-            
-            # 设置行高
-            self.prize_table.setRowHeight(row, 70)
+        self.refresh_level_filter()
+        self.prize_model.level = self.level_filter.currentData()
+        self.prize_model.refresh(self.search_input.text().strip())
+    
+    def refresh_level_filter(self):
+        """重新读取等级筛选框中的奖品等级，选中的等级已不存在时改为全部等级
+        """
+        current = self.level_filter.currentData()
+        levels = self.prize_view_model.get_levels()
+        # 重新填充时不触发筛选，由调用方刷新列表
+        self.level_filter.blockSignals(True)
+        self.level_filter.clear()
+        self.level_filter.addItem("全部等级", None)
+        for level in levels:
+            self.level_filter.addItem(level, level)
+        index = self.level_filter.findData(current) if current in levels else 0
+        self.level_filter.setCurrentIndex(index)
+        self.level_filter.blockSignals(False)
     
-    def edit_prize(self, prize_id):
+    def filter_by_level(self):
+        """按选中的奖品等级筛选奖品列表
+        """
+        self.prize_model.set_level(self.level_filter.currentData())
+    
+    def handle_prize_action(self, action, row):
+        """处理奖品列表中的操作按钮
+        
+        Args:
+            action: 按钮名称（edit、delete）
+            row: 行号
+        """
+        if action == "edit":
+            self.edit_prize(row)
+        elif action == "delete":
+            self.delete_prize(row)
+    
+    def edit_prize(self, row):
         """修改奖品
         
         Args:
-            prize_id: 奖品ID
+            row: 奖品列表中的行号
         """
-        prize = self.prize_view_model.get_prize_by_id(prize_id)
+        prize = self.prize_model.get_prize(row)
+        prize = self.prize_view_model.get_prize_by_id(prize['id']) if prize else None
         if not prize:
             QMessageBox.warning(self, "警告", "奖品不存在")
             return
@@ -289,29 +323,37 @@ class PrizeView(QWidget):
                 QMessageBox.warning(self, "警告", "奖品数量必须是整数")
                 return
             
-            success = self.prize_view_model.update_prize(prize_id, name, level, quantity)
+            success = self.prize_view_model.update_prize(prize['id'], name, level, quantity)
             if success:
                 QMessageBox.information(self, "提示", "修改成功")
-                self.refresh_prize_list()
+                # 只刷新被修改的行，等级可能有变化，同时更新等级筛选框
+                self.prize_model.update_prize(row)
+                self.refresh_level_filter()
+                if self.level_filter.currentData() != self.prize_model.level:
+                    self.prize_model.set_level(self.level_filter.currentData())
             else:
                 QMessageBox.error(self, "错误", "修改失败")
     
-    def delete_prize(self, prize_id):
+    def delete_prize(self, row):
         """删除奖品
         
         Args:
-            prize_id: 奖品ID
+            row: 奖品列表中的行号
         """
+        prize = self.prize_model.get_prize(row)
+        if not prize:
+            return
+        
         reply = QMessageBox.question(
             self, "确认", "确定要删除该奖品吗？",
             QMessageBox.Yes | QMessageBox.No, QMessageBox.No
         )
         
         if reply == QMessageBox.Yes:
-            success = self.prize_view_model.delete_prize(prize_id)
+            success = self.prize_view_model.delete_prize(prize['id'])
             if success:
                 QMessageBox.information(self, "提示", "删除成功")
-                self.refresh_prize_list()
+                self.prize_model.remove_prize(row)
             else:
                 QMessageBox.error(self, "错误", "删除失败")
     
@@ -319,9 +361,7 @@ class PrizeView(QWidget):
         """批量删除奖品
         """
         # 获取选中的行
-        selected_rows = set()
-        for item in self.prize_table.selectedItems():
-            selected_rows.add(item.row())
+        selected_rows = {index.row() for index in self.prize_table.selectionModel().selectedRows()}
         
         if not selected_rows:
             QMessageBox.warning(self, "警告", "请选择要删除的奖品")
@@ -334,15 +374,14 @@ class PrizeView(QWidget):
         
         if reply == QMessageBox.Yes:
             success_count = 0
-            for row in selected_rows:
-                if row in self.prize_id_map:
-                    prize_id = self.prize_id_map[row]
-                    success = self.prize_view_model.delete_prize(prize_id)
-                    if success:
-                        success_count += 1
+            # 从后往前删除，移除一行后前面的行号不会变化
+            for row in sorted(selected_rows, reverse=True):
+                prize = self.prize_model.get_prize(row)
+                if prize and self.prize_view_model.delete_prize(prize['id']):
+                    self.prize_model.remove_prize(row)
+                    success_count += 1
             
             QMessageBox.information(self, "提示", f"删除成功: {success_count} 个，失败: {len(selected_rows) - success_count} 个")
-            self.refresh_prize_list()
     
     def generate_prize_template(self):
         """生成奖品批量导入模板
@@ -360,15 +399,135 @@ class PrizeView(QWidget):
         if not file_path:
             return
         
-        result = self.prize_view_model.import_prizes_from_csv(file_path)
+        # 同一文件上次导入中断时，可以从中断处继续，已导入的行不会重复导入
+        resume = True
+        checkpoint = self.prize_view_model.get_import_checkpoint(file_path)
+        if checkpoint is not None:
+            reply = QMessageBox.question(
+                self, "继续导入",
+                f"该文件上次导入中断（已读取 {checkpoint['parsed']} 行，已导入 {checkpoint['success']} 条），"
+                f"是否从中断处继续？\n选择“否”将从头重新导入，已导入的数据会重复",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+            )
+            if reply == QMessageBox.Cancel:
+                return
+            resume = reply == QMessageBox.Yes
+        
+        # 在后台线程中导入，界面只显示进度，导入结束后刷新一次
+        self.import_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.prize_view_model.import_prizes_from_csv(
+                file_path, progress_callback, should_cancel, resume=resume
+            )
+        )
+        # 先关闭进度对话框，再显示导入结果
+        self.import_dialog = ImportProgressDialog(self.import_runner, self)
+        self.import_runner.signals.finished.connect(self.on_import_finished)
+        self.import_runner.signals.failed.connect(self.on_import_failed)
+        self.import_runner.start()
+    
+    def on_import_finished(self, result):
+        """导入结束后显示结果并刷新列表
+        
+        Args:
+            result: 导入结果
+        """
         if "error" in result:
             QMessageBox.critical(self, "错误", f"导入失败: {result['error']}")
-        else:
+        elif result.get("cancelled"):
             QMessageBox.information(
-                self, "提示", 
-                f"导入成功: {result['success']} 条，失败: {result['failed']} 条"
+                self, "提示",
+                f"导入已取消，已导入: {result['success']} 条，失败: {result['failed']} 条\n再次导入该文件时可从中断处继续"
             )
-            self.refresh_prize_list()
+        else:
+            message = f"导入成功: {result['success']} 条，失败: {result['failed']} 条"
+            if "rejects_path" in result:
+                message += f"\n失败的行已保存到: {result['rejects_path']}"
+            QMessageBox.information(self, "提示", message)
+        self.refresh_prize_list()
+    
+    def on_import_failed(self, error):
+        """导入出错
+        
+        Args:
+            error: 错误信息
+        """
+        QMessageBox.critical(self, "错误", f"导入失败: {error}")
+        self.refresh_prize_list()
+    
+    def export_prizes(self):
+        """导出全部奖品
+        """
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出奖品", "prizes.csv", ExportProgressDialog.FILE_FILTER
+        )
+        
+        if not file_path:
+            return
+        
+        # 在后台线程中逐批导出，数据量大时界面也不会卡住
+        self.export_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.prize_view_model.export_prizes(
+                file_path, progress_callback, should_cancel
+            )
+        )
+        self.export_dialog = ExportProgressDialog(self.export_runner, self)
+        self.export_runner.signals.finished.connect(self.on_export_finished)
+        self.export_runner.signals.failed.connect(lambda error: QMessageBox.critical(self, "错误", f"导出失败: {error}"))
+        self.export_runner.start()
+    
+    def on_export_finished(self, result):
+        """导出结束后显示结果
+        
+        Args:
+            result: 导出结果
+        """
+        if result['cancelled']:
+            QMessageBox.information(self, "提示", "导出已取消")
+        else:
+            QMessageBox.information(self, "提示", f"已导出 {result['rows']} 条到: {result['path']}")
+    
+    def check_prizes_csv(self):
+        """检查CSV文件导入后的结果，不写入数据库
+        """
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择CSV文件", "", "CSV文件 (*.csv)"
+        )
+        
+        if not file_path:
+            return
+        
+        self.import_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.prize_view_model.import_prizes_from_csv(
+                file_path, progress_callback, should_cancel, dry_run=True
+            )
+        )
+        self.import_dialog = ImportProgressDialog(self.import_runner, self)
+        self.import_dialog.setWindowTitle("导入预检")
+        self.import_dialog.setLabelText("正在检查...")
+        self.import_runner.signals.finished.connect(self.on_check_finished)
+        self.import_runner.signals.failed.connect(lambda error: QMessageBox.critical(self, "错误", f"检查失败: {error}"))
+        self.import_runner.start()
+    
+    def on_check_finished(self, result):
+        """显示导入预检的结果
+        
+        Args:
+            result: 检查结果
+        """
+        if "error" in result:
+            QMessageBox.critical(self, "错误", f"检查失败: {result['error']}")
+            return
+        
+        message = "检查已取消，" if result.get("cancelled") else ""
+        message += (
+            f"已检查: {result['parsed']} 行，可导入: {result['success']} 条，"
+            f"其中有问题: {result['warnings']} 条，无法导入: {result['failed']} 条（未写入数据库）"
+        )
+        for issue, count in result['issues'].items():
+            message += f"\n{issue}: {count} 行"
+        if "rejects_path" in result:
+            message += f"\n有问题的行已保存到: {result['rejects_path']}"
+        QMessageBox.information(self, "导入预检", message)
     
     def show_probability_view(self):
         """显示中奖概率管理界面
@@ -0,0 +1,175 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+
+class ProbabilityTableModel(QAbstractTableModel):
+    """中奖概率表格模型
+    
+    数据来自用户与中奖设置的关联查询，修改中奖概率或必中奖品时直接写入数据库，
+    只刷新被修改的行
+    """
+    
+    # 修改被拒绝或失败，参数为提示级别（warning、error）和提示文字
+    rejected = pyqtSignal(str, str)
+    
+    COLUMNS = ["用户名", "工号", "中奖概率", "必中奖品", "操作"]
+    PROBABILITY_COLUMN = 2
+    PRIZE_COLUMN = 3
+    ACTION_COLUMN = 4
+    
+    # 中奖可能性选项
+    PROBABILITY_OPTIONS = [("默认", 0), ("必中", 1), ("必不中", 2)]
+    NO_PRIZE_LABEL = "无"
+    
+    def __init__(self, probability_view_model, prize_options, parent=None):
+        """初始化中奖概率表格模型
+        
+        Args:
+            probability_view_model: 中奖概率视图模型
+            prize_options: 必中奖品的选项列表模型，与下拉编辑器共用
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.probability_view_model = probability_view_model
+        self.prize_options = prize_options
+        self._probability_labels = {value: label for label, value in self.PROBABILITY_OPTIONS}
+        self._users = []
+    
+    def refresh(self, keyword=None):
+        """重新加载用户和奖品选项
+        
+        Args:
+            keyword: 用户名关键字，为空时显示全部用户
+        """
+        prizes = self.probability_view_model.get_all_prizes()
+        self.prize_options.set_options(
+            [(self.NO_PRIZE_LABEL, None)] + [(f"{prize['name']} ({prize['level']})", prize['id']) for prize in prizes]
+        )
+        self.beginResetModel()
+        self._users = self.probability_view_model.get_all_users_with_probability(keyword or None)
+        self.endResetModel()
+    
+    def show_search_result(self, users):
+        """显示在搜索线程中查好的用户，奖品选项保持不变
+        
+        Args:
+            users: 用户及其中奖设置列表
+        """
+        self.beginResetModel()
+        self._users = users
+        self.endResetModel()
+    
+    def get_user(self, row):
+        """获取指定行的用户
+        
+        Args:
+            row: 行号
+        
+        Returns:
+            用户信息，行号无效时返回None
+        """
+        if 0 <= row < len(self._users):
+            return self._users[row]
+        return None
+    
+    def rowCount(self, parent=QModelIndex()):
+        """行数，即用户数量
+        """
+        if parent.isValid():
+            return 0
+        return len(self._users)
+    
+    def columnCount(self, parent=QModelIndex()):
+        """列数
+        """
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        """单元格内容，EditRole返回中奖可能性或必中奖品ID
+        """
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        user = self._users[index.row()]
+        column = index.column()
+        if column == 0:
+            return user['username']
+        if column == 1:
+            return user['employee_id']
+        if column == self.PROBABILITY_COLUMN:
+            if role == Qt.EditRole:
+                return user['winning_probability']
+            return self._probability_labels.get(user['winning_probability'])
+        if column == self.PRIZE_COLUMN:
+            if role == Qt.EditRole:
+                return user['prize_id']
+            return self.prize_options.label_for(user['prize_id']) or self.NO_PRIZE_LABEL
+        return None
+    
+    def flags(self, index):
+        """中奖概率和必中奖品两列可编辑
+        """
+        flags = super().flags(index)
+        if index.isValid() and index.column() in (self.PROBABILITY_COLUMN, self.PRIZE_COLUMN):
+            flags |= Qt.ItemIsEditable
+        return flags
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        """修改中奖概率或必中奖品并写入数据库
+        """
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        user = self._users[index.row()]
+        
+        if index.column() == self.PROBABILITY_COLUMN:
+            # 必不中用户不能有必中奖品
+            prize_id = None if value == 2 else user['prize_id']
+            if not self.probability_view_model.add_or_update_winner(user['id'], value, prize_id):
+                self.rejected.emit("error", "更新中奖概率失败")
+                return False
+            self._update_row(index.row(), value, prize_id)
+            return True
+        
+        if index.column() == self.PRIZE_COLUMN:
+            if user['winning_probability'] == 2:
+                self.rejected.emit("warning", "必不中用户不能设置必中奖品")
+                return False
+            if not self.probability_view_model.add_or_update_winner(user['id'], user['winning_probability'], value):
+                self.rejected.emit("error", "更新必中奖品失败")
+                return False
+            self._update_row(index.row(), user['winning_probability'], value)
+            return True
+        
+        return False
+    
+    def reset_rule(self, row):
+        """把指定行用户的中奖设置恢复为默认
+        
+        Args:
+            row: 行号
+        
+        Returns:
+            是否重置成功
+        """
+        user = self.get_user(row)
+        if user is None or not self.probability_view_model.add_or_update_winner(user['id'], 0, None):
+            return False
+        self._update_row(row, 0, None)
+        return True
+    
+    def _update_row(self, row, winning_probability, prize_id):
+        """更新一行的中奖设置并通知表格刷新该行
+        """
+        user = self._users[row]
+        user['winning_probability'] = winning_probability
+        user['prize_id'] = prize_id
+        self.dataChanged.emit(self.index(row, self.PROBABILITY_COLUMN), self.index(row, self.PRIZE_COLUMN))
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """表头显示内容，行表头为序号
+        """
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return section + 1
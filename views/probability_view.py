@@ -1,8 +1,16 @@
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton,
-    QTableWidget, QTableWidgetItem, QMessageBox, QHeaderView, QLineEdit
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableView, QAbstractItemView, QMessageBox, QHeaderView, QLineEdit, QFileDialog
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QTimer
+from main_logic import startup_profiler
+from views.probability_table_model import ProbabilityTableModel
+from views.option_list_model import OptionListModel
+from views.combo_box_delegate import ComboBoxDelegate
+from views.action_button_delegate import ActionButtonDelegate
+from views.search_controller import SearchController
+from views.task_runner import TaskRunner
+from views.export_progress_dialog import ExportProgressDialog
 
 
 class ProbabilityView(QWidget):
@@ -18,8 +26,8 @@ class ProbabilityView(QWidget):
         super().__init__()
         self.probability_view_model = probability_view_model
         self.init_ui()
-        self.prizes = []  # 存储奖品列表
-        self.refresh_user_list()
+        # 界面先显示出来，表格数据在事件循环空闲时再加载
+        QTimer.singleShot(0, self.refresh_user_list)
     
     def init_ui(self):
         """初始化中奖概率管理界面
@@ -44,154 +52,117 @@ class ProbabilityView(QWidget):
         self.refresh_button.clicked.connect(self.refresh_user_list)
         search_layout.addWidget(self.refresh_button)
         
+        self.export_button = QPushButton("导出")
+        self.export_button.clicked.connect(self.export_rules)
+        search_layout.addWidget(self.export_button)
+        
         main_layout.addLayout(search_layout)
         
-        # 创建用户列表
-        self.user_table = QTableWidget()
-        self.user_table.setColumnCount(5)
-        self.user_table.setHorizontalHeaderLabels(["用户名", "工号", "中奖概率", "必中奖品", "操作"])
+        # 创建用户列表，下拉框只在编辑单元格时创建，所有行共用同一份选项
+        self.notify_empty_result = False  # 点击查询按钮时，没有结果要提示
+        self.probability_options = OptionListModel(ProbabilityTableModel.PROBABILITY_OPTIONS, self)
+        self.prize_options = OptionListModel(parent=self)
+        self.user_model = ProbabilityTableModel(self.probability_view_model, self.prize_options, self)
+        self.user_model.rejected.connect(self.show_rejected_message)
+        
+        self.user_table = QTableView()
+        self.user_table.setModel(self.user_model)
+        self.user_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.user_table.setEditTriggers(
+            QAbstractItemView.CurrentChanged | QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked
+        )
         self.user_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.user_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.user_table.verticalHeader().setDefaultSectionSize(40)
+        
+        self.probability_delegate = ComboBoxDelegate(self.probability_options, self.user_table)
+        self.user_table.setItemDelegateForColumn(ProbabilityTableModel.PROBABILITY_COLUMN, self.probability_delegate)
+        self.prize_delegate = ComboBoxDelegate(self.prize_options, self.user_table)
+        self.user_table.setItemDelegateForColumn(ProbabilityTableModel.PRIZE_COLUMN, self.prize_delegate)
+        self.action_delegate = ActionButtonDelegate([("reset", "重置")], self.user_table)
+        self.action_delegate.clicked.connect(self.handle_user_action)
+        self.user_table.setItemDelegateForColumn(ProbabilityTableModel.ACTION_COLUMN, self.action_delegate)
         main_layout.addWidget(self.user_table)
+        
+        # 边输入边查询，在搜索线程中按用户名过滤
+        self.search_controller = SearchController(
+            self.probability_view_model.create_search_manager,
+            lambda manager, keyword: manager.get_users_with_rules(keyword or None),
+            parent=self
+        )
+        self.search_controller.attach(self.search_input)
+        self.search_controller.results_ready.connect(self.show_search_result)
     
+    @startup_profiler.phase("populate:probabilities")
     def refresh_user_list(self):
-        """刷新用户列表
+        """刷新用户列表，保留查询框中的条件
         """
-        # 加载用户列表
-        users = self.probability_view_model.get_all_users_with_probability()
-        
-        # 加载奖品列表
-        from manager.prize_manager import PrizeManager
-        prize_manager = PrizeManager('lottery.db')
-        self.prizes = prize_manager.get_all_prizes()
-        prize_manager.close()
-        
-        # 清空表格
-        self.user_table.setRowCount(0)
-        
-        # 添加用户数据
-        for user in users:
-            row = self.user_table.rowCount()
-            self.user_table.insertRow(row)
-            self.user_table.setItem(row, 0, QTableWidgetItem(user['username']))
-            self.user_table.setItem(row, 1, QTableWidgetItem(user['employee_id']))
-            
-            # 添加中奖概率下拉框
-            probability_combo = QComboBox()
-            probability_combo.addItem("默认", 0)
-            probability_combo.addItem("必中", 1)
-            probability_combo.addItem("必不中", 2)
-            
-            # 设置当前值
-            current_probability = user.get('winning_probability', 0)
-            probability_combo.setCurrentIndex(current_probability)
-            
-            # 连接信号
-            probability_combo.currentIndexChanged.connect(
-                lambda index, uid=user['id'], combo=probability_combo, row=row: self.update_probability(uid, combo.currentData(), row)
-            )
-            
-            self.user_table.setCellWidget(row, 2, probability_combo)
-            
-            # 添加奖品选择下拉框
-            prize_combo = QComboBox()
-            prize_combo.addItem("无", None)
-            for prize in self.prizes:
-                prize_combo.addItem(f"{prize['name']} ({prize['level']})", prize['id'])
-            
-            # 获取当前奖品ID
-            current_prize_id = None
-            winner_info = self.probability_view_model.get_winner_by_user_id(user['id'])
-            if winner_info:
-                current_prize_id = winner_info.get('prize_id')
-            
-            # 设置当前值
-            for i in range(prize_combo.count()):
-                if prize_combo.itemData(i) == current_prize_id:
-                    prize_combo.setCurrentIndex(i)
-                    break
-            
-            # 连接信号
-            prize_combo.currentIndexChanged.connect(
-                lambda index, uid=user['id'], combo=prize_combo, row=row: self.update_prize(uid, combo.currentData(), row)
-            )
-            
-            self.user_table.setCellWidget(row, 3, prize_combo)
-            
-            # 添加操作按钮
-            button_layout = QHBoxLayout()
-            button_layout.setSpacing(5)
-            
-            reset_button = QPushButton("重置")
-            reset_button.setFixedHeight(30)
-            reset_button.clicked.connect(lambda checked, uid=user['id']: self.reset_probability(uid))
-            button_layout.addWidget(reset_button)
-            
-            button_widget = QWidget()
-            button_widget.setLayout(button_layout)
-            self.user_table.setCellWidget(row, 4, button_widget)
-            
-            # 设置行高
-            self.user_table.setRowHeight(row, 70)
+        self.user_model.refresh(self.search_input.text().strip())
     
-    def update_probability(self, user_id, winning_probability, row):
-        """更新中奖概率
+    def handle_user_action(self, action, row):
+        """处理用户列表中的操作按钮
         
         Args:
-            user_id: 用户ID
-            winning_probability: 中奖概率（0为默认，1为必中，2为必不中）
-            row: 表格行索引
+            action: 按钮名称（reset）
+            row: 行号
         """
-        # 如果用户被设置为必不中，则自动将奖品ID设置为None
-        prize_id = None
-        if winning_probability != 2:
-            # 获取当前选择的奖品ID
-            prize_combo = self.user_table.cellWidget(row, 3)
-            prize_id = prize_combo.currentData()
-        else:
-            # 如果用户被设置为必不中，重置奖品选择为"无"
-            prize_combo = self.user_table.cellWidget(row, 3)
-            prize_combo.setCurrentIndex(0)  # 0是"无"选项的索引
-        
-        success = self.probability_view_model.add_or_update_winner(user_id, winning_probability, prize_id)
-        if not success:
-            QMessageBox.critical(self, "错误", "更新中奖概率失败")
+        if action == "reset":
+            self.reset_probability(row)
     
-    def update_prize(self, user_id, prize_id, row):
-        """更新必中奖品
+    def reset_probability(self, row):
+        """重置中奖概率
         
         Args:
-            user_id: 用户ID
-            prize_id: 必中奖品ID
             row: 表格行索引
         """
-        # 获取当前选择的中奖概率
-        probability_combo = self.user_table.cellWidget(row, 2)
-        winning_probability = probability_combo.currentData()
+        if self.user_model.reset_rule(row):
+            QMessageBox.information(self, "提示", "重置成功")
+        else:
+            QMessageBox.critical(self, "错误", "重置失败")
+    
+    def export_rules(self):
+        """导出全部中奖设置
+        """
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出中奖设置", "rules.csv", ExportProgressDialog.FILE_FILTER
+        )
         
-        # 如果用户被设置为必不中，则不允许设置必中奖品
-        if winning_probability == 2:
-            # 重置奖品选择为"无"
-            prize_combo = self.user_table.cellWidget(row, 3)
-            prize_combo.setCurrentIndex(0)  # 0是"无"选项的索引
-            QMessageBox.warning(self, "警告", "必不中用户不能设置必中奖品")
+        if not file_path:
             return
         
-        success = self.probability_view_model.add_or_update_winner(user_id, winning_probability, prize_id)
-        if not success:
-            QMessageBox.critical(self, "错误", "更新必中奖品失败")
+        # 在后台线程中逐批导出，数据量大时界面也不会卡住
+        self.export_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.probability_view_model.export_rules(
+                file_path, progress_callback, should_cancel
+            )
+        )
+        self.export_dialog = ExportProgressDialog(self.export_runner, self)
+        self.export_runner.signals.finished.connect(self.on_export_finished)
+        self.export_runner.signals.failed.connect(lambda error: QMessageBox.critical(self, "错误", f"导出失败: {error}"))
+        self.export_runner.start()
     
-    def reset_probability(self, user_id):
-        """重置中奖概率
+    def on_export_finished(self, result):
+        """导出结束后显示结果
         
         Args:
-            user_id: 用户ID
+            result: 导出结果
         """
-        success = self.probability_view_model.add_or_update_winner(user_id, 0, None)
-        if success:
-            QMessageBox.information(self, "提示", "重置成功")
-            self.refresh_user_list()
+        if result['cancelled']:
+            QMessageBox.information(self, "提示", "导出已取消")
         else:
-            QMessageBox.critical(self, "错误", "重置失败")
+            QMessageBox.information(self, "提示", f"已导出 {result['rows']} 条到: {result['path']}")
+    
+    def show_rejected_message(self, level, message):
+        """提示被拒绝或失败的修改
+        
+        Args:
+            level: 提示级别（warning、error）
+            message: 提示文字
+        """
+        if level == "warning":
+            QMessageBox.warning(self, "警告", message)
+        else:
+            QMessageBox.critical(self, "错误", message)
     
     def search_user(self):
         """根据用户名搜索用户
@@ -201,86 +172,17 @@ class ProbabilityView(QWidget):
             QMessageBox.warning(self, "警告", "请输入用户名")
             return
         
-        # 加载所有用户数据
-        users = self.probability_view_model.get_all_users_with_probability()
-        
-        # 过滤出匹配的用户
-        filtered_users = [user for user in users if username in user['username']]
+        self.notify_empty_result = True
+        self.search_controller.search_now(username)
+    
+    def show_search_result(self, keyword, users):
+        """显示搜索线程返回的查询结果
         
-        if not filtered_users:
+        Args:
+            keyword: 用户名关键字
+            users: 用户及其中奖设置列表
+        """
+        self.user_model.show_search_result(users)
+        if self.notify_empty_result and not users:
             QMessageBox.information(self, "提示", "未找到匹配的用户")
-            return
-        
-        # 加载奖品列表
-        from manager.prize_manager import PrizeManager
-        prize_manager = PrizeManager('lottery.db')
-        self.prizes = prize_manager.get_all_prizes()
-        prize_manager.close()
-        
-        # 清空表格
-        self.user_table.setRowCount(0)
-        
-        # 添加过滤后的用户数据
-        for user in filtered_users:
-            row = self.user_table.rowCount()
-            self.user_table.insertRow(row)
-            self.user_table.setItem(row, 0, QTableWidgetItem(user['username']))
-            self.user_table.setItem(row, 1, QTableWidgetItem(user['employee_id']))
-            
-            # 添加中奖概率下拉框
-            probability_combo = QComboBox()
-            probability_combo.addItem("默认", 0)
-            probability_combo.addItem("必中", 1)
-            probability_combo.addItem("必不中", 2)
-            
-            # 设置当前值
-            current_probability = user.get('winning_probability', 0)
-            probability_combo.setCurrentIndex(current_probability)
-            
-            # 连接信号
-            probability_combo.currentIndexChanged.connect(
-                lambda index, uid=user['id'], combo=probability_combo, row=row: self.update_probability(uid, combo.currentData(), row)
-            )
-            
-            self.user_table.setCellWidget(row, 2, probability_combo)
-            
-            # 添加奖品选择下拉框
-            prize_combo = QComboBox()
-            prize_combo.addItem("无", None)
-            for prize in self.prizes:
-                prize_combo.addItem(f"{prize['name']} ({prize['level']})", prize['id'])
-            
-            # 获取当前奖品ID
-            current_prize_id = None
-            winner_info = self.probability_view_model.get_winner_by_user_id(user['id'])
-            if winner_info:
-                current_prize_id = winner_info.get('prize_id')
-            
-            # 设置当前值
-            for i in range(prize_combo.count()):
-                if prize_combo.itemData(i) == current_prize_id:
-                    prize_combo.setCurrentIndex(i)
-                    break
-            
-            # 连接信号
-            prize_combo.currentIndexChanged.connect(
-                lambda index, uid=user['id'], combo=prize_combo, row=row: self.update_prize(uid, combo.currentData(), row)
-            )
-            
-            self.user_table.setCellWidget(row, 3, prize_combo)
-            
-            # 添加操作按钮
-            button_layout = QHBoxLayout()
-            button_layout.setSpacing(5)
-            
-            reset_button = QPushButton("重置")
-            reset_button.setFixedHeight(30)
-            reset_button.clicked.connect(lambda checked, uid=user['id']: self.reset_probability(uid))
-            button_layout.addWidget(reset_button)
-            
-            button_widget = QWidget()
-            button_widget.setLayout(button_layout)
-            self.user_table.setCellWidget(row, 4, button_widget)
-            
-            # 设置行高
-            self.user_table.setRowHeight(row, 70)
+        self.notify_empty_result = False
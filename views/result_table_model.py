@@ -0,0 +1,74 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class ResultTableModel(QAbstractTableModel):
+    """抽奖结果表格模型
+    
+    由抽奖结果事件驱动，新结果只在末尾插入新行，已有行不会重建，
+    每次抽奖的界面更新开销与已抽出的结果数量无关
+    """
+    
+    COLUMNS = [
+        ("用户名", "username"),
+        ("工号", "employee_id"),
+        ("奖品名称", "prize_name"),
+        ("奖品等级", "prize_level")
+    ]
+    
+    def __init__(self, parent=None):
+        """初始化抽奖结果表格模型
+        
+        Args:
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self._results = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        """行数，即结果数量
+        """
+        if parent.isValid():
+            return 0
+        return len(self._results)
+    
+    def columnCount(self, parent=QModelIndex()):
+        """列数
+        """
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        """单元格显示内容
+        """
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self._results[index.row()].get(self.COLUMNS[index.column()][1])
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """表头显示内容，行表头为序号
+        """
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section][0]
+        return section + 1
+    
+    def handle_result_event(self, event, results):
+        """处理抽奖结果事件
+        
+        Args:
+            event: 事件类型，append为新增结果，reset为结果整体替换
+            results: 新增的结果或替换后的全部结果
+        """
+        if event == "append":
+            if not results:
+                return
+            first = len(self._results)
+            self.beginInsertRows(QModelIndex(), first, first + len(results) - 1)
+            self._results.extend(results)
+            self.endInsertRows()
+        elif event == "reset":
+            self.beginResetModel()
+            self._results = list(results)
+            self.endResetModel()
@@ -0,0 +1,165 @@
+import sqlite3
+from PyQt5.QtCore import QCoreApplication, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+
+class _SearchTask(QRunnable):
+    """在查询线程中执行一次搜索
+    """
+    
+    def __init__(self, controller, generation, keyword):
+        """初始化搜索任务
+        
+        Args:
+            controller: 所属的搜索控制器
+            generation: 发起搜索时的搜索序号
+            keyword: 搜索关键字
+        """
+        super().__init__()
+        self.controller = controller
+        self.generation = generation
+        self.keyword = keyword
+    
+    def run(self):
+        """执行搜索，已经过期的搜索直接跳过
+        """
+        controller = self.controller
+        # 排队期间又有新的输入，不必再查询
+        if self.generation != controller.generation:
+            return
+        if controller.source is None:
+            controller.source = controller.create_source()
+        
+        # 被中断的查询如果仍是最新的搜索（中断落在了它身上），重新查询一次
+        for _ in range(2):
+            controller.running_generation = self.generation
+            try:
+                result = controller.run_query(controller.source, self.keyword)
+            except sqlite3.OperationalError as e:
+                if "interrupted" not in str(e) or self.generation != controller.generation:
+                    return
+                continue
+            except Exception:
+                return
+            finally:
+                controller.running_generation = None
+            controller.query_finished.emit(self.generation, self.keyword, result)
+            return
+
+
+class SearchController(QObject):
+    """边输入边搜索的控制器
+    
+    输入停顿一段时间后才发起搜索，查询在单独的线程中执行，不阻塞界面；
+    新的输入会让旧的搜索过期，正在执行的旧查询通过中断数据库连接取消，
+    只有最新一次搜索的结果会交给界面
+    
+    查询线程只有一个且常驻，查询用的数据库对象（如UserManager）在该线程中创建并一直使用，
+    SQLite连接不会跨线程共享
+    """
+    
+    # 查询完成（在查询线程中发出），参数为搜索序号、关键字和查询结果
+    query_finished = pyqtSignal(int, str, object)
+    # 最新一次搜索的结果，参数为关键字和查询结果
+    results_ready = pyqtSignal(str, object)
+    
+    DEFAULT_DELAY_MS = 150
+    
+    def __init__(self, create_source, run_query, delay_ms=DEFAULT_DELAY_MS, parent=None):
+        """初始化搜索控制器
+        
+        Args:
+            create_source: 在查询线程中调用，创建查询用的对象，要求有db属性（SQLiteDB）
+            run_query: 在查询线程中调用，参数为create_source创建的对象和关键字，返回查询结果
+            delay_ms: 输入停顿多久后发起搜索（毫秒）
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.create_source = create_source
+        self.run_query = run_query
+        self.source = None  # 只在查询线程中创建和使用
+        self.generation = 0  # 最新一次搜索的序号
+        self.running_generation = None  # 正在查询的搜索序号
+        self.keyword = ""
+        
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.pool.setExpiryTimeout(-1)
+        
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.search_now)
+        
+        self.query_finished.connect(self._on_finished)
+        # 程序退出前关闭搜索线程中的数据库连接
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close)
+    
+    def attach(self, line_edit):
+        """监听输入框，输入变化时延迟搜索
+        
+        Args:
+            line_edit: 搜索输入框
+        """
+        line_edit.textChanged.connect(self.schedule)
+        line_edit.returnPressed.connect(lambda: self.search_now(line_edit.text()))
+    
+    def schedule(self, keyword):
+        """输入变化后重新计时，停顿delay_ms后再搜索
+        
+        Args:
+            keyword: 搜索关键字
+        """
+        self.keyword = keyword.strip()
+        self.timer.start()
+    
+    def search_now(self, keyword=None):
+        """立即发起搜索，之前的搜索全部过期
+        
+        Args:
+            keyword: 搜索关键字，为空时使用最近一次输入的关键字
+        """
+        self.timer.stop()
+        if keyword is not None:
+            self.keyword = keyword.strip()
+        self.generation += 1
+        self._interrupt()
+        self.pool.start(_SearchTask(self, self.generation, self.keyword))
+    
+    def cancel(self):
+        """取消尚未完成的搜索
+        """
+        self.timer.stop()
+        self.generation += 1
+        self._interrupt()
+    
+    def close(self):
+        """取消搜索，在查询线程中关闭数据库连接并等待线程结束
+        """
+        self.cancel()
+        self.pool.start(self._close_source)
+        self.pool.waitForDone()
+    
+    def _close_source(self):
+        """关闭查询用的数据库连接，在查询线程中调用
+        """
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+    
+    def _interrupt(self):
+        """中断正在执行的过期查询
+        """
+        running = self.running_generation
+        if running is None or running == self.generation or self.source is None:
+            return
+        connection = self.source.db.connection
+        if connection is not None:
+            connection.interrupt()
+    
+    def _on_finished(self, generation, keyword, result):
+        """只把最新一次搜索的结果交给界面
+        """
+        if generation == self.generation:
+            self.results_ready.emit(keyword, result)
@@ -0,0 +1,68 @@
+import threading
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskSignals(QObject):
+    """后台任务的信号
+    
+    信号在后台线程中发出，连接到界面对象的槽会在界面线程中执行
+    """
+    
+    # 任务进度，参数由任务自行决定
+    progress = pyqtSignal(object)
+    # 任务完成，参数为任务的返回值
+    finished = pyqtSignal(object)
+    # 任务出错，参数为错误信息
+    failed = pyqtSignal(str)
+
+
+class TaskRunner(QRunnable):
+    """在线程池中执行耗时任务
+    
+    任务是一个函数，参数为进度回调和取消检查函数，任务应定期调用取消检查函数，
+    返回True时尽快结束；任务需要的数据库对象应在任务函数中创建
+    """
+    
+    def __init__(self, task):
+        """初始化后台任务
+        
+        Args:
+            task: 任务函数，形如task(progress_callback, should_cancel)，返回任务结果
+        """
+        super().__init__()
+        # 由调用方持有，任务结束后仍可安全访问信号
+        self.setAutoDelete(False)
+        self.task = task
+        self.signals = TaskSignals()
+        self._cancelled = threading.Event()
+    
+    def start(self, pool=None):
+        """把任务放入线程池执行
+        
+        Args:
+            pool: 线程池，为空时使用全局线程池
+        """
+        (pool or QThreadPool.globalInstance()).start(self)
+    
+    def cancel(self):
+        """请求取消任务
+        """
+        self._cancelled.set()
+    
+    def is_cancelled(self):
+        """是否已请求取消
+        
+        Returns:
+            是否已请求取消
+        """
+        return self._cancelled.is_set()
+    
+    def run(self):
+        """执行任务并发出完成或出错信号
+        """
+        try:
+            result = self.task(self.signals.progress.emit, self.is_cancelled)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
@@ -0,0 +1,122 @@
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class UserTableModel(QAbstractTableModel):
+    """用户表格模型
+    
+    只查询用户总数，行数据按页从数据库读取并缓存最近使用的若干页，
+    表格只为可见的行请求数据，用户数量再多也不会一次性加载
+    """
+    
+    COLUMNS = ["用户名", "工号", "操作"]
+    ACTION_COLUMN = 2
+    PAGE_SIZE = 200
+    MAX_CACHED_PAGES = 20
+    
+    def __init__(self, user_view_model, parent=None):
+        """初始化用户表格模型
+        
+        Args:
+            user_view_model: 用户视图模型
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.user_view_model = user_view_model
+        self.keyword = None
+        self._row_count = 0
+        self._pages = OrderedDict()  # 页号到用户列表的映射，按最近使用排序
+    
+    def refresh(self, keyword=None):
+        """重新统计用户数量并清空缓存
+        
+        Args:
+            keyword: 用户名关键字，为空时显示全部用户
+        """
+        self.beginResetModel()
+        self.keyword = keyword or None
+        self._pages.clear()
+        self._row_count = self.user_view_model.count_users(self.keyword)
+        self.endResetModel()
+    
+    def show_search_result(self, keyword, row_count, first_page):
+        """显示在搜索线程中查好的结果，第一页直接放入缓存
+        
+        Args:
+            keyword: 用户名关键字
+            row_count: 匹配的用户数量
+            first_page: 第一页用户列表
+        """
+        self.beginResetModel()
+        self.keyword = keyword or None
+        self._pages.clear()
+        self._pages[0] = first_page
+        self._row_count = row_count
+        self.endResetModel()
+    
+    def _get_page(self, page):
+        """获取一页用户，不在缓存中时从数据库读取
+        """
+        users = self._pages.get(page)
+        if users is None:
+            users = self.user_view_model.get_users_page(page * self.PAGE_SIZE, self.PAGE_SIZE, self.keyword)
+            self._pages[page] = users
+            if len(self._pages) > self.MAX_CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return users
+    
+    def get_user(self, row):
+        """获取指定行的用户
+        
+        Args:
+            row: 行号
+        
+        Returns:
+            用户信息，行号无效时返回None
+        """
+        if row < 0 or row >= self._row_count:
+            return None
+        users = self._get_page(row // self.PAGE_SIZE)
+        offset = row % self.PAGE_SIZE
+        return users[offset] if offset < len(users) else None
+    
+    def rowCount(self, parent=QModelIndex()):
+        """行数，即用户数量
+        """
+        if parent.isValid():
+            return 0
+        return self._row_count
+    
+    def columnCount(self, parent=QModelIndex()):
+        """列数
+        """
+        if parent.isValid():
+            return 0
+        return len(self.COLUMNS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        """单元格内容，UserRole返回用户ID
+        """
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.UserRole):
+            return None
+        user = self.get_user(index.row())
+        if user is None:
+            return None
+        if role == Qt.UserRole:
+            return user['id']
+        if index.column() == 0:
+            return user['username']
+        if index.column() == 1:
+            return user['employee_id']
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """表头显示内容，行表头为序号
+        """
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return section + 1
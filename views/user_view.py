@@ -1,8 +1,15 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
-    QTableWidget, QTableWidgetItem, QMessageBox, QFileDialog, QHeaderView, QDialog, QDialogButtonBox
+    QTableView, QAbstractItemView, QMessageBox, QFileDialog, QHeaderView, QDialog, QDialogButtonBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+from main_logic import startup_profiler
+from views.user_table_model import UserTableModel
+from views.action_button_delegate import ActionButtonDelegate
+from views.search_controller import SearchController
+from views.task_runner import TaskRunner
+from views.import_progress_dialog import ImportProgressDialog
+from views.export_progress_dialog import ExportProgressDialog
 
 
 class UserView(QWidget):
@@ -17,9 +24,9 @@ class UserView(QWidget):
         """
         super().__init__()
         self.user_view_model = user_view_model
-        self.user_id_map = {}  # 存储行索引到用户ID的映射
         self.init_ui()
-        self.refresh_user_list()
+        # 界面先显示出来，表格数据在事件循环空闲时再加载
+        QTimer.singleShot(0, self.refresh_user_list)
     
     def init_ui(self):
         """初始化用户管理界面
@@ -76,18 +83,48 @@ class UserView(QWidget):
         self.import_csv_button.clicked.connect(self.import_users_from_csv)
         batch_layout.addWidget(self.import_csv_button)
         
+        self.check_csv_button = QPushButton("导入预检")
+        self.check_csv_button.clicked.connect(self.check_users_csv)
+        batch_layout.addWidget(self.check_csv_button)
+        
+        self.sync_csv_button = QPushButton("同步导入")
+        self.sync_csv_button.clicked.connect(self.sync_users_from_csv)
+        batch_layout.addWidget(self.sync_csv_button)
+        
+        self.export_button = QPushButton("导出")
+        self.export_button.clicked.connect(self.export_users)
+        batch_layout.addWidget(self.export_button)
+        
         self.batch_delete_button = QPushButton("批量删除")
         self.batch_delete_button.clicked.connect(self.batch_delete_users)
         batch_layout.addWidget(self.batch_delete_button)
         
         main_layout.addLayout(batch_layout)
         
-        # 创建用户列表
-        self.user_table = QTableWidget()
-        self.user_table.setColumnCount(3)
-        self.user_table.setHorizontalHeaderLabels(["用户名", "工号", "操作"])
+        # 创建用户列表，数据按需分页读取，操作按钮由委托绘制
+        self.notify_empty_result = False  # 点击查询按钮时，没有结果要提示
+        self.user_model = UserTableModel(self.user_view_model, self)
+        self.user_table = QTableView()
+        self.user_table.setModel(self.user_model)
+        self.user_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.user_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.user_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.user_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.user_table.verticalHeader().setDefaultSectionSize(40)
+        
+        self.action_delegate = ActionButtonDelegate([("edit", "修改"), ("delete", "删除")], self.user_table)
+        self.action_delegate.clicked.connect(self.handle_user_action)
+        self.user_table.setItemDelegateForColumn(UserTableModel.ACTION_COLUMN, self.action_delegate)
         main_layout.addWidget(self.user_table)
+        
+        # 边输入边查询，查询在搜索线程中执行
+        self.search_controller = SearchController(
+            self.user_view_model.create_search_manager,
+            lambda manager, keyword: self.user_view_model.search_users(manager, keyword, UserTableModel.PAGE_SIZE),
+            parent=self
+        )
+        self.search_controller.attach(self.search_input)
+        self.search_controller.results_ready.connect(self.show_search_result)
     
     def add_user(self):
         """添加用户
@@ -116,84 +153,42 @@ class UserView(QWidget):
             QMessageBox.warning(self, "警告", "请输入用户名")
             return
         
-        users = self.user_view_model.search_users_by_username(username)
-        if users:
-            # 清空表格
-            self.user_table.setRowCount(0)
-            self.user_id_map.clear()  # 清空映射
-            
-            # 添加查询结果
-            for user in users:
-                row = self.user_table.rowCount()
-                self.user_table.insertRow(row)
-                self.user_table.setItem(row, 0, QTableWidgetItem(user['username']))
-                self.user_table.setItem(row, 1, QTableWidgetItem(user['employee_id']))
-                
-                # 存储行索引到用户ID的映射
-                self.user_id_map[row] = user['id']
-                
-                # 添加操作按钮
-                button_layout = QHBoxLayout()
-                button_layout.setSpacing(5)
-                
-                edit_button = QPushButton("修改")
-                edit_button.setFixedHeight(30)
-                edit_button.clicked.connect(lambda checked, uid=user['id']: self.edit_user(uid))
-                button_layout.addWidget(edit_button)
-                
-                delete_button = QPushButton("删除")
-                delete_button.setFixedHeight(30)
-                delete_button.clicked.connect(lambda checked, uid=user['id']: self.delete_user(uid))
-                button_layout.addWidget(delete_button)
-                
-                button_widget = QWidget()
-                button_widget.setLayout(button_layout)
-                self.user_table.setCellWidget(row, 2, button_widget)
-                
-                # 设置行高
-                self.user_table.setRowHeight(row, 70)
-        else:
+        self.notify_empty_result = True
+        self.search_controller.search_now(username)
+    
+    def show_search_result(self, keyword, result):
+        """显示搜索线程返回的查询结果
+        
+        Args:
+            keyword: 用户名关键字
+            result: (匹配的用户数量, 第一页用户列表)
+        """
+        row_count, first_page = result
+        self.user_model.show_search_result(keyword, row_count, first_page)
+        if self.notify_empty_result and row_count == 0:
             QMessageBox.information(self, "提示", "未找到用户")
+        self.notify_empty_result = False
     
+    @startup_profiler.phase("populate:users")
     def refresh_user_list(self):
-        """刷新用户列表
+        """刷新用户列表，保留查询框中的条件
         """
-        users = self.user_view_model.get_all_users()
-        
-        # 清空表格
-        self.user_table.setRowCount(0)
-        self.user_id_map.clear()  # 清空映射
-        
-        # 添加用户数据
-        for user in users:
-            row = self.user_table.rowCount()
-            self.user_table.insertRow(row)
-            self.user_table.setItem(row, 0, QTableWidgetItem(user['username']))
-            self.user_table.setItem(row, 1, QTableWidgetItem(user['employee_id']))
-            
-            # 存储行索引到用户ID的映射
-            self.user_id_map[row] = user['id']
-            
-            # 添加操作按钮
-            button_layout = QHBoxLayout()
-            button_layout.setSpacing(5)
-            
-            edit_button = QPushButton("修改")
-            edit_button.setFixedHeight(30)
-            edit_button.clicked.connect(lambda checked, uid=user['id']: self.edit_user(uid))
-            button_layout.addWidget(edit_button)
-            
-            delete_button = QPushButton("删除")
-            delete_button.setFixedHeight(30)
-            delete_button.clicked.connect(lambda checked, uid=user['id']: self.delete_user(uid))
-            button_layout.addWidget(delete_button)
-            
-            button_widget = QWidget()
-            button_widget.setLayout(button_layout)
-            self.user_table.setCellWidget(row, 2, button_widget)
-            
-            # 设置行高
-            self.user_table.setRowHeight(row, 70)
+        self.user_model.refresh(self.search_input.text().strip())
+    
+    def handle_user_action(self, action, row):
+        """处理用户列表中的操作按钮
+        
+        Args:
+            action: 按钮名称（edit、delete）
+            row: 行号
+        """
+        user = self.user_model.get_user(row)
+        if not user:
+            return
+        if action == "edit":
+            self.edit_user(user['id'])
+        elif action == "delete":
+            self.delete_user(user['id'])
     
     def edit_user(self, user_id):
         """修改用户
@@ -282,23 +277,223 @@ class UserView(QWidget):
         if not file_path:
             return
         
-        result = self.user_view_model.import_users_from_csv(file_path)
+        # 同一文件上次导入中断时，可以从中断处继续，已导入的行不会重复导入
+        resume = True
+        checkpoint = self.user_view_model.get_import_checkpoint(file_path)
+        if checkpoint is not None:
+            reply = QMessageBox.question(
+                self, "继续导入",
+                f"该文件上次导入中断（已读取 {checkpoint['parsed']} 行，已导入 {checkpoint['success']} 条），"
+                f"是否从中断处继续？\n选择“否”将从头重新导入，已导入的数据会重复",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel, QMessageBox.Yes
+            )
+            if reply == QMessageBox.Cancel:
+                return
+            resume = reply == QMessageBox.Yes
+        
+        # 在后台线程中导入，界面只显示进度，导入结束后刷新一次
+        self.import_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.user_view_model.import_users_from_csv(
+                file_path, progress_callback, should_cancel, resume=resume
+            )
+        )
+        # 先关闭进度对话框，再显示导入结果
+        self.import_dialog = ImportProgressDialog(self.import_runner, self)
+        self.import_runner.signals.finished.connect(self.on_import_finished)
+        self.import_runner.signals.failed.connect(self.on_import_failed)
+        self.import_runner.start()
+    
+    def on_import_finished(self, result):
+        """导入结束后显示结果并刷新列表
+        
+        Args:
+            result: 导入结果
+        """
         if "error" in result:
             QMessageBox.critical(self, "错误", f"导入失败: {result['error']}")
-        else:
+        elif result.get("cancelled"):
             QMessageBox.information(
-                self, "提示", 
-                f"导入成功: {result['success']} 条，失败: {result['failed']} 条"
+                self, "提示",
+                f"导入已取消，已导入: {result['success']} 条，失败: {result['failed']} 条\n再次导入该文件时可从中断处继续"
             )
-            self.refresh_user_list()
+        else:
+            message = f"导入成功: {result['success']} 条，失败: {result['failed']} 条"
+            if "rejects_path" in result:
+                message += f"\n失败的行已保存到: {result['rejects_path']}"
+            QMessageBox.information(self, "提示", message)
+        self.refresh_user_list()
+    
+    def on_import_failed(self, error):
+        """导入出错
+        
+        Args:
+            error: 错误信息
+        """
+        QMessageBox.critical(self, "错误", f"导入失败: {error}")
+        self.refresh_user_list()
+    
+    def export_users(self):
+        """导出全部用户
+        """
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "导出用户", "users.csv", ExportProgressDialog.FILE_FILTER
+        )
+        
+        if not file_path:
+            return
+        
+        # 在后台线程中逐批导出，数据量大时界面也不会卡住
+        self.export_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.user_view_model.export_users(
+                file_path, progress_callback, should_cancel
+            )
+        )
+        self.export_dialog = ExportProgressDialog(self.export_runner, self)
+        self.export_runner.signals.finished.connect(self.on_export_finished)
+        self.export_runner.signals.failed.connect(lambda error: QMessageBox.critical(self, "错误", f"导出失败: {error}"))
+        self.export_runner.start()
+    
+    def on_export_finished(self, result):
+        """导出结束后显示结果
+        
+        Args:
+            result: 导出结果
+        """
+        if result['cancelled']:
+            QMessageBox.information(self, "提示", "导出已取消")
+        else:
+            QMessageBox.information(self, "提示", f"已导出 {result['rows']} 条到: {result['path']}")
+    
+    def check_users_csv(self):
+        """检查CSV文件导入后的结果，不写入数据库
+        """
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择CSV文件", "", "CSV文件 (*.csv)"
+        )
+        
+        if not file_path:
+            return
+        
+        self.import_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.user_view_model.import_users_from_csv(
+                file_path, progress_callback, should_cancel, dry_run=True
+            )
+        )
+        self.import_dialog = ImportProgressDialog(self.import_runner, self)
+        self.import_dialog.setWindowTitle("导入预检")
+        self.import_dialog.setLabelText("正在检查...")
+        self.import_runner.signals.finished.connect(self.on_check_finished)
+        self.import_runner.signals.failed.connect(lambda error: QMessageBox.critical(self, "错误", f"检查失败: {error}"))
+        self.import_runner.start()
+    
+    def on_check_finished(self, result):
+        """显示导入预检的结果
+        
+        Args:
+            result: 检查结果
+        """
+        if "error" in result:
+            QMessageBox.critical(self, "错误", f"检查失败: {result['error']}")
+            return
+        
+        message = "检查已取消，" if result.get("cancelled") else ""
+        message += (
+            f"已检查: {result['parsed']} 行，可导入: {result['success']} 条，"
+            f"其中有问题: {result['warnings']} 条，无法导入: {result['failed']} 条（未写入数据库）"
+        )
+        for issue, count in result['issues'].items():
+            message += f"\n{issue}: {count} 行"
+        if "rejects_path" in result:
+            message += f"\n有问题的行已保存到: {result['rejects_path']}"
+        QMessageBox.information(self, "导入预检", message)
+    
+    def sync_users_from_csv(self):
+        """按工号把用户同步为CSV文件中的数据
+        
+        先预览同步会发生的变化，确认后才修改数据库
+        """
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择CSV文件", "", "CSV文件 (*.csv)"
+        )
+        
+        if not file_path:
+            return
+        
+        self.import_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.user_view_model.sync_users_from_csv(
+                file_path, progress_callback, should_cancel, dry_run=True
+            )
+        )
+        self.import_dialog = ImportProgressDialog(self.import_runner, self)
+        self.import_dialog.setWindowTitle("同步预览")
+        self.import_dialog.setLabelText("正在检查...")
+        self.import_runner.signals.finished.connect(lambda result: self.on_sync_preview_finished(file_path, result))
+        self.import_runner.signals.failed.connect(lambda error: QMessageBox.critical(self, "错误", f"检查失败: {error}"))
+        self.import_runner.start()
+    
+    def on_sync_preview_finished(self, file_path, result):
+        """显示同步会发生的变化，确认后执行同步
+        
+        Args:
+            file_path: CSV文件路径
+            result: 同步预览结果
+        """
+        if "error" in result:
+            QMessageBox.critical(self, "错误", f"同步失败: {result['error']}")
+            return
+        if result.get("cancelled"):
+            return
+        
+        message = (f"同步将新增: {result['inserted']} 个，修改: {result['updated']} 个，"
+                   f"删除: {result['deleted']} 个（连同中奖设置），未变化: {result['unchanged']} 个，失败: {result['failed']} 条")
+        if "rejects_path" in result:
+            message += f"\n失败的行已保存到: {result['rejects_path']}"
+        if result['refused']:
+            QMessageBox.warning(self, "警告", f"{message}\n\n{result['refused']}")
+            return
+        
+        reply = QMessageBox.question(
+            self, "确认", f"{message}\n\n确定要同步吗？",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        
+        # 实际删除的用户不能多于确认时的数量
+        self.import_runner = TaskRunner(
+            lambda progress_callback, should_cancel: self.user_view_model.sync_users_from_csv(
+                file_path, progress_callback, should_cancel, max_deleted=result['deleted']
+            )
+        )
+        # 先关闭进度对话框，再显示同步结果
+        self.import_dialog = ImportProgressDialog(self.import_runner, self)
+        self.import_runner.signals.finished.connect(self.on_sync_finished)
+        self.import_runner.signals.failed.connect(self.on_import_failed)
+        self.import_runner.start()
+    
+    def on_sync_finished(self, result):
+        """同步结束后显示结果并刷新列表
+        
+        Args:
+            result: 同步结果
+        """
+        if "error" in result:
+            QMessageBox.critical(self, "错误", f"同步失败: {result['error']}")
+        elif result.get("cancelled"):
+            QMessageBox.information(self, "提示", "同步已取消，用户数据没有变化")
+        else:
+            message = (f"新增: {result['inserted']} 个，修改: {result['updated']} 个，删除: {result['deleted']} 个，"
+                       f"未变化: {result['unchanged']} 个，失败: {result['failed']} 条")
+            if "rejects_path" in result:
+                message += f"\n失败的行已保存到: {result['rejects_path']}"
+            QMessageBox.information(self, "提示", message)
+        self.refresh_user_list()
     
     def batch_delete_users(self):
         """批量删除用户
         """
         # 获取选中的行
-        selected_rows = set()
-        for item in self.user_table.selectedItems():
-            selected_rows.add(item.row())
+        selected_rows = {index.row() for index in self.user_table.selectionModel().selectedRows()}
         
         if not selected_rows:
             QMessageBox.warning(self, "警告", "请选择要删除的用户")
@@ -311,9 +506,10 @@ class UserView(QWidget):
         
         if reply == QMessageBox.Yes:
             success_count = 0
-            for row in selected_rows:
-                if row in self.user_id_map:
-                    user_id = self.user_id_map[row]
+            # 先取出全部用户ID再删除，删除过程中表格行号不会变化
+            user_ids = [self.user_model.data(self.user_model.index(row, 0), Qt.UserRole) for row in selected_rows]
+            for user_id in user_ids:
+                if user_id is not None:
                     success = self.user_view_model.delete_user(user_id)
                     if success:
                         success_count += 1